@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 日报分发模块
+将文件变化事件写入发件箱，由后台线程按时间/数量窗口合并成批次，
+通过复用连接的 requests.Session 发送到 AI 接口，避免在事件线程中逐条同步请求
+"""
+
+import hashlib
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_outbox import AIOutbox
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+class AIReportDispatcher:
+    """AI 日报批量分发器"""
+
+    def __init__(
+        self,
+        api_url,
+        on_reports,
+        enabled=True,
+        batch_size=50,
+        batch_interval=5.0,
+        timeout=10.0,
+        max_retries=3,
+        backoff_base=0.5,
+        backoff_max=8.0,
+        pool_size=4,
+        outbox=None,
+        max_in_flight=2,
+    ):
+        """
+        初始化分发器
+
+        Args:
+            api_url (str): AI 接口地址
+            on_reports (callable): 批次完成回调，参数为 [(event, ai_response), ...]
+            enabled (bool): 是否真正调用 AI 接口，False 时在本地生成模拟结果
+            batch_size (int): 单个批次的最大事件数
+            batch_interval (float): 批次窗口时长（秒），窗口到期即发送
+            timeout (float): 单次请求超时时间（秒）
+            max_retries (int): 单个批次请求失败后的最大重试次数
+            backoff_base (float): 重试退避基数（秒）
+            backoff_max (float): 单次重试的最大等待时间（秒）
+            pool_size (int): 连接池大小
+            outbox (AIOutbox): 发件箱，默认使用不持久化的内存发件箱
+            max_in_flight (int): 同时发送中的批次数上限
+        """
+        self.api_url = api_url
+        self.on_reports = on_reports
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = max(pool_size, max_in_flight)
+        self.outbox = outbox if outbox is not None else AIOutbox()
+        self.max_in_flight = max_in_flight
+
+        self._session = None
+        self._thread = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.stats = {
+            "submitted": 0,
+            "duplicates": 0,
+            "batches_sent": 0,
+            "batches_failed": 0,
+            "events_delivered": 0,
+            "retries": 0,
+        }
+
+    def start(self):
+        """启动后台分发线程（重复调用无副作用）"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_in_flight, thread_name_prefix="ai-delivery"
+            )
+            self._thread = threading.Thread(
+                target=self._run, name="ai-dispatcher", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, event, idem_key=None):
+        """
+        提交一个事件，写入发件箱后立即返回
+
+        Args:
+            event (dict): 事件数据，包含 action、file_path、timestamp
+            idem_key (str): 幂等键，重复提交相同键的事件会被忽略
+        """
+        self.start()
+        added = self.outbox.put(event, idem_key)
+        with self._lock:
+            self.stats["submitted"] += 1
+            if not added:
+                self.stats["duplicates"] += 1
+        if not added:
+            return
+        self._wakeup.set()
+
+    def stop(self, timeout=30.0):
+        """
+        停止分发线程，发送已到期的剩余事件，未能发送的事件保留在发件箱中
+
+        Args:
+            timeout (float): 等待线程结束的最长时间（秒）
+        """
+        with self._lock:
+            thread = self._thread
+            executor = self._executor
+        if thread and thread.is_alive():
+            self._stopping.set()
+            self._wakeup.set()
+            thread.join(timeout)
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def pending(self):
+        """返回尚未投递的事件数量"""
+        return self.outbox.stats()["backlog"]
+
+    def status(self):
+        """
+        获取分发器状态，用于 /status 接口
+
+        Returns:
+            dict: 发件箱积压、投递速率和分发统计
+        """
+        status = self.outbox.stats()
+        with self._lock:
+            status.update(self.stats)
+        return status
+
+    def _run(self):
+        """分发线程主循环：窗口到期或数量足够时取出一个批次交给发送线程池"""
+        window_start = None
+        while True:
+            stopping = self._stopping.is_set()
+            ready = self.outbox.count_ready()
+            if ready:
+                now = time.monotonic()
+                if window_start is None:
+                    window_start = now
+                elapsed = now - window_start
+                if (
+                    stopping
+                    or ready >= self.batch_size
+                    or elapsed >= self.batch_interval
+                ):
+                    # 发送中的批次达到上限时在此阻塞
+                    self._in_flight.acquire()
+                    rows = self.outbox.claim(self.batch_size)
+                    if rows:
+                        self._executor.submit(self._deliver, rows)
+                    else:
+                        self._in_flight.release()
+                    window_start = None
+                    continue
+                wait = self.batch_interval - elapsed
+            elif stopping:
+                break
+            else:
+                window_start = None
+                due = self.outbox.next_due_in()
+                wait = self.batch_interval if due is None else due
+
+            self._wakeup.wait(max(wait, 0.01))
+            self._wakeup.clear()
+
+    def _deliver(self, rows):
+        """发送一个批次，成功后确认，失败后退回发件箱等待重试"""
+        ids = [row[0] for row in rows]
+        keys = [row[1] for row in rows]
+        batch = [dict(row[2], idempotency_key=row[1]) for row in rows]
+        try:
+            if self.enabled:
+                batch_key = hashlib.sha256("\n".join(keys).encode()).hexdigest()
+                reports = self.send_batch(batch, {"Idempotency-Key": batch_key})
+            else:
+                reports = [simulate_report(event) for event in batch]
+            self.on_reports(list(zip([row[2] for row in rows], reports)))
+            self.outbox.ack(ids)
+            # 多个发送线程同时更新统计，需要加锁
+            with self._lock:
+                self.stats["batches_sent"] += 1
+                self.stats["events_delivered"] += len(rows)
+        except Exception as e:
+            with self._lock:
+                self.stats["batches_failed"] += 1
+            self.outbox.nack(ids, e)
+            logger.error(f"调用AI接口失败，{len(rows)} 条事件将稍后重试: {e}")
+        finally:
+            self._in_flight.release()
+            self._wakeup.set()
+
+    def get_session(self):
+        """获取复用连接的 HTTP 会话（发送线程共享）"""
+        # requests 导入较慢，只在真正发送时导入
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        with self._lock:
+            if self._session is not None:
+                return self._session
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_size, pool_maxsize=self.pool_size
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+            return session
+
+    def send_batch(self, batch, headers=None):
+        """
+        发送一个批次到 AI 接口，失败时带随机抖动的指数退避重试
+
+        Args:
+            batch (list): 事件列表
+            headers (dict): 额外的请求头
+
+        Returns:
+            list: 与 batch 一一对应的 AI 返回结果
+        """
+        import requests
+
+        payload = {"events": batch}
+        attempt = 0
+        while True:
+            try:
+                response = self.get_session().post(
+                    self.api_url, json=payload, headers=headers, timeout=self.timeout
+                )
+                response.raise_for_status()
+                reports = response.json().get("reports", [])
+                break
+            except (requests.RequestException, ValueError) as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    raise
+                delay = random.uniform(
+                    0, min(self.backoff_max, self.backoff_base * (2**attempt))
+                )
+                attempt += 1
+                with self._lock:
+                    self.stats["retries"] += 1
+                logger.warning(
+                    f"AI接口请求失败，{delay:.2f}s 后第 {attempt} 次重试: {e}"
+                )
+                time.sleep(delay)
+
+        # 接口未返回的条目使用本地模拟结果补齐
+        return [
+            reports[i] if i < len(reports) else simulate_report(event)
+            for i, event in enumerate(batch)
+        ]
+
+
+def _is_retryable(error):
+    """判断请求错误是否值得重试（连接错误、超时、429 和 5xx）"""
+    import requests
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return True
+
+
+def simulate_report(event):
+    """
+    在本地生成模拟的 AI 返回结果
+
+    Args:
+        event (dict): 事件数据
+
+    Returns:
+        dict: 包含 summary 和 details 的结果
+    """
+    action = event.get("action", "")
+    file_path = event.get("file_path", "")
+    timestamp = event.get("timestamp", "")
+    return {
+        "summary": f"在{timestamp}检测到文件{file_path}被{action}",
+        "details": f"文件 {file_path} 的{action.lower()}操作已被记录",
+    }
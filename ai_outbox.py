@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 日报发件箱模块
+使用 SQLite 持久化待发送的事件，保证 AI 接口不可用或进程重启时不丢失，
+由分发器异步取出发送（至少一次投递）
+"""
+
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 发送速率统计窗口（秒）
+RATE_WINDOW = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idem_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    created REAL NOT NULL,
+    delivered REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_ready ON outbox (state, next_attempt);
+"""
+
+
+class AIOutbox:
+    """基于 SQLite 的持久化发件箱"""
+
+    def __init__(self, db_path=":memory:", backoff_base=1.0, backoff_max=300.0):
+        """
+        初始化发件箱
+
+        Args:
+            db_path (str): 数据库文件路径，":memory:" 表示不持久化
+            backoff_base (float): 投递失败后的退避基数（秒）
+            backoff_max (float): 最大退避时间（秒）
+        """
+        self.db_path = db_path
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._delivered_log = deque()
+        self.delivered_total = 0
+        self.failed_total = 0
+
+        self._conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.recover()
+
+    def recover(self):
+        """
+        将上次进程退出时仍在发送中的条目恢复为待发送
+
+        Returns:
+            int: 恢复的条目数
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET state = 'pending' WHERE state = 'inflight'"
+            )
+        if cursor.rowcount:
+            logger.info(f"发件箱恢复了 {cursor.rowcount} 条未确认的事件")
+        return cursor.rowcount
+
+    def put(self, payload, idem_key=None):
+        """
+        写入一个待发送的事件
+
+        Args:
+            payload (dict): 事件数据
+            idem_key (str): 幂等键，相同键的事件只会写入一次，默认自动生成
+
+        Returns:
+            bool: 写入成功返回 True，幂等键重复返回 False
+        """
+        idem_key = idem_key or uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox"
+                " (idem_key, payload, next_attempt, created) VALUES (?, ?, ?, ?)",
+                (idem_key, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+        return cursor.rowcount == 1
+
+    def count_ready(self, now=None):
+        """返回当前可以发送的条目数"""
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM outbox"
+                " WHERE state = 'pending' AND next_attempt <= ?",
+                (now,),
+            ).fetchone()
+        return row[0]
+
+    def next_due_in(self, now=None):
+        """
+        返回距离下一个待发送条目到期的秒数
+
+        Returns:
+            float: 秒数，没有待发送条目时返回 None
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt) FROM outbox WHERE state = 'pending'"
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - now)
+
+    def claim(self, limit):
+        """
+        取出一批可以发送的条目并标记为发送中
+
+        Args:
+            limit (int): 最多取出的条目数
+
+        Returns:
+            list: [(id, 幂等键, 事件数据), ...]
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, idem_key, payload FROM outbox"
+                " WHERE state = 'pending' AND next_attempt <= ?"
+                " ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE outbox SET state = 'inflight' WHERE id = ?",
+                    [(row[0],) for row in rows],
+                )
+        return [(row[0], row[1], json.loads(row[2])) for row in rows]
+
+    def ack(self, ids):
+        """
+        确认条目已投递
+
+        Args:
+            ids (list): 条目 ID 列表
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET state = 'delivered', delivered = ? WHERE id = ?",
+                [(now, i) for i in ids],
+            )
+            self.delivered_total += len(ids)
+            self._delivered_log.append((now, len(ids)))
+
+    def nack(self, ids, error=""):
+        """
+        标记条目投递失败，按指数退避安排下一次发送
+
+        Args:
+            ids (list): 条目 ID 列表
+            error (str): 失败原因
+        """
+        now = time.time()
+        with self._lock:
+            for i in ids:
+                row = self._conn.execute(
+                    "SELECT attempts FROM outbox WHERE id = ?", (i,)
+                ).fetchone()
+                if row is None:
+                    continue
+                attempts = row[0] + 1
+                delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+                delay *= random.uniform(0.5, 1.0)
+                self._conn.execute(
+                    "UPDATE outbox SET state = 'pending', attempts = ?,"
+                    " next_attempt = ?, last_error = ? WHERE id = ?",
+                    (attempts, now + delay, str(error)[:500], i),
+                )
+            self.failed_total += len(ids)
+
+    def purge_delivered(self, older_than=86400.0):
+        """
+        清理已投递的历史条目（保留期内的条目仍用于幂等去重）
+
+        Args:
+            older_than (float): 保留时间（秒）
+
+        Returns:
+            int: 清理的条目数
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE state = 'delivered' AND delivered < ?",
+                (time.time() - older_than,),
+            )
+        return cursor.rowcount
+
+    def drain_rate(self):
+        """返回最近一个统计窗口内的投递速率（条/秒）"""
+        now = time.time()
+        with self._lock:
+            while self._delivered_log and self._delivered_log[0][0] < now - RATE_WINDOW:
+                self._delivered_log.popleft()
+            delivered = sum(count for _, count in self._delivered_log)
+        return round(delivered / RATE_WINDOW, 3)
+
+    def stats(self):
+        """
+        获取发件箱统计信息
+
+        Returns:
+            dict: 积压数量、发送中数量、投递速率等
+        """
+        now = time.time()
+        with self._lock:
+            counts = dict(
+                self._conn.execute(
+                    "SELECT state, COUNT(*) FROM outbox GROUP BY state"
+                ).fetchall()
+            )
+            oldest = self._conn.execute(
+                "SELECT MIN(created) FROM outbox WHERE state != 'delivered'"
+            ).fetchone()[0]
+        return {
+            "backlog": counts.get("pending", 0) + counts.get("inflight", 0),
+            "pending": counts.get("pending", 0),
+            "in_flight": counts.get("inflight", 0),
+            "delivered_total": self.delivered_total,
+            "failed_total": self.failed_total,
+            "drain_rate": self.drain_rate(),
+            "oldest_pending_age": round(now - oldest, 1) if oldest else 0,
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
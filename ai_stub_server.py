@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 AI 接口桩服务
+模拟 AI_API_URL 的批量接口，用于离线测试分发器的吞吐量和重试逻辑
+"""
+
+import argparse
+import http.server
+import json
+import threading
+import time
+
+
+class StubAIServer:
+    """本地 AI 接口桩服务"""
+
+    def __init__(self, host="127.0.0.1", port=0, fail_first=0, latency=0.0):
+        """
+        初始化桩服务
+
+        Args:
+            host (str): 监听地址
+            port (int): 监听端口，0 表示自动分配
+            fail_first (int): 前 N 个请求返回 503，用于测试重试
+            latency (float): 每个请求的模拟处理延迟（秒）
+        """
+        self.fail_first = fail_first
+        self.latency = latency
+        self.requests_received = 0
+        self.events_received = 0
+        self.idempotency_keys = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                status, response = server.handle(body, self.headers)
+                data = json.dumps(response, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        """桩服务的接口地址"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/report"
+
+    def handle(self, body, headers):
+        """
+        处理一个批量请求
+
+        Returns:
+            tuple: (HTTP 状态码, 响应数据)
+        """
+        if self.latency:
+            time.sleep(self.latency)
+
+        events = body.get("events", [])
+        with self._lock:
+            self.requests_received += 1
+            if self.requests_received <= self.fail_first:
+                return 503, {"error": "service unavailable"}
+            self.events_received += len(events)
+            key = headers.get("Idempotency-Key")
+            if key:
+                self.idempotency_keys.append(key)
+
+        reports = [
+            {
+                "summary": f"[stub] {event.get('action')} {event.get('file_path')}",
+                "details": f"{event.get('timestamp')} 的变更已记录",
+            }
+            for event in events
+        ]
+        return 200, {"reports": reports}
+
+    def start(self):
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="本地 AI 接口桩服务")
+    parser.add_argument("--port", type=int, default=9000, help="监听端口")
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟处理延迟")
+    parser.add_argument("--fail-first", type=int, default=0, help="前N个请求失败")
+    args = parser.parse_args()
+
+    server = StubAIServer(
+        port=args.port, fail_first=args.fail_first, latency=args.latency
+    )
+    print(f"AI 桩服务已启动: {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Git 自动提交延迟基准测试
+在包含大量文件的临时仓库中比较整库 is_dirty() 检查与按路径检查的提交延迟
+
+用法:
+    python benchmark_git_commit.py --files 100000 --commits 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+from git_manager import GitManager
+
+
+def create_repo(repo_dir, file_count):
+    """创建包含 file_count 个文件的仓库并完成首次提交"""
+    for i in range(file_count):
+        sub_dir = os.path.join(repo_dir, f"d{i // 1000:03d}")
+        if i % 1000 == 0:
+            os.makedirs(sub_dir, exist_ok=True)
+        with open(os.path.join(sub_dir, f"f{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"file {i}\n")
+
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="bench",
+        GIT_AUTHOR_EMAIL="bench@example.com",
+        GIT_COMMITTER_NAME="bench",
+        GIT_COMMITTER_EMAIL="bench@example.com",
+    )
+    subprocess.run(["git", "init", "-q"], cwd=repo_dir, check=True)
+    subprocess.run(["git", "add", "-A"], cwd=repo_dir, check=True, env=env)
+    subprocess.run(
+        ["git", "commit", "-q", "-m", "initial"], cwd=repo_dir, check=True, env=env
+    )
+
+
+def percentile(values, pct):
+    """计算百分位数"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_mode(manager, repo_dir, commits, mode):
+    """
+    修改文件并提交，分别记录检查耗时和 add + 检查 + 提交的总耗时（毫秒）
+
+    mode: "is_dirty" 为原来的整库检查，"paths" 为按路径检查，
+    "known" 为调用方已确认有变化、跳过检查
+    """
+    checks, totals = [], []
+    for i in range(commits):
+        path = f"d{i % 10:03d}/f{i}_{mode}.txt"
+        # 文件数少于 10000 时仓库中没有全部 10 个目录
+        os.makedirs(os.path.join(repo_dir, os.path.dirname(path)), exist_ok=True)
+        with open(os.path.join(repo_dir, path), "a", encoding="utf-8") as f:
+            f.write(f"{mode} {i}\n")
+
+        start = time.perf_counter()
+        manager.add_file(path)
+        check_start = time.perf_counter()
+        # 检查与提交一样交给写线程执行，不在基准线程中直接访问仓库
+        if mode == "is_dirty":
+            dirty = manager.submit_write(manager.repo.is_dirty).result()
+        elif mode == "paths":
+            dirty = manager.submit_write(manager.has_staged_changes, [path]).result()
+        else:
+            dirty = True
+        checks.append((time.perf_counter() - check_start) * 1000)
+        if dirty:
+            manager.commit_changes(f"{mode} {i}", changed=True)
+        totals.append((time.perf_counter() - start) * 1000)
+    return checks, totals
+
+
+def summarize(latencies):
+    """计算延迟统计"""
+    return {
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Git 自动提交延迟基准测试")
+    parser.add_argument("--files", type=int, default=100000, help="仓库文件数")
+    parser.add_argument("--commits", type=int, default=20, help="每种模式的提交次数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo_dir:
+        print(f"正在创建包含 {args.files} 个文件的仓库...")
+        create_repo(repo_dir, args.files)
+        manager = GitManager(repo_dir)
+
+        results = {"files": args.files, "commits": args.commits}
+        try:
+            for mode in ("is_dirty", "paths", "known"):
+                checks, totals = run_mode(manager, repo_dir, args.commits, mode)
+                results[mode] = {
+                    "check": summarize(checks),
+                    "commit": summarize(totals),
+                }
+                print(f"{mode}: {results[mode]}")
+        finally:
+            manager.close()
+
+    print(json.dumps(results, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
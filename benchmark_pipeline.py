@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件监控端到端基准测试
+在临时目录中启动 watchdog Observer 和 FileChangeHandler，依次执行创建大量文件、
+集中编辑、大文件、重命名和批量删除等负载，测量每个阶段的事件处理速率、
+从文件操作到处理完成（差异报告写入）的延迟和进程内存占用，
+分别使用 Git 和文件缓存两种后端，结果以 JSON 输出并追加到结果文件中
+
+每个后端在独立的子进程中运行（工作目录为新的临时目录），互不影响
+
+用法:
+    python benchmark_pipeline.py --files 500 --storm-edits 500
+    python benchmark_pipeline.py --backends cache --fail-on-regression
+"""
+
+import argparse
+import bisect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS_PATH = os.path.join("benchmark_results", "pipeline.jsonl")
+# 负载文件所在的子目录（相对监控目录）
+WORK_DIR = "workload"
+# 与上一次结果相比变差超过该比例视为回归
+REGRESSION_THRESHOLD = 0.2
+# 参与回归比较的指标: (指标, 是否越大越好)
+TRACKED_METRICS = [("events_per_sec", True), ("p50_ms", False), ("p99_ms", False)]
+
+
+def percentile(values, pct):
+    """计算百分位数"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def rss_kb():
+    """
+    返回当前进程的常驻内存（KB）
+
+    Returns:
+        int: 常驻内存，当前平台无法获取时返回 None
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return None
+
+
+class OperationLog:
+    """记录负载对每个文件执行操作的时间"""
+
+    def __init__(self):
+        """初始化操作记录"""
+        self.times = {}
+        self.count = 0
+
+    def record(self, relative_path):
+        """记录一次对 relative_path 的操作"""
+        self.times.setdefault(relative_path, []).append(time.perf_counter())
+        self.count += 1
+
+
+def write_file(path, content):
+    """写入文件内容"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def workload_create(ops, files, **_):
+    """创建大量小文件"""
+    for i in range(files):
+        relative_path = f"{WORK_DIR}/d{i // 100:03d}/f{i}.txt"
+        os.makedirs(os.path.dirname(relative_path), exist_ok=True)
+        write_file(relative_path, f"file {i}\nline 2\n")
+        ops.record(relative_path)
+
+
+def workload_edit_storm(ops, storm_files, storm_edits, **_):
+    """对少量文件快速连续追加内容"""
+    paths = [f"{WORK_DIR}/storm/s{i}.txt" for i in range(storm_files)]
+    os.makedirs(os.path.dirname(paths[0]), exist_ok=True)
+    for path in paths:
+        write_file(path, "storm\n")
+    for i in range(storm_edits):
+        path = paths[i % storm_files]
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"edit {i}\n")
+        ops.record(path)
+
+
+def workload_large_files(ops, large_files, large_kb, **_):
+    """创建大文件后修改其中一行"""
+    os.makedirs(f"{WORK_DIR}/large", exist_ok=True)
+    line = "x" * 99 + "\n"
+    lines = [line] * (large_kb * 1024 // len(line))
+    for i in range(large_files):
+        path = f"{WORK_DIR}/large/big{i}.txt"
+        write_file(path, "".join(lines))
+        ops.record(path)
+        lines[len(lines) // 2] = f"changed {i}\n"
+        write_file(path, "".join(lines))
+        ops.record(path)
+
+
+def workload_rename(ops, files, **_):
+    """重命名创建阶段的文件"""
+    for i in range(files):
+        old_path = f"{WORK_DIR}/d{i // 100:03d}/f{i}.txt"
+        new_path = f"{WORK_DIR}/d{i // 100:03d}/r{i}.txt"
+        os.rename(old_path, new_path)
+        ops.record(new_path)
+
+
+def workload_bulk_delete(ops, files, **_):
+    """删除重命名后的文件"""
+    for i in range(files):
+        path = f"{WORK_DIR}/d{i // 100:03d}/r{i}.txt"
+        os.remove(path)
+        ops.record(path)
+
+
+# 负载阶段按顺序执行，后面的阶段依赖前面创建的文件
+WORKLOADS = [
+    ("create", workload_create),
+    ("edit_storm", workload_edit_storm),
+    ("large_files", workload_large_files),
+    ("rename", workload_rename),
+    ("bulk_delete", workload_bulk_delete),
+]
+
+
+def make_timed_handler(handler_class, should_ignore):
+    """
+    创建记录每个事件处理开始和完成时间的处理器子类
+
+    监控程序自身输出（影子仓库、日志等）触发的事件只计数，不计入处理记录
+    """
+
+    class TimedHandler(handler_class):
+        """记录处理时间的文件变化处理器"""
+
+        def __init__(self):
+            """初始化处理记录"""
+            super().__init__()
+            self.lock = threading.Lock()
+            self.completed = []
+            self.ignored = 0
+
+        def log_change(self, action, file_path):
+            """处理事件并记录 (相对路径, 开始时间, 完成时间)"""
+            start = time.perf_counter()
+            super().log_change(action, file_path)
+            relative_path = os.path.relpath(file_path, ".").replace(os.sep, "/")
+            with self.lock:
+                if should_ignore(relative_path):
+                    self.ignored += 1
+                else:
+                    self.completed.append((relative_path, start, time.perf_counter()))
+
+    return TimedHandler
+
+
+def wait_until_settled(handler, settle, timeout):
+    """等待处理器在 settle 秒内没有处理新事件，最多等待 timeout 秒"""
+    deadline = time.perf_counter() + timeout
+    last_count, last_change = -1, time.perf_counter()
+    while time.perf_counter() < deadline:
+        with handler.lock:
+            count = len(handler.completed) + handler.ignored
+        if count != last_count:
+            last_count, last_change = count, time.perf_counter()
+        elif time.perf_counter() - last_change >= settle:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def measure_latencies(ops, completed):
+    """
+    计算每次文件操作到被处理完成的延迟
+
+    操作之后第一个开始处理同一路径的事件完成时，认为该操作已被处理
+    （处理时读取的是文件的最新内容）
+
+    Returns:
+        tuple: (延迟毫秒列表, 未被处理的操作数)
+    """
+    by_path = {}
+    for relative_path, start, done in completed:
+        by_path.setdefault(relative_path, []).append((start, done))
+    latencies, unreported = [], 0
+    for relative_path, op_times in ops.times.items():
+        events = by_path.get(relative_path, [])
+        starts = [start for start, _ in events]
+        for op_time in op_times:
+            index = bisect.bisect_left(starts, op_time)
+            if index < len(events):
+                latencies.append((events[index][1] - op_time) * 1000)
+            else:
+                unreported += 1
+    return latencies, unreported
+
+
+def run_worker(args):
+    """
+    在当前目录中运行所有负载阶段（子进程入口）
+
+    Returns:
+        dict: 该后端的测量结果
+    """
+    from watchdog.observers import Observer
+
+    import file_monitor
+
+    if args.backend == "cache":
+        # 不使用影子仓库，差异报告由文件缓存生成
+        file_monitor.GIT_AVAILABLE = False
+    elif not file_monitor.GIT_AVAILABLE:
+        return {"backend": args.backend, "error": "GitPython 不可用"}
+
+    handler = make_timed_handler(
+        file_monitor.FileChangeHandler, file_monitor.should_ignore
+    )()
+    observer = Observer()
+    observer.schedule(handler, ".", recursive=True)
+    observer.start()
+    params = vars(args)
+
+    result = {"backend": args.backend, "rss_start_kb": rss_kb(), "phases": {}}
+    try:
+        for name, workload in WORKLOADS:
+            with handler.lock:
+                first_event = len(handler.completed)
+                first_ignored = handler.ignored
+            ops = OperationLog()
+            start = time.perf_counter()
+            workload(ops, **params)
+            settled = wait_until_settled(handler, args.settle, args.timeout)
+            with handler.lock:
+                completed = handler.completed[first_event:]
+                ignored = handler.ignored - first_ignored
+
+            latencies, unreported = measure_latencies(ops, completed)
+            finished = completed[-1][2] if completed else time.perf_counter()
+            elapsed = max(finished - start, 1e-9)
+            phase = {
+                "operations": ops.count,
+                "events": len(completed),
+                "ignored_events": ignored,
+                "events_per_sec": round(len(completed) / elapsed, 1),
+                "unreported_operations": unreported,
+                "settled": settled,
+                "rss_kb": rss_kb(),
+            }
+            if latencies:
+                phase.update(
+                    mean_ms=round(statistics.mean(latencies), 2),
+                    p50_ms=round(percentile(latencies, 50), 2),
+                    p99_ms=round(percentile(latencies, 99), 2),
+                )
+            result["phases"][name] = phase
+    finally:
+        observer.stop()
+        observer.join()
+        handler.ai_dispatcher.stop()
+        handler.ai_dispatcher.outbox.close()
+        file_monitor.get_report_writer().close()
+        if args.backend == "git":
+            file_monitor.get_git_manager().close()
+
+    try:
+        import resource
+
+        result["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        result["peak_rss_kb"] = None
+    return result
+
+
+def run_backend(backend, args):
+    """在新的临时目录和子进程中运行一个后端"""
+    worker_args = [
+        os.path.abspath(__file__),
+        "--worker",
+        "--backend",
+        backend,
+        "--files",
+        str(args.files),
+        "--storm-files",
+        str(args.storm_files),
+        "--storm-edits",
+        str(args.storm_edits),
+        "--large-files",
+        str(args.large_files),
+        "--large-kb",
+        str(args.large_kb),
+        "--settle",
+        str(args.settle),
+        "--timeout",
+        str(args.timeout),
+    ]
+    env = dict(os.environ, PYTHONPATH=PROJECT_DIR)
+    with tempfile.TemporaryDirectory() as work_dir:
+        # 文件监控自身的日志写入工作目录下的 file_changes.log，标准错误输出丢弃
+        completed = subprocess.run(
+            [sys.executable, *worker_args],
+            cwd=work_dir,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=True,
+        )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def load_previous(results_path):
+    """读取每个后端最近一次的结果"""
+    previous = {}
+    try:
+        with open(results_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                for result in run.get("results", []):
+                    previous[(result["backend"], json.dumps(run["workload"]))] = result
+    except FileNotFoundError:
+        pass
+    return previous
+
+
+def find_regressions(result, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    与上一次相同后端、相同负载的结果比较
+
+    Returns:
+        list: [(指标, 上次, 本次), ...]，只包含变差超过 threshold 的指标
+    """
+    regressions = []
+    for phase, values in result.get("phases", {}).items():
+        old_values = baseline.get("phases", {}).get(phase, {})
+        for metric, higher_is_better in TRACKED_METRICS:
+            old, new = old_values.get(metric), values.get(metric)
+            if not old or new is None:
+                continue
+            if higher_is_better:
+                regressed = new < old * (1 - threshold)
+            else:
+                regressed = new > old * (1 + threshold)
+            if regressed:
+                regressions.append((f"{phase}.{metric}", old, new))
+    return regressions
+
+
+def git_revision():
+    """返回当前提交的短哈希，不在仓库中时返回 None"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="文件监控端到端基准测试")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=["git", "cache"],
+        default=["git", "cache"],
+        help="要比较的差异报告后端",
+    )
+    parser.add_argument(
+        "--files", type=int, default=500, help="创建、重命名和删除的文件数"
+    )
+    parser.add_argument("--storm-files", type=int, default=5, help="集中编辑的文件数")
+    parser.add_argument("--storm-edits", type=int, default=500, help="集中编辑的次数")
+    parser.add_argument("--large-files", type=int, default=3, help="大文件数")
+    parser.add_argument("--large-kb", type=int, default=4096, help="大文件大小（KB）")
+    parser.add_argument(
+        "--settle", type=float, default=1.0, help="多久没有新事件视为处理完成（秒）"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=300.0, help="每个阶段的最长等待时间（秒）"
+    )
+    parser.add_argument("--results", default=DEFAULT_RESULTS_PATH, help="结果文件路径")
+    parser.add_argument(
+        "--fail-on-regression", action="store_true", help="发现回归时以退出码 1 结束"
+    )
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args), ensure_ascii=False))
+        return
+
+    workload = {
+        "files": args.files,
+        "storm_files": args.storm_files,
+        "storm_edits": args.storm_edits,
+        "large_files": args.large_files,
+        "large_kb": args.large_kb,
+    }
+    previous = load_previous(args.results)
+    results, regressions = [], []
+    for backend in args.backends:
+        print(f"正在运行 {backend} 后端...")
+        result = run_backend(backend, args)
+        results.append(result)
+        print(json.dumps(result, ensure_ascii=False))
+        baseline = previous.get((backend, json.dumps(workload)))
+        if baseline:
+            for metric, old, new in find_regressions(result, baseline):
+                regressions.append((backend, metric, old, new))
+                print(f"回归: {backend} {metric} {old} -> {new}")
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "workload": workload,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.results) or ".", exist_ok=True)
+    with open(args.results, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+    print(f"结果已追加到: {args.results}")
+
+    if regressions and args.fail_on_regression:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准测试
+在临时目录中多次启动新的解释器，测量导入各模块和执行 --manual-scan 的耗时，
+并用 python -X importtime 列出累计导入耗时最高的模块
+
+用法:
+    python benchmark_startup.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 需要测量的启动场景: 名称 -> 解释器参数
+SCENARIOS = {
+    "import git_manager": ["-c", "import git_manager"],
+    "import file_monitor": ["-c", "import file_monitor"],
+    "manual scan": [os.path.join(PROJECT_DIR, "file_monitor.py"), "--manual-scan"],
+}
+
+# 导入后检查这些重量级模块是否已被加载
+HEAVY_MODULES = ["git", "requests"]
+
+
+def run_python(args, work_dir, extra_options=()):
+    """在 work_dir 中启动新的解释器，返回 (耗时毫秒, 标准错误输出)"""
+    env = dict(os.environ, PYTHONPATH=PROJECT_DIR)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *extra_options, *args],
+        cwd=work_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000, result.stderr
+
+
+def measure(args, runs):
+    """每次在新的临时目录中运行，避免上一次创建的仓库和缓存影响结果"""
+    timings = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as work_dir:
+            elapsed, _ = run_python(args, work_dir)
+            timings.append(elapsed)
+    return {
+        "mean_ms": round(statistics.mean(timings), 1),
+        "min_ms": round(min(timings), 1),
+        "max_ms": round(max(timings), 1),
+    }
+
+
+def import_profile(module, top):
+    """
+    解析 python -X importtime 的输出
+
+    Returns:
+        list: [(模块名, 累计耗时微秒), ...]，按耗时从高到低排列
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        _, stderr = run_python(
+            ["-c", f"import {module}"], work_dir, extra_options=["-X", "importtime"]
+        )
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # 格式: import time: self [us] | cumulative | imported package
+        _, cumulative, name = line[len("import time:") :].split("|")
+        entries.append((name.strip(), int(cumulative)))
+    entries.sort(key=lambda entry: -entry[1])
+    return entries[:top]
+
+
+def loaded_heavy_modules(module):
+    """返回导入 module 后已经加载的重量级模块"""
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    with tempfile.TemporaryDirectory() as work_dir:
+        env = dict(os.environ, PYTHONPATH=PROJECT_DIR)
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=work_dir,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    output = result.stdout.strip().splitlines()
+    return [name for name in output[-1].split(",") if name] if output else []
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="启动耗时基准测试")
+    parser.add_argument("--runs", type=int, default=10, help="每个场景的运行次数")
+    parser.add_argument("--top", type=int, default=10, help="列出导入耗时最高的模块数")
+    args = parser.parse_args()
+
+    results = {"runs": args.runs, "scenarios": {}}
+    for name, scenario_args in SCENARIOS.items():
+        results["scenarios"][name] = measure(scenario_args, args.runs)
+        print(f"{name}: {results['scenarios'][name]}")
+
+    results["heavy_modules_after_import"] = loaded_heavy_modules("file_monitor")
+    print(
+        f"导入 file_monitor 后已加载的重量级模块: {results['heavy_modules_after_import']}"
+    )
+
+    results["importtime_top"] = import_profile("file_monitor", args.top)
+    print("导入耗时最高的模块（累计微秒）:")
+    for module, cumulative in results["importtime_top"]:
+        print(f"  {cumulative:>8}  {module}")
+
+    print(json.dumps(results, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务主线检查规模基准测试
+生成不同规模的合成任务文件和任务描述，分别测量解析、精确匹配阶段和模糊匹配阶段
+（逐条与批量）的延迟和内存峰值，结果追加到结果文件中并与上一次同规模的结果比较
+
+用法:
+    python benchmark_task_checker.py --sizes 100 1000 5000 --queries 200
+    python benchmark_task_checker.py --fail-on-regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from main_check import TaskChecker
+
+DEFAULT_RESULTS_PATH = os.path.join("benchmark_results", "task_checker.jsonl")
+# 与上一次结果相比变慢超过该比例视为回归
+REGRESSION_THRESHOLD = 0.2
+# 参与回归比较的指标
+TRACKED_METRICS = [
+    ("parse", "mean_ms"),
+    ("exact", "p50_ms"),
+    ("fuzzy", "p50_ms"),
+    ("fuzzy_batch", "per_query_ms"),
+]
+
+WORDS = (
+    "实现 优化 完善 文件 监控 缓存 接口 报告 日志 性能 版本 管理 同步 配置 部署 "
+    "测试 文档 错误 处理 索引 查询 Git API UI Web AI 数据库 调度 权限 通知"
+).split()
+STATUSES = ["已完成", "进行中", "计划中", "规划中"]
+
+
+def make_task(rng, index):
+    """生成一条任务文本"""
+    return "".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))) + f"#{index}"
+
+
+def generate_task_file(path, task_count, seed=0):
+    """
+    生成合成任务文件：每个版本约 250 个任务，第一个版本已完成，第二个进行中，其余为未来版本
+
+    Returns:
+        list: 所有任务文本
+    """
+    rng = random.Random(seed)
+    version_count = max(3, task_count // 250)
+    tasks = [make_task(rng, i) for i in range(task_count)]
+    lines = ["# 项目任务列表", ""]
+    per_version = -(-task_count // version_count)
+    for v in range(version_count):
+        status = STATUSES[min(v, 1)] if v < 2 else rng.choice(STATUSES[2:])
+        lines.append(f"## 版本v{v}.0 ({status})")
+        lines.append(f"目标：版本 {v} 的目标")
+        lines.append("")
+        for task in tasks[v * per_version : (v + 1) * per_version]:
+            lines.append(f"- [{'x' if v == 0 else ' '}] {task}")
+        lines.append("")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return tasks
+
+
+def generate_descriptions(tasks, count, seed=1):
+    """生成任务描述：三分之一包含原任务，三分之一为改写，其余为随机文本"""
+    rng = random.Random(seed)
+    descriptions = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            descriptions.append(f"{rng.choice(tasks)} 并补充测试")
+        elif kind == 1:
+            task = list(rng.choice(tasks))
+            rng.shuffle(task)
+            descriptions.append("".join(task))
+        else:
+            descriptions.append(make_task(rng, -1))
+    return descriptions
+
+
+def percentile(values, pct):
+    """计算百分位数"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies):
+    """计算延迟统计（毫秒）"""
+    return {
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def measure_memory(fn):
+    """执行 fn 并返回 (结果, 内存峰值 KB)"""
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, round(peak / 1024, 1)
+
+
+def run_size(task_count, query_count, repeat):
+    """测量一个规模下各阶段的延迟和内存"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        task_path = os.path.join(work_dir, "task.md")
+        tasks = generate_task_file(task_path, task_count)
+        descriptions = generate_descriptions(tasks, query_count)
+
+        def parse():
+            checker = TaskChecker(task_path)
+            checker.read_task_file()
+            checker.parse_task_content()
+            return checker
+
+        parse_times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            checker = parse()
+            parse_times.append((time.perf_counter() - start) * 1000)
+        _, parse_peak = measure_memory(parse)
+
+    current_version = checker.get_current_version()
+    # 预热：导入 rapidfuzz 和 numpy
+    checker.fuzzy_best_batch(descriptions[:1])
+
+    exact_times, fuzzy_times = [], []
+    for description in descriptions:
+        start = time.perf_counter()
+        checker.exact_match(description, current_version)
+        exact_times.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        checker.fuzzy_best(description)
+        fuzzy_times.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    checker.fuzzy_best_batch(descriptions)
+    batch_ms = (time.perf_counter() - start) * 1000
+    _, batch_peak = measure_memory(lambda: checker.fuzzy_best_batch(descriptions))
+
+    return {
+        "tasks": task_count,
+        "queries": query_count,
+        "parse": {**summarize(parse_times), "peak_kb": parse_peak},
+        "exact": summarize(exact_times),
+        "fuzzy": summarize(fuzzy_times),
+        "fuzzy_batch": {
+            "total_ms": round(batch_ms, 3),
+            "per_query_ms": round(batch_ms / query_count, 3),
+            "peak_kb": batch_peak,
+        },
+    }
+
+
+def load_previous(results_path):
+    """读取每个规模最近一次的结果"""
+    previous = {}
+    try:
+        with open(results_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                for result in run.get("results", []):
+                    previous[(result["tasks"], result["queries"])] = result
+    except FileNotFoundError:
+        pass
+    return previous
+
+
+def find_regressions(result, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    与上一次同规模的结果比较
+
+    Returns:
+        list: [(指标, 上次, 本次), ...]，只包含变慢超过 threshold 的指标
+    """
+    regressions = []
+    for phase, metric in TRACKED_METRICS:
+        old = baseline.get(phase, {}).get(metric)
+        new = result[phase][metric]
+        if old and new > old * (1 + threshold):
+            regressions.append((f"{phase}.{metric}", old, new))
+    return regressions
+
+
+def git_revision():
+    """返回当前提交的短哈希，不在仓库中时返回 None"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="任务主线检查规模基准测试")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 5000, 20000], help="任务数"
+    )
+    parser.add_argument("--queries", type=int, default=200, help="每个规模的任务描述数")
+    parser.add_argument("--repeat", type=int, default=3, help="解析任务文件的重复次数")
+    parser.add_argument("--results", default=DEFAULT_RESULTS_PATH, help="结果文件路径")
+    parser.add_argument(
+        "--fail-on-regression", action="store_true", help="发现回归时以退出码 1 结束"
+    )
+    args = parser.parse_args()
+
+    previous = load_previous(args.results)
+    results, regressions = [], []
+    for size in args.sizes:
+        result = run_size(size, args.queries, args.repeat)
+        results.append(result)
+        print(json.dumps(result, ensure_ascii=False))
+        baseline = previous.get((size, args.queries))
+        if baseline:
+            for metric, old, new in find_regressions(result, baseline):
+                regressions.append((size, metric, old, new))
+                print(f"回归: {size} 个任务 {metric} {old} -> {new} ms")
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.results) or ".", exist_ok=True)
+    with open(args.results, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+    print(f"结果已追加到: {args.results}")
+
+    if regressions and args.fail_on_regression:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+差异报告存储模块
+每个文件每天只有一个只追加的段文件和一个偏移索引，
+取代每个事件一个 Markdown 文件的方式，需要时再渲染为 Markdown
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from datetime import datetime
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+def segment_name(relative_path):
+    """
+    根据文件路径生成段文件名（不含扩展名）
+
+    清理后的路径可能重名（如 a/b.txt 与 a_b.txt），因此附加路径哈希
+    """
+    normalized = relative_path.replace("\\", "/")
+    clean_path = "".join(
+        c if c.isalnum() or c in ("-", "_", ".") else "_" for c in normalized
+    )[:100]
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:8]
+    return f"{clean_path}_{digest}"
+
+
+class DiffReportStore:
+    """按文件和日期合并的差异报告存储"""
+
+    def __init__(self, root_dir):
+        """
+        初始化差异报告存储
+
+        Args:
+            root_dir (str): 存储根目录，按日期分子目录
+        """
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+
+    def day_dir(self, date_str):
+        """返回指定日期的存储目录"""
+        return os.path.join(self.root_dir, date_str)
+
+    def append(self, relative_path, action, timestamp, summary, diff_content):
+        """
+        追加一条差异记录
+
+        Args:
+            relative_path (str): 文件相对路径
+            action (str): 变更类型
+            timestamp (str): 变更时间，格式为 %Y-%m-%d %H:%M:%S
+            summary (str): 变更摘要
+            diff_content (str): 差异内容
+
+        Returns:
+            str: 段文件路径
+        """
+        date_str = _date_of(timestamp)
+        day_dir = self.day_dir(date_str)
+        base = os.path.join(day_dir, segment_name(relative_path))
+        data = diff_content.encode("utf-8")
+
+        with self._lock:
+            os.makedirs(day_dir, exist_ok=True)
+            with open(base + ".seg", "ab") as seg:
+                offset = seg.seek(0, os.SEEK_END)
+                seg.write(data)
+            entry = {
+                "file": relative_path,
+                "offset": offset,
+                "length": len(data),
+                "timestamp": timestamp,
+                "action": action,
+                "summary": summary,
+            }
+            with open(base + ".idx", "a", encoding="utf-8") as idx:
+                idx.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return base + ".seg"
+
+    def entries(self, relative_path, date_str):
+        """
+        读取某个文件某天的索引条目
+
+        Returns:
+            list: 索引条目列表，按写入顺序排列
+        """
+        base = os.path.join(self.day_dir(date_str), segment_name(relative_path))
+        return _read_index(base + ".idx")
+
+    def read_diff(self, relative_path, date_str, entry):
+        """根据索引条目读取差异内容"""
+        base = os.path.join(self.day_dir(date_str), segment_name(relative_path))
+        with open(base + ".seg", "rb") as seg:
+            seg.seek(entry["offset"])
+            return seg.read(entry["length"]).decode("utf-8")
+
+    def list_files(self, date_str):
+        """
+        列出某天有差异记录的文件
+
+        Returns:
+            list: [(文件相对路径, 记录数), ...]
+        """
+        day_dir = self.day_dir(date_str)
+        if not os.path.isdir(day_dir):
+            return []
+        files = []
+        for name in sorted(os.listdir(day_dir)):
+            if name.endswith(".idx"):
+                entries = _read_index(os.path.join(day_dir, name))
+                if entries:
+                    files.append((entries[0]["file"], len(entries)))
+        return files
+
+    def render_markdown(self, relative_path, date_str):
+        """
+        把某个文件某天的所有差异记录渲染为 Markdown
+
+        Returns:
+            str: Markdown 内容，没有记录时返回空字符串
+        """
+        entries = self.entries(relative_path, date_str)
+        if not entries:
+            return ""
+
+        lines = [
+            "# 文件变更报告\n",
+            f"- **文件路径**: {relative_path}",
+            f"- **日期**: {date_str}",
+            f"- **变更次数**: {len(entries)}\n",
+        ]
+        for entry in entries:
+            lines.append(f"## {entry['timestamp']} {entry['action']}\n")
+            lines.append(f"- **变更摘要**: {entry['summary']}\n")
+            lines.append("```diff")
+            lines.append(self.read_diff(relative_path, date_str, entry))
+            lines.append("```\n")
+        return "\n".join(lines)
+
+
+def _date_of(timestamp):
+    """从时间戳中取出日期，解析失败时使用当前日期"""
+    try:
+        return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").strftime("%Y%m%d")
+    except (TypeError, ValueError):
+        return datetime.now().strftime("%Y%m%d")
+
+
+def _read_index(index_path):
+    """读取索引文件，忽略写入中断留下的不完整行"""
+    entries = []
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def main():
+    """主函数：列出或渲染差异报告"""
+    parser = argparse.ArgumentParser(description="渲染合并存储的差异报告")
+    parser.add_argument("file", nargs="?", help="文件相对路径，不指定时列出当天文件")
+    parser.add_argument(
+        "--date", default=datetime.now().strftime("%Y%m%d"), help="日期 YYYYMMDD"
+    )
+    parser.add_argument("--root", default="daily_reports/diffs", help="存储根目录")
+    parser.add_argument("-o", "--output", help="输出 Markdown 文件路径")
+    args = parser.parse_args()
+
+    store = DiffReportStore(args.root)
+    if not args.file:
+        for relative_path, count in store.list_files(args.date):
+            print(f"{relative_path}\t{count}")
+        return
+
+    markdown = store.render_markdown(args.file, args.date)
+    if not markdown:
+        print(f"没有找到差异记录: {args.file} ({args.date})")
+        sys.exit(1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(markdown)
+        print(f"差异报告已渲染: {args.output}")
+    else:
+        print(markdown)
+
+
+if __name__ == "__main__":
+    main()
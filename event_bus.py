@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件变化事件总线模块
+用固定大小的环形数组保存最近的文件变化事件，每个事件带有递增的序号：
+事件线程发布时只在很短的锁内写入一个槽位，不会被界面阻塞；
+读取方不加锁，按序号取出上次之后的事件，槽位已被新事件覆盖时自动跳过
+"""
+
+import threading
+
+# 默认保留的事件数
+EVENT_BUS_CAPACITY = 10000
+
+
+class EventBus:
+    """有界的文件变化事件环形缓冲区"""
+
+    def __init__(self, capacity=EVENT_BUS_CAPACITY):
+        """
+        初始化事件总线
+
+        Args:
+            capacity (int): 保留的最大事件数，超出后覆盖最旧的事件
+        """
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._lock = threading.Lock()
+        self.sequence = 0
+
+    def publish(self, record):
+        """
+        发布一个事件，事件的 seq 字段为其序号
+
+        Args:
+            record (dict): {"time", "file", "type"}
+
+        Returns:
+            int: 事件序号
+        """
+        with self._lock:
+            seq = self.sequence + 1
+            self._slots[seq % self.capacity] = {**record, "seq": seq}
+            self.sequence = seq
+        return seq
+
+    def since(self, sequence, limit=None):
+        """
+        获取某个序号之后发布的事件
+
+        Args:
+            sequence (int): 调用方已经读到的序号
+            limit (int): 最多返回的事件数，只保留最新的
+
+        Returns:
+            tuple: (当前序号, 新事件列表（从旧到新）, 是否有事件被跳过)；
+                调用方落后超过 limit 或容量、中间的事件已被覆盖时有事件被跳过
+        """
+        head = self.sequence
+        missed = head - sequence
+        if missed <= 0:
+            return head, [], False
+
+        take = min(missed, self.capacity, limit or missed)
+        records = []
+        for seq in range(head - take + 1, head + 1):
+            record = self._slots[seq % self.capacity]
+            # 读取期间槽位可能已被更新的事件覆盖
+            if record is not None and record["seq"] == seq:
+                records.append(record)
+        return head, records, len(records) < missed
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件变化事件存储模块
+后台线程定期从事件总线取出新事件，批量写入带索引的 SQLite 数据库，
+界面按页查询历史事件，支持按路径前缀、事件类型和时间范围过滤以及按列排序，
+浏览大量历史事件时只读取当前页
+"""
+
+import logging
+import sqlite3
+import threading
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time TEXT NOT NULL,
+    path TEXT NOT NULL,
+    action TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_time ON events (time);
+CREATE INDEX IF NOT EXISTS idx_events_path ON events (path, time);
+CREATE INDEX IF NOT EXISTS idx_events_action ON events (action, time);
+"""
+
+# 界面列名到数据库列的映射，只允许按这些列排序
+SORT_COLUMNS = {"time": "time", "file": "path", "type": "action"}
+
+
+def _prefix_upper_bound(prefix):
+    """返回以 prefix 开头的字符串的上界，用于把前缀匹配转换为索引范围查询"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class EventStore:
+    """基于 SQLite 的文件变化事件存储"""
+
+    def __init__(self, db_path=":memory:"):
+        """
+        初始化事件存储
+
+        Args:
+            db_path (str): 数据库文件路径，":memory:" 表示不持久化
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._recorder = None
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add_events(self, records):
+        """
+        在一个事务中写入一批事件
+
+        Args:
+            records (list): [{"time", "file", "type"}, ...]
+
+        Returns:
+            int: 写入的事件数
+        """
+        if not records:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO events (time, path, action) VALUES (?, ?, ?)",
+                [(r["time"], r["file"].replace("\\", "/"), r["type"]) for r in records],
+            )
+        return len(records)
+
+    def query(
+        self,
+        path_prefix=None,
+        action=None,
+        since=None,
+        until=None,
+        sort_by="time",
+        descending=True,
+        offset=0,
+        limit=50,
+    ):
+        """
+        分页查询事件
+
+        Args:
+            path_prefix (str): 只返回路径以此开头的事件
+            action (str): 只返回该类型的事件
+            since (str): 起始时间（含），格式为 "YYYY-MM-DD HH:MM:SS"，可以只写前缀
+            until (str): 结束时间（含），格式同上
+            sort_by (str): 排序列，"time"、"file" 或 "type"
+            descending (bool): 是否降序
+            offset (int): 跳过的事件数
+            limit (int): 返回的最大事件数
+
+        Returns:
+            tuple: (当前页的事件列表, 满足条件的事件总数)
+        """
+        conditions, params = [], []
+        if path_prefix:
+            path_prefix = path_prefix.replace("\\", "/")
+            conditions.append("path >= ? AND path < ?")
+            params += [path_prefix, _prefix_upper_bound(path_prefix)]
+        if action:
+            conditions.append("action = ?")
+            params.append(action)
+        if since:
+            conditions.append("time >= ?")
+            params.append(since)
+        if until:
+            # 只写日期或到分钟时，包含这段时间内的所有事件
+            conditions.append("time < ?")
+            params.append(_prefix_upper_bound(until))
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        column = SORT_COLUMNS.get(sort_by, "time")
+        order = "DESC" if descending else "ASC"
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM events{where}", params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT id, time, path, action FROM events{where}"
+                f" ORDER BY {column} {order}, id {order} LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        events = [
+            {"id": row[0], "time": row[1], "file": row[2], "type": row[3]}
+            for row in rows
+        ]
+        return events, total
+
+    def purge(self, before):
+        """
+        删除早于指定时间的事件
+
+        Args:
+            before (str): 时间，格式为 "YYYY-MM-DD HH:MM:SS"
+
+        Returns:
+            int: 删除的事件数
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM events WHERE time < ?", (before,))
+        if cursor.rowcount:
+            logger.info(f"事件存储清理了 {cursor.rowcount} 个过期事件")
+        return cursor.rowcount
+
+    def start_recording(self, event_bus, interval=1.0):
+        """
+        启动后台线程，定期把事件总线中的新事件写入数据库
+
+        事件总线被覆盖的事件无法补回，写入速度跟不上时会记录警告
+
+        Args:
+            event_bus (EventBus): 事件总线
+            interval (float): 检查新事件的间隔（秒）
+        """
+        if self._recorder is not None:
+            return
+        self._recorder = threading.Thread(
+            target=self._record_loop,
+            args=(event_bus, interval),
+            name="event-store-recorder",
+            daemon=True,
+        )
+        self._recorder.start()
+
+    def _record_loop(self, event_bus, interval):
+        """后台写入循环"""
+        sequence = event_bus.sequence
+        while True:
+            stopping = self._stop_event.wait(interval)
+            try:
+                sequence, records, skipped = event_bus.since(sequence)
+                if skipped:
+                    logger.warning("事件存储写入落后，部分事件已被事件总线覆盖")
+                self.add_events(records)
+            except Exception as e:
+                logger.error(f"写入事件存储失败: {e}")
+            if stopping:
+                return
+
+    def close(self):
+        """停止后台写入（写入剩余事件）并关闭数据库"""
+        self._stop_event.set()
+        if self._recorder is not None:
+            self._recorder.join()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+qwen CLI 替身
+实现 generate_report.py 使用的一次性命令模式和会话行协议，用于在没有 Node.js
+和 qwen 的环境中测试会话池
+
+参数:
+    --version: 输出版本号
+    --session: 使用会话行协议（对应 QWEN_SESSION_PROTOCOL=1）
+
+环境变量:
+    FAKE_QWEN_DELAY: 每条响应前的延迟（秒）
+    FAKE_QWEN_EXIT_AFTER: 处理 N 条消息后退出，用于模拟进程崩溃
+"""
+
+import os
+import sys
+import time
+
+FAKE_REPORT = """# 日报
+
+## 今日工作内容
+{summary}
+
+## 遇到的问题及解决方案
+无
+
+## 明日工作计划
+继续推进
+
+## 备注
+由 fake_qwen_cli 生成（进程 {pid}）"""
+
+
+def reply(message):
+    """根据消息生成固定格式的日报"""
+    summary = f"收到 {len(message)} 个字符的输入"
+    return FAKE_REPORT.format(summary=summary, pid=os.getpid())
+
+
+def escape_line(text):
+    """把多行文本转义为一行"""
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def main():
+    """主函数"""
+    delay = float(os.environ.get("FAKE_QWEN_DELAY", "0"))
+    exit_after = int(os.environ.get("FAKE_QWEN_EXIT_AFTER", "0"))
+
+    args = sys.argv[1:]
+    if "--version" in args:
+        print("0.0.0-fake")
+        return
+    if "--session" not in args:
+        # 一次性命令模式：提示词来自命令行参数，没有参数时读取全部标准输入
+        message = args[0] if args else sys.stdin.buffer.read().decode("utf-8")
+        time.sleep(delay)
+        print(reply(message))
+        return
+
+    # 会话模式：每行一条消息，每条消息回复一行
+    handled = 0
+    for line in sys.stdin:
+        message = line.rstrip("\n")
+        if message == "/exit":
+            break
+        time.sleep(delay)
+        sys.stdout.write(escape_line(reply(message)) + "\n")
+        sys.stdout.flush()
+        handled += 1
+        if exit_after and handled >= exit_after:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
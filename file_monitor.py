@@ -8,33 +8,46 @@ import socketserver
 import threading
 import time
 import urllib.parse
-from datetime import datetime
+from datetime import datetime, timedelta
 
-import requests
 import schedule
 
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("file_changes.log", encoding="utf-8"),
-        logging.StreamHandler(),
-    ],
+from ai_dispatcher import AIReportDispatcher
+from ai_outbox import AIOutbox
+from debug_tools import ProfileBusyError, format_collapsed, sample_stacks, thread_stacks
+from diff_store import DiffReportStore
+from event_bus import EventBus
+from event_store import EventStore
+from git_manager import GIT_AVAILABLE, get_git_manager
+from logging_setup import setup_logging
+from report_writer import DailyReportWriter
+from retention import DEFAULT_TIERS, RetentionPolicy, prune_version_dirs, version_name
+
+# 日志配置
+LOG_FILE = "file_changes.log"  # 文本日志文件（日报生成和 log_ingest 解析该文件）
+LOG_MAX_BYTES = 10 * 1024 * 1024  # 日志文件超过该大小后轮转
+LOG_BACKUP_COUNT = 5  # 保留的轮转日志文件数
+LOG_ROTATE_WHEN = None  # 按时间轮转的周期（如 "midnight"），设置后不再按大小轮转
+LOG_JSON_FILE = None  # 同时输出的 JSON Lines 日志文件（如 "file_changes.log.jsonl"）
+LOG_CONSOLE_RATE_LIMIT = 50  # 控制台每秒最多输出的 INFO 日志条数，0 表示不限速
+
+# 配置日志：记录先进入队列，由后台线程写文件和控制台，不阻塞事件线程
+setup_logging(
+    LOG_FILE,
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT,
+    rotate_when=LOG_ROTATE_WHEN,
+    json_path=LOG_JSON_FILE,
+    console_rate_limit=LOG_CONSOLE_RATE_LIMIT,
 )
 
 logger = logging.getLogger(__name__)
 
-# 尝试导入 Git 管理模块
-try:
-    from git_manager import get_git_manager
-
-    GIT_AVAILABLE = True
-except ImportError:
-    GIT_AVAILABLE = False
+# Git 管理模块延迟导入 GitPython、延迟打开仓库，导入时只检查依赖是否存在
+if not GIT_AVAILABLE:
     logger.warning("Git 管理模块不可用，将使用文件缓存机制")
 
 # 配置变量
@@ -43,6 +56,142 @@ AI_API_URL = "http://example.com/api/report"  # AI接口URL（请替换为实际
 REPORT_SAVE_PATH = "daily_reports/"  # 日报保存路径
 WEB_PORT = 8080  # Web服务端口
 CACHE_DIR = ".file_cache/"  # 文件缓存目录
+AI_API_ENABLED = False  # 是否真正调用AI接口（False 时使用本地模拟结果）
+AI_BATCH_SIZE = 50  # 每批发送给AI接口的最大事件数
+AI_BATCH_INTERVAL = 5.0  # 批次窗口时长（秒）
+AI_REQUEST_TIMEOUT = 10.0  # AI接口请求超时时间（秒）
+AI_MAX_RETRIES = 3  # AI接口请求失败后的最大重试次数
+AI_OUTBOX_PATH = ".ai_outbox.db"  # AI日报发件箱（持久化待发送事件）
+AI_MAX_IN_FLIGHT = 2  # 同时发送中的AI请求批次上限
+REPORT_FLUSH_SIZE = 64 * 1024  # 日报缓冲区刷新阈值（字节）
+REPORT_FLUSH_INTERVAL = 1.0  # 日报缓冲内容最长停留时间（秒）
+GIT_GC_TIME = "03:00"  # 每天整理影子仓库的时间
+DIFF_REPORT_DIR = os.path.join(REPORT_SAVE_PATH, "diffs")  # 合并差异报告目录
+CACHE_VERSIONS_DIR = os.path.join(CACHE_DIR, ".versions")  # 文件缓存的历史版本目录
+RETENTION_TIERS = DEFAULT_TIERS  # 历史版本保留策略: [(最大年龄秒数, 分桶秒数), ...]
+EVENT_BUS_CAPACITY = 10000  # 事件总线保留的最近文件变化事件数
+EVENT_STORE_PATH = ".file_events.db"  # 文件变化历史事件数据库（供界面分页查询）
+EVENT_STORE_RETENTION_DAYS = 90  # 历史事件保留天数
+DEBUG_ENDPOINTS_ENABLED = False  # 是否开启 /debug/profile 和 /debug/threads 诊断接口
+DEBUG_PROFILE_MAX_SECONDS = 60  # 单次调用栈采样的最长时间（秒）
+
+# 监控程序自身写入的文件，不作为文件变化处理，避免事件循环触发
+# （按前缀匹配，LOG_FILE 同时覆盖轮转后的 file_changes.log.1 等文件）
+IGNORED_PATHS = [
+    LOG_FILE,
+    REPORT_SAVE_PATH,
+    CACHE_DIR,
+    AI_OUTBOX_PATH,
+    EVENT_STORE_PATH,
+    ".log_ingest/",
+    ".summary_cache/",
+    ".file_monitor_git/",
+    ".git/",
+]
+if LOG_JSON_FILE:
+    IGNORED_PATHS.append(LOG_JSON_FILE)
+
+_ai_dispatcher = None
+_ai_dispatcher_lock = threading.Lock()
+_report_writer = None
+_report_writer_lock = threading.Lock()
+_diff_store = DiffReportStore(DIFF_REPORT_DIR)
+_event_bus = EventBus(EVENT_BUS_CAPACITY)
+_event_store = None
+_event_store_lock = threading.Lock()
+
+
+def get_ai_dispatcher():
+    """
+    获取全局 AI 日报分发器实例（首次调用时创建）
+
+    Returns:
+        AIReportDispatcher: AI 日报分发器实例
+    """
+    global _ai_dispatcher
+    with _ai_dispatcher_lock:
+        if _ai_dispatcher is None:
+            _ai_dispatcher = AIReportDispatcher(
+                AI_API_URL,
+                on_reports=save_ai_reports,
+                enabled=AI_API_ENABLED,
+                batch_size=AI_BATCH_SIZE,
+                batch_interval=AI_BATCH_INTERVAL,
+                timeout=AI_REQUEST_TIMEOUT,
+                max_retries=AI_MAX_RETRIES,
+                outbox=AIOutbox(AI_OUTBOX_PATH),
+                max_in_flight=AI_MAX_IN_FLIGHT,
+            )
+        return _ai_dispatcher
+
+
+def get_report_writer():
+    """
+    获取全局日报写入器实例（首次调用时创建）
+
+    Returns:
+        DailyReportWriter: 日报写入器实例
+    """
+    global _report_writer
+    with _report_writer_lock:
+        if _report_writer is None:
+            _report_writer = DailyReportWriter(
+                REPORT_SAVE_PATH,
+                flush_size=REPORT_FLUSH_SIZE,
+                flush_interval=REPORT_FLUSH_INTERVAL,
+            )
+        return _report_writer
+
+
+def get_diff_store():
+    """
+    获取全局差异报告存储实例
+
+    Returns:
+        DiffReportStore: 差异报告存储实例
+    """
+    return _diff_store
+
+
+def get_event_bus():
+    """
+    获取全局文件变化事件总线
+
+    Returns:
+        EventBus: 事件总线实例
+    """
+    return _event_bus
+
+
+def get_event_store():
+    """
+    获取全局文件变化事件存储实例（首次调用时创建并开始记录事件总线中的事件）
+
+    Returns:
+        EventStore: 事件存储实例
+    """
+    global _event_store
+    with _event_store_lock:
+        if _event_store is None:
+            _event_store = EventStore(EVENT_STORE_PATH)
+            _event_store.start_recording(get_event_bus())
+        return _event_store
+
+
+def purge_old_events():
+    """删除超过保留天数的历史事件"""
+    cutoff = datetime.now() - timedelta(days=EVENT_STORE_RETENTION_DAYS)
+    get_event_store().purge(cutoff.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def should_ignore(relative_path):
+    """判断文件是否为监控程序自身的输出"""
+    normalized = relative_path.replace(os.sep, "/")
+    for ignored in IGNORED_PATHS:
+        ignored = ignored.replace(os.sep, "/")
+        if normalized == ignored.rstrip("/") or normalized.startswith(ignored):
+            return True
+    return False
 
 
 class FileChangeHandler(FileSystemEventHandler):
@@ -51,12 +200,17 @@ class FileChangeHandler(FileSystemEventHandler):
     def __init__(self):
         """初始化文件缓存目录"""
         super().__init__()
-        self.git_manager = None
-        if GIT_AVAILABLE:
-            self.git_manager = get_git_manager()
-        else:
+        if not GIT_AVAILABLE:
             os.makedirs(CACHE_DIR, exist_ok=True)
 
+        # AI 日报经发件箱在后台按批次发送，不阻塞事件线程
+        self.ai_dispatcher = get_ai_dispatcher()
+
+    @property
+    def git_manager(self):
+        """Git 管理器，第一次处理文件变化时才打开仓库"""
+        return get_git_manager() if GIT_AVAILABLE else None
+
     def on_created(self, event):
         """处理文件创建事件"""
         if not event.is_directory:
@@ -76,7 +230,12 @@ class FileChangeHandler(FileSystemEventHandler):
         """记录文件变化到日志"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         relative_path = os.path.relpath(file_path, MONITOR_DIR)
+        if should_ignore(relative_path):
+            return
         logger.info(f"{action}: {relative_path}")
+        get_event_bus().publish(
+            {"time": timestamp, "file": relative_path, "type": action}
+        )
 
         # 对于修改和创建的文件，生成差异报告
         if action in ["MODIFIED", "CREATED"]:
@@ -120,7 +279,9 @@ class FileChangeHandler(FileSystemEventHandler):
                     )
 
             # 提交更改
-            self.git_manager.commit_changes(f"File {action}: {relative_path}")
+            self.git_manager.commit_changes(
+                f"File {action}: {relative_path}", paths=[relative_path]
+            )
         except Exception as e:
             logger.error(f"使用 Git 生成差异报告失败: {e}")
 
@@ -158,10 +319,12 @@ class FileChangeHandler(FileSystemEventHandler):
         )
 
         # 更新缓存
-        self.update_cache(file_path, relative_path)
+        content = self.update_cache(file_path, relative_path)
 
-        # 如果有差异，生成报告
+        # 如果有差异，保存历史版本并生成报告（内容未变化时不重复保存版本）
         if diff:
+            if content is not None:
+                self.save_cache_version(relative_path, content)
             self.save_diff_report(diff, relative_path, action, timestamp)
 
     def get_cache_file_path(self, relative_path):
@@ -173,61 +336,50 @@ class FileChangeHandler(FileSystemEventHandler):
         return cache_file_path
 
     def update_cache(self, file_path, relative_path):
-        """更新文件缓存"""
+        """
+        更新文件缓存
+
+        Returns:
+            bytes: 写入缓存的文件内容，失败时返回 None
+        """
         try:
             cache_file_path = self.get_cache_file_path(relative_path)
             # 复制文件到缓存目录
-            with open(file_path, "rb") as src, open(cache_file_path, "wb") as dst:
-                dst.write(src.read())
+            with open(file_path, "rb") as src:
+                content = src.read()
+            with open(cache_file_path, "wb") as dst:
+                dst.write(content)
+            return content
         except Exception as e:
             logger.warning(f"无法更新缓存文件 {relative_path}: {e}")
+            return None
+
+    def save_cache_version(self, relative_path, content):
+        """保存文件内容的一个历史版本，由保留策略定期清理"""
+        try:
+            version_dir = os.path.join(CACHE_VERSIONS_DIR, relative_path)
+            os.makedirs(version_dir, exist_ok=True)
+            with open(os.path.join(version_dir, version_name()), "wb") as dst:
+                dst.write(content)
+        except Exception as e:
+            logger.warning(f"无法保存缓存版本 {relative_path}: {e}")
 
     def save_diff_report(self, diff_lines, relative_path, action, timestamp):
-        """保存差异报告到MD文件"""
+        """追加差异记录到该文件当天的合并报告（需要时再渲染为Markdown）"""
         try:
             # 生成简洁的变更摘要
             summary = self.generate_summary(diff_lines, action)
 
-            # 创建报告文件名：文件名_日期_变更摘要.md
-            date_str = datetime.now().strftime("%Y%m%d")
-            # 清理文件名中的特殊字符
-            clean_relative_path = (
-                relative_path.replace(os.sep, "_").replace("/", "_").replace("\\", "_")
-            )
-            clean_summary = "".join(
-                c for c in summary if c.isalnum() or c in (" ", "-", "_")
-            ).rstrip()
-            # 限制摘要长度
-            clean_summary = (
-                clean_summary[:50] if len(clean_summary) > 50 else clean_summary
-            )
-
-            report_filename = f"{clean_relative_path}_{date_str}_{clean_summary}.md"
-            report_path = os.path.join(REPORT_SAVE_PATH, report_filename)
-
-            # 确保报告目录存在
-            os.makedirs(REPORT_SAVE_PATH, exist_ok=True)
-
-            # 写入MD格式的报告
-            with open(report_path, "w", encoding="utf-8") as f:
-                f.write(f"# 文件变更报告\n\n")
-                f.write(f"- **文件路径**: {relative_path}\n")
-                f.write(f"- **变更类型**: {action}\n")
-                f.write(f"- **变更时间**: {timestamp}\n")
-                f.write(f"- **变更摘要**: {summary}\n\n")
-                f.write(f"## 差异详情\n\n")
+            # 检查 diff_lines 是否已经是字符串列表
+            if isinstance(diff_lines, list):
+                diff_content = "\n".join(diff_lines)
+            else:
+                diff_content = str(diff_lines)
 
-                # 检查 diff_lines 是否已经是字符串列表
-                if isinstance(diff_lines, list):
-                    diff_content = "\n".join(diff_lines)
-                else:
-                    diff_content = str(diff_lines)
-
-                f.write("```diff\n")
-                f.write(diff_content)
-                f.write("\n```\n")
-
-            logger.info(f"差异报告已保存: {report_filename}")
+            segment_path = get_diff_store().append(
+                relative_path, action, timestamp, summary, diff_content
+            )
+            logger.info(f"差异报告已保存: {segment_path}")
         except Exception as e:
             logger.error(f"保存差异报告失败: {e}")
 
@@ -257,60 +409,73 @@ class FileChangeHandler(FileSystemEventHandler):
         return True
 
     def call_ai_api(self, action, file_path, timestamp):
-        """调用AI接口生成日报"""
+        """将事件提交给AI分发器，由后台线程批量调用AI接口生成日报"""
         try:
-            # 准备发送给AI接口的数据
             data = {"action": action, "file_path": file_path, "timestamp": timestamp}
-
-            # 调用AI接口（这里只是示例，请替换为实际的API调用）
-            # response = requests.post(AI_API_URL, json=data)
-            # ai_response = response.json()
-
-            # 模拟AI返回结果
-            ai_response = {
-                "summary": f"在{timestamp}检测到文件{file_path}被{action}",
-                "details": f"文件 {file_path} 的{action.lower()}操作已被记录",
-            }
-
-            # 保存AI生成的日报
-            self.save_daily_report(ai_response, timestamp)
-
-            logger.info("AI日报已生成并保存")
+            self.ai_dispatcher.submit(data)
         except Exception as e:
             logger.error(f"调用AI接口失败: {e}")
 
     def save_daily_report(self, ai_response, timestamp):
         """保存AI生成的日报"""
-        # 确保保存目录存在
-        os.makedirs(REPORT_SAVE_PATH, exist_ok=True)
+        save_daily_report(ai_response, timestamp)
+
+
+def save_ai_reports(results):
+    """保存一个批次的AI返回结果"""
+    for event, ai_response in results:
+        save_daily_report(ai_response, event["timestamp"])
 
-        # 创建日报文件名
-        date_str = datetime.now().strftime("%Y%m%d")
-        report_filename = f"daily_report_{date_str}.txt"
-        report_path = os.path.join(REPORT_SAVE_PATH, report_filename)
+    logger.info(f"AI日报已生成并保存: {len(results)} 条")
 
-        # 写入日报内容
-        with open(report_path, "a", encoding="utf-8") as f:
-            f.write(f"\n--- {timestamp} ---\n")
-            f.write(f"摘要: {ai_response.get('summary', '')}\n")
-            f.write(f"详情: {ai_response.get('details', '')}\n")
-            f.write("-" * 30 + "\n")
+
+def save_daily_report(ai_response, timestamp):
+    """保存AI生成的日报"""
+    # 整条记录一次写入缓冲区，由日报写入器批量落盘
+    record = (
+        f"\n--- {timestamp} ---\n"
+        f"摘要: {ai_response.get('summary', '')}\n"
+        f"详情: {ai_response.get('details', '')}\n" + "-" * 30 + "\n"
+    )
+    get_report_writer().write_record(record)
 
 
 class RequestHandler(http.server.BaseHTTPRequestHandler):
     """处理HTTP请求"""
 
+    # 路由表: (请求方法, 路径) -> (处理方法名, 是否为诊断接口)
+    ROUTES = {
+        ("GET", "/status"): ("handle_status", False),
+        ("GET", "/scan"): ("handle_manual_scan", False),
+        ("GET", "/debug/threads"): ("handle_debug_threads", True),
+        ("POST", "/debug/profile"): ("handle_debug_profile", True),
+    }
+
     def do_GET(self):
         """处理GET请求"""
-        parsed_path = urllib.parse.urlparse(self.path)
-        path = parsed_path.path
+        self.dispatch("GET")
 
-        if path == "/status":
-            self.handle_status()
-        elif path == "/scan":
-            self.handle_manual_scan()
-        else:
+    def do_POST(self):
+        """处理POST请求"""
+        self.dispatch("POST")
+
+    def dispatch(self, method):
+        """按路由表调用处理方法，诊断接口未开启或非本机访问时视为不存在"""
+        path = urllib.parse.urlparse(self.path).path
+        route = self.ROUTES.get((method, path))
+        if route is None or (route[1] and not self.debug_allowed()):
             self.handle_not_found()
+            return
+        getattr(self, route[0])()
+
+    def available_endpoints(self):
+        """返回当前客户端可以使用的接口路径"""
+        debug_allowed = self.debug_allowed()
+        return [
+            f"{method} {path}" if method != "GET" else path
+            for (method, path), (_, debug) in self.ROUTES.items()
+            if debug_allowed or not debug
+        ]
 
     def handle_status(self):
         """处理状态查询请求"""
@@ -324,6 +489,17 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
 
+        # 影子仓库的对象和 pack 统计
+        if GIT_AVAILABLE:
+            status["git_objects"] = get_git_manager().object_stats()
+            status["git_pending_writes"] = get_git_manager().pending_writes()
+
+        # AI 日报发件箱的积压和投递速率
+        try:
+            status["ai_outbox"] = get_ai_dispatcher().status()
+        except Exception as e:
+            status["ai_outbox"] = {"error": str(e)}
+
         self.wfile.write(json.dumps(status, ensure_ascii=False).encode("utf-8"))
 
     def handle_manual_scan(self):
@@ -359,6 +535,62 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
                 json.dumps(error_response, ensure_ascii=False).encode("utf-8")
             )
 
+    def debug_allowed(self):
+        """诊断接口默认关闭，开启后也只允许本机访问"""
+        return DEBUG_ENDPOINTS_ENABLED and self.client_address[0] in (
+            "127.0.0.1",
+            "::1",
+        )
+
+    def handle_debug_threads(self):
+        """返回所有线程当前的调用栈和各队列的积压情况"""
+        queues = {"event_bus_sequence": get_event_bus().sequence}
+        if GIT_AVAILABLE:
+            queues["git_pending_writes"] = get_git_manager().pending_writes()
+        try:
+            queues["ai_outbox"] = get_ai_dispatcher().status()
+        except Exception as e:
+            queues["ai_outbox"] = {"error": str(e)}
+
+        self.send_response(200)
+        self.send_header("Content-type", "application/json")
+        self.end_headers()
+        response = {"threads": thread_stacks(), "queues": queues}
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+
+    def handle_debug_profile(self):
+        """对整个进程采样 seconds 秒，返回 collapsed stack 文本"""
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        try:
+            seconds = float(query.get("seconds", ["5"])[0])
+        except ValueError:
+            seconds = -1
+        if not 0 < seconds <= DEBUG_PROFILE_MAX_SECONDS:
+            self.send_debug_error(
+                400, f"seconds 必须在 0 到 {DEBUG_PROFILE_MAX_SECONDS} 之间"
+            )
+            return
+        try:
+            stacks, samples = sample_stacks(seconds)
+        except ProfileBusyError as e:
+            self.send_debug_error(409, str(e))
+            return
+
+        body = format_collapsed(stacks).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-type", "text/plain; charset=utf-8")
+        self.send_header("X-Profile-Samples", str(samples))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_debug_error(self, code, message):
+        """返回诊断接口的错误信息"""
+        self.send_response(code)
+        self.send_header("Content-type", "application/json")
+        self.end_headers()
+        response = {"status": "error", "message": message}
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+
     def handle_not_found(self):
         """处理未找到的请求"""
         self.send_response(404)
@@ -368,7 +600,7 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
         response = {
             "status": "error",
             "message": "接口不存在",
-            "available_endpoints": ["/status", "/scan"],
+            "available_endpoints": self.available_endpoints(),
         }
 
         self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8"))
@@ -381,8 +613,13 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
         )
 
 
-def full_scan():
-    """全量扫描目录并与日志记录对比"""
+def full_scan(progress=None):
+    """
+    全量扫描目录并与日志记录对比
+
+    Args:
+        progress (callable): 进度回调 progress(已扫描文件数, 当前目录)，每扫描完一个目录调用一次
+    """
     logger.info("开始执行全量扫描...")
 
     # 获取当前目录下所有文件
@@ -391,10 +628,12 @@ def full_scan():
         for file in files:
             relative_path = os.path.relpath(os.path.join(root, file), MONITOR_DIR)
             # 排除日志文件和报告文件
-            if not relative_path.startswith(
-                "file_changes.log"
-            ) and not relative_path.startswith(REPORT_SAVE_PATH):
+            if not relative_path.startswith(LOG_FILE) and not relative_path.startswith(
+                REPORT_SAVE_PATH
+            ):
                 current_files.append(relative_path)
+        if progress:
+            progress(len(current_files), os.path.relpath(root, MONITOR_DIR))
 
     logger.info(f"当前目录中共有 {len(current_files)} 个文件")
 
@@ -421,21 +660,24 @@ def generate_scan_report(files, timestamp):
 
 def save_daily_report_from_scan(report_data, timestamp):
     """从扫描结果保存日报"""
-    # 确保保存目录存在
-    os.makedirs(REPORT_SAVE_PATH, exist_ok=True)
-
-    # 创建日报文件名
-    date_str = datetime.now().strftime("%Y%m%d")
-    report_filename = f"daily_report_{date_str}.txt"
-    report_path = os.path.join(REPORT_SAVE_PATH, report_filename)
-
-    # 写入日报内容
-    with open(report_path, "a", encoding="utf-8") as f:
-        f.write(f"\n--- {timestamp} (全量扫描) ---\n")
-        f.write(f"摘要: {report_data.get('summary', '')}\n")
-        f.write(f"文件数: {report_data.get('file_count', 0)}\n")
-        f.write(f"详情: {report_data.get('details', '')}\n")
-        f.write("-" * 30 + "\n")
+    record = (
+        f"\n--- {timestamp} (全量扫描) ---\n"
+        f"摘要: {report_data.get('summary', '')}\n"
+        f"文件数: {report_data.get('file_count', 0)}\n"
+        f"详情: {report_data.get('details', '')}\n" + "-" * 30 + "\n"
+    )
+    writer = get_report_writer()
+    writer.write_record(record)
+    # 全量扫描频率低，立即落盘便于接口调用方读取
+    writer.flush()
+
+
+def apply_retention():
+    """按保留策略压缩影子仓库历史并清理文件缓存的历史版本"""
+    policy = RetentionPolicy(RETENTION_TIERS)
+    if GIT_AVAILABLE:
+        get_git_manager().compact_history(policy)
+    prune_version_dirs(CACHE_VERSIONS_DIR, policy)
 
 
 def setup_schedule():
@@ -443,6 +685,15 @@ def setup_schedule():
     # 设置每天7:00和17:00执行全量扫描
     schedule.every().day.at("07:00").do(full_scan)
     schedule.every().day.at("17:00").do(full_scan)
+    # 每天整理一次影子仓库，控制 pack 数量和对象查找代价
+    if GIT_AVAILABLE:
+        schedule.every().day.at(GIT_GC_TIME).do(lambda: get_git_manager().run_gc())
+    # 清理发件箱中已投递的历史条目
+    schedule.every().hour.do(lambda: get_ai_dispatcher().outbox.purge_delivered())
+    # 按保留策略清理历史版本，使存储增长有界
+    schedule.every().hour.do(apply_retention)
+    # 清理过期的历史事件
+    schedule.every().day.at(GIT_GC_TIME).do(purge_old_events)
 
     logger.info("定时任务已设置: 每天07:00和17:00执行全量扫描")
 
@@ -450,7 +701,9 @@ def setup_schedule():
 def start_web_server():
     """启动Web服务"""
     try:
-        with socketserver.TCPServer(("", WEB_PORT), RequestHandler) as httpd:
+        # 每个请求在独立线程中处理，采样期间其他接口仍可访问
+        with socketserver.ThreadingTCPServer(("", WEB_PORT), RequestHandler) as httpd:
+            httpd.daemon_threads = True
             logger.info(f"Web服务已启动，监听端口: {WEB_PORT}")
             httpd.serve_forever()
     except Exception as e:
@@ -460,6 +713,8 @@ def start_web_server():
 def start_monitoring():
     """启动文件监控"""
     event_handler = FileChangeHandler()
+    # 文件变化事件同时写入历史事件存储，供界面分页查询
+    get_event_store()
     observer = Observer()
     observer.schedule(event_handler, MONITOR_DIR, recursive=True)
     observer.start()
@@ -476,6 +731,13 @@ def start_monitoring():
         logger.info("监控已停止")
     finally:
         observer.join()
+        event_handler.ai_dispatcher.stop()
+        event_handler.ai_dispatcher.outbox.close()
+        get_report_writer().close()
+        get_event_store().close()
+        if GIT_AVAILABLE:
+            # 等待排队的提交完成，关闭写线程和各读线程的 Repo 对象
+            get_git_manager().close()
 
 
 def main():
@@ -1,57 +1,153 @@
 import json
 import os
+import queue
+import shlex
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
 from shutil import which
 
-# qwen CLI 的 JavaScript 入口文件路径
-QWEN_JS_PATH = r"C:\Users\P30015874206\AppData\Roaming\npm\node_modules\@qwen-code\qwen-code\cli.js"
+from log_ingest import LogIngester
+from summary_cache import SummaryCache
+
+# qwen CLI 的 JavaScript 入口文件路径（可通过环境变量覆盖）
+QWEN_JS_PATH = os.environ.get(
+    "QWEN_JS_PATH",
+    r"C:\Users\P30015874206\AppData\Roaming\npm\node_modules"
+    r"\@qwen-code\qwen-code\cli.js",
+)
+# 完整的 qwen 启动命令，设置后不再使用 node + QWEN_JS_PATH（测试时指向 fake_qwen_cli.py）
+QWEN_CLI_COMMAND = os.environ.get("QWEN_CLI_COMMAND", "")
+# qwen 命令支持会话行协议时设为 1，复用常驻进程；默认每次请求启动一次性命令
+QWEN_SESSION_PROTOCOL = os.environ.get("QWEN_SESSION_PROTOCOL", "") == "1"
+QWEN_HEALTH_TTL = 600  # qwen 可用性检查结果的缓存时间（秒）
+QWEN_HEALTH_CACHE = ".qwen_health.json"  # 可用性检查结果缓存文件
+QWEN_POOL_SIZE = 2  # qwen 会话池大小
+QWEN_REQUEST_TIMEOUT = 120  # 单次请求超时时间（秒）
+REPORT_TOKEN_BUDGET = 8000  # 单个提示词的 token 预算，超出时分块摘要
+REPORT_MAP_WORKERS = min(4, os.cpu_count() or 1)  # 分块摘要的工作进程数
+REPORT_MAX_REDUCE_ROUNDS = 3  # 摘要仍超出预算时最多再归并的轮数
+REPORT_CHUNK_FALLBACK_CHARS = 500  # 分块摘要失败时保留的原文字符数
+REPORT_PROMPT_VERSION = 1  # 提示词版本，修改提示词后递增使摘要缓存失效
+SUMMARY_CACHE_DIR = ".summary_cache"  # 摘要缓存目录
+SUMMARY_CACHE_MAX_BYTES = 50 * 1024 * 1024  # 摘要缓存大小上限（字节）
+
+_health_cache = {}
+
+
+def qwen_command():
+    """
+    获取启动 qwen CLI 的命令
+
+    Returns:
+        list: 命令参数列表，qwen 不可用时返回 None
+    """
+    if QWEN_CLI_COMMAND:
+        return shlex.split(QWEN_CLI_COMMAND, posix=os.name != "nt")
+
+    # 检查 node 是否可用
+    node_path = which("node")
+    if not node_path:
+        print("未找到 Node.js，请确保已正确安装")
+        return None
+
+    # 检查 qwen JS 文件是否存在
+    if not os.path.exists(QWEN_JS_PATH):
+        print(f"未找到 qwen CLI 入口文件: {QWEN_JS_PATH}")
+        return None
+
+    return [node_path, QWEN_JS_PATH]
 
 
 class QwenChatSession:
-    def __init__(self):
+    """
+    常驻的 qwen 会话进程
+
+    会话使用行协议通信：每条消息和每条响应各占一行，其中的换行符转义为 \\n，
+    只用于支持该协议的命令（QWEN_SESSION_PROTOCOL=1）
+    """
+
+    def __init__(self, command=None):
         self.session_id = None
         self.process = None
+        self.command = command
+        self._responses = None
 
     def start_session(self):
         """启动一个新的 qwen 会话"""
         try:
-            # 检查 node 是否可用
-            node_path = which("node")
-            if not node_path:
-                print("未找到 Node.js，请确保已正确安装")
+            command = self.command or qwen_command()
+            if not command:
                 return False
 
             # 启动 qwen 进程
             self.process = subprocess.Popen(
-                [node_path, QWEN_JS_PATH],
+                command,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True,
+                encoding="utf-8",
                 bufsize=1,
-                universal_newlines=True,
             )
+            self.session_id = self.process.pid
+
+            # 后台线程读取输出，使 send_message 可以按超时等待
+            self._responses = queue.Queue()
+            threading.Thread(
+                target=self._read_output,
+                args=(self.process, self._responses),
+                daemon=True,
+            ).start()
             return True
         except Exception as e:
             print(f"启动会话失败: {e}")
             return False
 
-    def send_message(self, message):
-        """发送消息到会话"""
+    @staticmethod
+    def _read_output(process, responses):
+        """读取会话输出，进程退出时放入 None"""
+        for line in process.stdout:
+            responses.put(line)
+        responses.put(None)
+
+    def is_alive(self):
+        """检查会话进程是否仍在运行"""
+        return self.process is not None and self.process.poll() is None
+
+    def send_message(self, message, timeout=None):
+        """
+        发送消息到会话
+
+        Args:
+            message (str): 消息内容
+            timeout (float): 等待响应的超时时间（秒），None 表示一直等待
+
+        Returns:
+            str: 响应内容，失败或超时返回 None
+        """
         if not self.process:
             print("会话未启动")
             return None
 
         try:
             # 发送消息并获取响应
-            self.process.stdin.write(message + "\n")
+            self.process.stdin.write(_escape_line(message) + "\n")
             self.process.stdin.flush()
 
             # 读取响应
-            response = self.process.stdout.readline()
-            return response.strip()
+            response = self._responses.get(timeout=timeout)
+            if response is None:
+                print("会话进程已退出")
+                return None
+            return _unescape_line(response.rstrip("\n"))
+        except queue.Empty:
+            print(f"等待会话响应超时 ({timeout}s)")
+            return None
         except Exception as e:
             print(f"发送消息失败: {e}")
             return None
@@ -63,11 +159,221 @@ class QwenChatSession:
                 self.process.stdin.write("/exit\n")
                 self.process.stdin.flush()
                 self.process.wait(timeout=5)
-            except:
+            except Exception:
                 self.process.kill()
+                self.process.wait()
             self.process = None
 
 
+def _escape_line(text):
+    """把多行文本转义为一行"""
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _unescape_line(line):
+    """还原 _escape_line 转义的文本"""
+    result = []
+    chars = iter(line)
+    for c in chars:
+        if c == "\\":
+            nxt = next(chars, "")
+            result.append("\n" if nxt == "n" else nxt)
+        else:
+            result.append(c)
+    return "".join(result)
+
+
+class QwenSessionPool:
+    """
+    qwen 会话池：限制同时进行的请求数，失败时重试
+
+    命令支持会话行协议时复用常驻进程，自动替换崩溃或超时的会话；
+    否则每次请求以一次性命令模式运行（提示词写入标准输入，读取全部输出）
+    """
+
+    def __init__(
+        self,
+        size=QWEN_POOL_SIZE,
+        command=None,
+        request_timeout=None,
+        session_protocol=None,
+    ):
+        """
+        初始化会话池
+
+        Args:
+            size (int): 最多同时进行的请求数（会话模式下为最多同时存在的会话数）
+            command (list): 启动命令，默认使用 qwen_command()
+            request_timeout (float): 单次请求超时时间（秒）
+            session_protocol (bool): 是否使用会话行协议，默认为 QWEN_SESSION_PROTOCOL
+        """
+        self.size = size
+        self.command = command
+        self.request_timeout = request_timeout or QWEN_REQUEST_TIMEOUT
+        if session_protocol is None:
+            session_protocol = QWEN_SESSION_PROTOCOL
+        self.session_protocol = session_protocol
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.stats = {"started": 0, "recycled": 0, "requests": 0}
+
+    def _new_session(self):
+        """启动一个新会话"""
+        session = QwenChatSession(self.command)
+        if not session.start_session():
+            return None
+        self.stats["started"] += 1
+        return session
+
+    def warm_up(self, count=None):
+        """
+        预先启动会话进程
+
+        Args:
+            count (int): 预热的会话数，默认为池大小
+        """
+        if not self.session_protocol:
+            return
+        for _ in range(min(count or self.size, self.size)):
+            session = self._new_session()
+            if session is None:
+                break
+            self._idle.put(session)
+
+    @contextmanager
+    def session(self):
+        """
+        借出一个可用会话，用完后归还
+
+        Yields:
+            QwenChatSession: 会话，无法启动时为 None
+        """
+        self._slots.acquire()
+        session = None
+        try:
+            while not self._idle.empty():
+                candidate = self._idle.get_nowait()
+                if candidate.is_alive():
+                    session = candidate
+                    break
+                self.stats["recycled"] += 1
+            if session is None:
+                session = self._new_session()
+            yield session
+        finally:
+            if session is not None:
+                if session.is_alive():
+                    self._idle.put(session)
+                else:
+                    self.stats["recycled"] += 1
+            self._slots.release()
+
+    def send(self, message, timeout=None, retries=1):
+        """
+        通过池中的会话发送消息，会话崩溃或超时时换新会话重试
+
+        Args:
+            message (str): 消息内容
+            timeout (float): 超时时间（秒），默认为 request_timeout
+            retries (int): 失败后的重试次数
+
+        Returns:
+            str: 响应内容，失败返回 None
+        """
+        timeout = timeout or self.request_timeout
+        for _ in range(retries + 1):
+            if not self.session_protocol:
+                with self._slots:
+                    self.stats["requests"] += 1
+                    response = self._run_once(message, timeout)
+                if response is not None:
+                    return response
+                continue
+            with self.session() as session:
+                if session is None:
+                    return None
+                self.stats["requests"] += 1
+                response = session.send_message(message, timeout=timeout)
+                if response is not None:
+                    return response
+                # 超时或异常的会话状态不可信，结束后由池替换
+                session.end_session()
+        return None
+
+    def _run_once(self, message, timeout):
+        """
+        以一次性命令模式发送消息
+
+        Returns:
+            str: 命令输出，失败或超时返回 None
+        """
+        command = self.command or qwen_command()
+        if not command:
+            return None
+        try:
+            # 提示词通过标准输入传递，不受命令行长度限制（Windows 约 32K 字符）
+            result = subprocess.run(
+                command,
+                input=message,
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            print(f"等待 qwen 响应超时 ({timeout}s)")
+            return None
+        except Exception as e:
+            print(f"运行 qwen 命令失败: {e}")
+            return None
+        if result.returncode != 0:
+            print(f"qwen 命令执行失败: {result.stderr}")
+            return None
+        return result.stdout
+
+    def close(self):
+        """结束所有空闲会话"""
+        while not self._idle.empty():
+            self._idle.get_nowait().end_session()
+
+
+_session_pool = None
+_session_pool_pid = None
+
+
+def get_session_pool():
+    """
+    获取当前进程的全局 qwen 会话池
+
+    分块摘要的工作进程由 fork 创建时会继承父进程的会话池，
+    因此按进程号区分，避免多个进程共用同一个会话的管道
+
+    Returns:
+        QwenSessionPool: 会话池实例
+    """
+    global _session_pool, _session_pool_pid
+    if _session_pool is None or _session_pool_pid != os.getpid():
+        _session_pool = QwenSessionPool()
+        _session_pool_pid = os.getpid()
+    return _session_pool
+
+
+_summary_cache = None
+
+
+def get_summary_cache():
+    """
+    获取全局摘要缓存
+
+    Returns:
+        SummaryCache: 摘要缓存实例
+    """
+    global _summary_cache
+    if _summary_cache is None:
+        _summary_cache = SummaryCache(SUMMARY_CACHE_DIR, SUMMARY_CACHE_MAX_BYTES)
+    return _summary_cache
+
+
 def read_file_content(file_path):
     """读取文件内容"""
     try:
@@ -78,54 +384,70 @@ def read_file_content(file_path):
         return None
 
 
-def check_qwen_available():
-    """检查 qwen 命令是否可用"""
-    # 首先检查 node 是否可用
-    node_path = which("node")
-    if not node_path:
-        print("未找到 Node.js，请确保已正确安装")
-        return False
+def check_qwen_available(ttl=QWEN_HEALTH_TTL):
+    """
+    检查 qwen 命令是否可用
 
-    # 检查 qwen JS 文件是否存在
-    if not os.path.exists(QWEN_JS_PATH):
-        print(f"未找到 qwen CLI 入口文件: {QWEN_JS_PATH}")
+    检查需要启动一次 Node 进程，结果在进程内和缓存文件中保留 ttl 秒
+
+    Args:
+        ttl (float): 检查结果的缓存时间（秒），0 表示强制重新检查
+
+    Returns:
+        bool: qwen 可用返回 True
+    """
+    command = qwen_command()
+    if not command:
         return False
 
+    key = " ".join(command)
+    cached = _health_cache.get(key) or _load_health_cache(key)
+    if cached and time.time() - cached["checked_at"] < ttl:
+        return cached["ok"]
+
     try:
         result = subprocess.run(
-            [node_path, QWEN_JS_PATH, "--version"],
+            command + ["--version"],
             capture_output=True,
             text=True,
             timeout=10,
         )
-        if result.returncode == 0:
+        ok = result.returncode == 0
+        if ok:
             print(f"找到 qwen 命令，版本: {result.stdout.strip()}")
-            return True
         else:
             print(f"qwen 命令不可用: {result.stderr}")
-            return False
     except Exception as e:
         print(f"检查 qwen 命令时出错: {e}")
-        return False
+        ok = False
 
+    _health_cache[key] = {"ok": ok, "checked_at": time.time()}
+    _save_health_cache(key, _health_cache[key])
+    return ok
 
-def generate_daily_report(file_paths, template_path):
-    """根据文件内容和模板生成日报"""
 
-    # 检查 node 是否可用
-    node_path = which("node")
-    if not node_path:
-        print("未找到 Node.js，请确保已正确安装")
-        print("无法使用 qwen 命令，将使用模拟模式生成日报")
-        return generate_mock_report(file_paths, template_path)
+def _load_health_cache(key):
+    """从缓存文件读取可用性检查结果"""
+    try:
+        with open(QWEN_HEALTH_CACHE, "r", encoding="utf-8") as f:
+            return json.load(f).get(key)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_health_cache(key, entry):
+    """把可用性检查结果写入缓存文件"""
+    try:
+        with open(QWEN_HEALTH_CACHE, "w", encoding="utf-8") as f:
+            json.dump({key: entry}, f)
+    except OSError as e:
+        print(f"写入 qwen 检查缓存失败: {e}")
 
-    # 检查 qwen JS 文件是否存在
-    if not os.path.exists(QWEN_JS_PATH):
-        print(f"未找到 qwen CLI 入口文件: {QWEN_JS_PATH}")
-        print("无法使用 qwen 命令，将使用模拟模式生成日报")
-        return generate_mock_report(file_paths, template_path)
 
-    # 检查 qwen 是否可用
+def generate_daily_report(file_paths, template_path):
+    """根据文件内容和模板生成日报"""
+
+    # 检查 qwen 是否可用（结果有缓存，不会每次都启动 Node 进程）
     if not check_qwen_available():
         print("无法使用 qwen 命令，将使用模拟模式生成日报")
         return generate_mock_report(file_paths, template_path)
@@ -147,14 +469,86 @@ def generate_daily_report(file_paths, template_path):
         print("没有可读取的文件")
         return
 
-    # 构建提示词
+    # 构建提示词，超出 token 预算时先分块摘要再归并
+    summarized = False
+    prompt = build_report_prompt(template_content, files_content)
+    for _ in range(REPORT_MAX_REDUCE_ROUNDS):
+        if estimate_tokens(prompt) <= REPORT_TOKEN_BUDGET:
+            break
+        print(f"输入约 {estimate_tokens(prompt)} tokens，超出预算，使用分块摘要")
+        files_content = summarize_in_chunks(
+            files_content, REPORT_TOKEN_BUDGET, template_content=template_content
+        )
+        summarized = True
+        prompt = build_report_prompt(template_content, files_content, summarized)
+
+    if estimate_tokens(prompt) > REPORT_TOKEN_BUDGET:
+        # 归并轮数用完后仍超出预算，按预算截断各文件的内容，不发送超出预算的提示词
+        files_content = truncate_to_budget(
+            template_content, files_content, REPORT_TOKEN_BUDGET, summarized
+        )
+        if files_content is None:
+            print("日报模板超出 token 预算，无法生成日报")
+            return None
+        print(f"归并 {REPORT_MAX_REDUCE_ROUNDS} 轮后仍超出预算，已截断文件内容")
+        prompt = build_report_prompt(template_content, files_content, summarized)
+
+    try:
+        # 提示词完全相同时直接使用缓存的日报，否则通过会话池发送给 qwen
+        print("正在生成日报...")
+        cache = get_summary_cache()
+        cache_key = cache.make_key(prompt, template_content, REPORT_PROMPT_VERSION)
+        report_content = cache.get(cache_key)
+        if report_content is None:
+            report_content = get_session_pool().send(prompt)
+            if report_content is not None:
+                cache.put(cache_key, report_content)
+        cache.save()
+        print(f"摘要缓存: {cache.stats()}")
+
+        if report_content is not None:
+
+            # 保存日报
+            date_str = datetime.now().strftime("%Y%m%d")
+            report_filename = f"daily_report_{date_str}.md"
+
+            with open(report_filename, "w", encoding="utf-8") as f:
+                f.write(report_content)
+
+            print(f"日报已生成: {report_filename}")
+            print("\n生成的日报内容:")
+            print("-" * 30)
+            print(report_content)
+            return report_content
+        else:
+            print("生成日报失败")
+            return None
+
+    except Exception as e:
+        print(f"生成日报时发生错误: {e}")
+        return None
+
+
+def build_report_prompt(template_content, files_content, summarized=False):
+    """
+    构建生成日报的提示词
+
+    Args:
+        template_content (str): 日报模板
+        files_content (dict): 文件路径到内容（或分块摘要）的映射
+        summarized (bool): 内容是否为分块摘要
+
+    Returns:
+        str: 提示词
+    """
+    label = "相关文件摘要" if summarized else "相关文件内容"
     prompt = f"""
 我希望你根据以下文件内容和模板帮我生成日报。
 
 日报模板:
 {template_content}
 
-相关文件内容:
+{label}:
 """
 
     for file_path, content in files_content.items():
@@ -168,43 +562,205 @@ def generate_daily_report(file_paths, template_path):
 3. 明确明天的工作计划
 4. 按照模板格式输出，只输出日报内容，不要添加其他说明
 """
+    return prompt
+
+
+def truncate_to_budget(template_content, files_content, token_budget, summarized):
+    """
+    按 token 预算截断各文件的内容，每个文件分得相同的预算
+
+    Args:
+        template_content (str): 日报模板
+        files_content (dict): 文件路径到内容（或分块摘要）的映射
+        token_budget (int): 整个提示词的 token 预算
+        summarized (bool): 内容是否为分块摘要
+
+    Returns:
+        dict: 截断后的映射，模板等固定部分已超出预算时返回 None
+    """
+    marker = "\n（内容过长，已截断）"
+    empty = {path: marker for path in files_content}
+    overhead = estimate_tokens(build_report_prompt(template_content, empty, summarized))
+    share = (token_budget - overhead) // max(len(files_content), 1)
+    if share <= 0:
+        return None
 
-    try:
-        # 使用一次性命令模式
-        print("正在生成日报...")
-        result = subprocess.run(
-            [node_path, QWEN_JS_PATH, prompt],
-            capture_output=True,
-            text=True,
-            timeout=120,  # 2分钟超时
-        )
+    truncated = {}
+    for path, content in files_content.items():
+        tokens = estimate_tokens(content)
+        if tokens <= share:
+            truncated[path] = content
+            continue
+        while tokens > share:
+            content = content[: len(content) * share // tokens]
+            tokens = estimate_tokens(content)
+        truncated[path] = content + marker
+    return truncated
 
-        if result.returncode == 0:
-            report_content = result.stdout
 
-            # 保存日报
-            date_str = datetime.now().strftime("%Y%m%d")
-            report_filename = f"daily_report_{date_str}.md"
+def estimate_tokens(text):
+    """
+    粗略估算文本的 token 数：中日韩字符按 1 个计，其余按 4 个字符 1 个计
 
-            with open(report_filename, "w", encoding="utf-8") as f:
-                f.write(report_content)
+    Args:
+        text (str): 文本
 
-            print(f"日报已生成: {report_filename}")
-            print("\n生成的日报内容:")
-            print("-" * 30)
-            print(report_content)
-            return report_content
+    Returns:
+        int: 估算的 token 数
+    """
+    cjk = sum(1 for c in text if "\u2e80" <= c <= "\u9fff" or "\uf900" <= c <= "\ufaff")
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def split_into_chunks(files_content, token_budget):
+    """
+    按 token 预算把文件内容切分成块，尽量在行边界切分
+
+    Args:
+        files_content (dict): 文件路径到内容的映射
+        token_budget (int): 每块的最大 token 数
+
+    Returns:
+        list: [(文件路径, 块序号, 块内容), ...]
+    """
+    chunks = []
+    for file_path, content in files_content.items():
+        current, current_tokens, index = [], 0, 0
+        for line in content.splitlines(keepends=True):
+            for piece in _split_long_line(line, token_budget):
+                tokens = estimate_tokens(piece)
+                if current and current_tokens + tokens > token_budget:
+                    chunks.append((file_path, index, "".join(current)))
+                    current, current_tokens, index = [], 0, index + 1
+                current.append(piece)
+                current_tokens += tokens
+        if current:
+            chunks.append((file_path, index, "".join(current)))
+    return chunks
+
+
+def _split_long_line(line, token_budget):
+    """把超过预算的单行按字符切开"""
+    if estimate_tokens(line) <= token_budget:
+        return [line]
+    # 最坏情况下每个字符 1 个 token
+    return [line[i : i + token_budget] for i in range(0, len(line), token_budget)]
+
+
+def summarize_chunk(chunk):
+    """
+    摘要一个内容块（在工作进程中执行）
+
+    Args:
+        chunk (tuple): (文件路径, 块序号, 块内容)
+
+    Returns:
+        tuple: (文件路径, 块序号, 摘要, 是否由模型生成)
+    """
+    file_path, index, text = chunk
+    prompt = f"""
+以下是文件 {file_path} 的第 {index + 1} 部分内容，它将与其他部分一起用于生成日报。
+请提炼其中的工作内容、遇到的问题及解决方案、后续计划，用简洁的要点列表输出，
+不要添加其他说明。
+
+内容:
+{text}
+"""
+    summary = get_session_pool().send(prompt)
+    if summary is None:
+        # qwen 请求失败时保留原文开头，避免该部分信息完全丢失（不写入缓存）
+        return file_path, index, text[:REPORT_CHUNK_FALLBACK_CHARS].strip(), False
+    return file_path, index, summary.strip(), True
+
+
+def summarize_in_chunks(
+    files_content,
+    token_budget,
+    workers=None,
+    progress=None,
+    template_content="",
+    cache=None,
+):
+    """
+    分块并行摘要（map 阶段），返回按文件归并后的摘要
+
+    已缓存的内容块直接使用缓存的摘要，只有新增或变化的块发送给模型
+
+    Args:
+        files_content (dict): 文件路径到内容的映射
+        token_budget (int): 每块的最大 token 数（为提示词留出余量）
+        workers (int): 工作进程数，默认为 REPORT_MAP_WORKERS
+        progress (callable): 进度回调，参数为 (已完成块数, 总块数)
+        template_content (str): 日报模板，参与缓存键计算
+        cache (SummaryCache): 摘要缓存，默认使用全局缓存
+
+    Returns:
+        dict: 文件路径到摘要的映射
+    """
+    chunks = split_into_chunks(files_content, int(token_budget * 0.8))
+    progress = progress or _print_progress
+    cache = cache or get_summary_cache()
+    results = []
+    pending = []
+    keys = {}
+
+    for chunk in chunks:
+        key = cache.make_key(chunk[2], template_content, REPORT_PROMPT_VERSION)
+        summary = cache.get(key)
+        if summary is None:
+            keys[(chunk[0], chunk[1])] = key
+            pending.append(chunk)
         else:
-            print("生成日报失败:")
-            print(result.stderr)
-            return None
+            results.append((chunk[0], chunk[1], summary))
+            progress(len(results), len(chunks))
+
+    def collect(result):
+        file_path, index, summary, generated = result
+        if generated:
+            cache.put(keys[(file_path, index)], summary)
+        results.append((file_path, index, summary))
+        progress(len(results), len(chunks))
+
+    workers = min(workers or REPORT_MAP_WORKERS, len(pending))
+    if workers <= 1:
+        for chunk in pending:
+            collect(summarize_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(summarize_chunk, chunk) for chunk in pending]
+            for future in as_completed(futures):
+                collect(future.result())
+    cache.save()
 
-    except subprocess.TimeoutExpired:
-        print("生成日报超时")
-        return None
-    except Exception as e:
-        print(f"生成日报时发生错误: {e}")
-        return None
+    # reduce 阶段的输入：同一文件的块摘要按顺序拼接
+    summaries = {}
+    for file_path, index, summary in sorted(results, key=lambda r: (r[0], r[1])):
+        summaries.setdefault(file_path, []).append(summary)
+    return {path: "\n".join(parts) for path, parts in summaries.items()}
+
+
+def _print_progress(done, total):
+    """打印分块摘要进度"""
+    print(f"分块摘要进度: {done}/{total}")
+
+
+def generate_daily_reports(batches, template_path):
+    """
+    批量生成日报，所有批次复用同一个会话池
+
+    Args:
+        batches (list): 每个元素是一组文件路径
+        template_path (str): 模板文件路径
+
+    Returns:
+        list: 每个批次生成的日报内容
+    """
+    if check_qwen_available():
+        get_session_pool().warm_up(min(len(batches), QWEN_POOL_SIZE))
+    try:
+        return [generate_daily_report(paths, template_path) for paths in batches]
+    finally:
+        get_session_pool().close()
 
 
 def generate_mock_report(file_paths, template_path):
@@ -225,7 +781,7 @@ def generate_mock_report(file_paths, template_path):
             files_content[file_path] = content
 
     # 生成模拟日报内容
-    mock_report = f"""# 日报
+    mock_report = """# 日报
 
 ## 今日工作内容
 根据日志文件分析，今天主要完成了以下工作：
@@ -259,6 +815,28 @@ def generate_mock_report(file_paths, template_path):
     return mock_report
 
 
+def ingest_logs(log_paths, day=None):
+    """
+    增量解析日志，生成当天的日报输入文件
+
+    只解析上次之后新增的日志行，日志轮转后先补读轮转文件中未读的行，再读取新文件
+
+    Args:
+        log_paths (list): 日志文件路径列表
+        day (str): 日期，格式为 YYYY-MM-DD，默认为今天
+
+    Returns:
+        str: 日报输入文件路径
+    """
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    ingester = LogIngester()
+    for log_path in log_paths:
+        records = ingester.ingest(log_path)
+        print(f"已解析 {log_path}: 新增 {len(records)} 条记录")
+    ingester.save()
+    return ingester.write_daily_input(day)
+
+
 def interactive_mode():
     """交互模式"""
     print("=== Qwen 日报生成助手 ===")
@@ -267,6 +845,7 @@ def interactive_mode():
     while True:
         file_input = input("文件路径: ").strip()
         if file_input.lower() == "quit":
+            get_session_pool().close()
             break
 
         if not file_input:
@@ -304,11 +883,18 @@ def interactive_mode():
 
 def main():
     """主函数"""
-    if len(sys.argv) > 1:
-        # 命令行模式
-        file_paths = sys.argv[1].split(",") if "," in sys.argv[1] else [sys.argv[1]]
+    if len(sys.argv) > 1 and sys.argv[1] == "--ingest":
+        # 增量解析模式：以日志的当天摘要作为日报输入
+        log_paths = (
+            sys.argv[2].split(",") if len(sys.argv) > 2 else ["file_changes.log"]
+        )
+        template_path = sys.argv[3] if len(sys.argv) > 3 else "template.md"
+        generate_daily_report([ingest_logs(log_paths)], template_path)
+    elif len(sys.argv) > 1:
+        # 命令行模式，多组文件用分号分隔时批量生成并复用会话
+        batches = [batch.split(",") for batch in sys.argv[1].split(";") if batch]
         template_path = sys.argv[2] if len(sys.argv) > 2 else "template.md"
-        generate_daily_report(file_paths, template_path)
+        generate_daily_reports(batches, template_path)
     else:
         # 交互模式
         interactive_mode()
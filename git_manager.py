@@ -5,32 +5,120 @@ Git 管理模块
 提供文件版本控制功能，作为文件缓存的替代方案
 """
 
+import functools
+import importlib.util
 import logging
 import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
-from git import GitCommandError, InvalidGitRepositoryError, Repo
+from history_index import HistoryIndex
+from retention import RetentionPolicy
+
+# GitPython 导入约需数十毫秒，只检查是否安装，第一次打开仓库时再导入
+GIT_AVAILABLE = importlib.util.find_spec("git") is not None
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 影子仓库目录：监控程序的自动提交写入这里，不进入用户自己的 Git 仓库
+SHADOW_GIT_DIR = ".file_monitor_git"
+# 影子仓库不跟踪的路径（监控程序自身的输出）
+SHADOW_EXCLUDES = [
+    f"/{SHADOW_GIT_DIR}/",
+    ".git/",
+    "/.file_cache/",
+    "/daily_reports/",
+    "/file_changes.log*",
+    "/.ai_outbox.db*",
+    "/.log_ingest/",
+    "/.summary_cache/",
+    "/.file_events.db*",
+    "/.qwen_health.json",
+    "/.main_check.sock",
+]
+GC_COMMIT_INTERVAL = 200  # 每提交多少次执行一次 git gc --auto
+READER_THREADS = 4  # 并发执行只读操作（差异、历史）的线程数
+HISTORY_INDEX_NAME = "file_monitor_history.jsonl"  # 文件历史索引（位于 GIT_DIR 中）
+HISTORY_CACHE_SIZE = 256  # 文件历史 LRU 缓存的路径数
+
+
+def write_operation(method):
+    """把修改仓库的方法交给写线程串行执行，调用方等待结果"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.submit_write(method, self, *args, **kwargs).result()
+
+    return wrapper
+
+
+def read_operation(method):
+    """把只读方法交给读线程池执行，每个读线程使用自己的 Repo 对象"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.submit_read(method, self, *args, **kwargs).result()
+
+    return wrapper
+
 
 class GitManager:
     """Git 管理器"""
 
-    def __init__(self, repo_path="."):
+    def __init__(
+        self, repo_path=".", git_dir=None, excludes=None, reader_threads=READER_THREADS
+    ):
         """
         初始化 Git 管理器
 
+        修改仓库的操作（暂存、提交、gc、历史压缩）由一个写线程按队列顺序执行，
+        避免多个线程同时写索引时争用 index.lock；差异和历史查询由读线程池并发执行
+
         Args:
-            repo_path (str): Git 仓库路径，默认为当前目录
+            repo_path (str): Git 仓库路径（使用影子仓库时为工作区路径），默认为当前目录
+            git_dir (str): 影子仓库目录，指定时使用独立的 GIT_DIR 和索引，
+                以 repo_path 为工作区，不影响 repo_path 下用户自己的仓库
+            excludes (list): 影子仓库不跟踪的路径模式，写入 info/exclude
+            reader_threads (int): 读线程池大小
         """
         self.repo_path = repo_path
+        self.git_dir = git_dir
+        self.excludes = excludes or []
         self.repo = None
+        self._commits_since_gc = 0
+
+        self._write_queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._reader_pool = ThreadPoolExecutor(
+            max_workers=reader_threads, thread_name_prefix="git-reader"
+        )
+        self._reader_local = threading.local()
+        self._reader_repos = []
+        self._closed = False
+        self.history_index = None
         self.init_repo()
+        if self.repo is not None:
+            self.history_index = HistoryIndex(
+                os.path.join(self.repo.git_dir, HISTORY_INDEX_NAME),
+                cache_size=HISTORY_CACHE_SIZE,
+            )
 
     def init_repo(self):
         """初始化 Git 仓库"""
+        if self.git_dir:
+            self.init_shadow_repo()
+            return
+
+        try:
+            from git import GitCommandError, InvalidGitRepositoryError, Repo
+        except ImportError as e:
+            logger.error(f"GitPython 不可用: {e}")
+            return
+
         try:
             # 尝试打开现有仓库
             self.repo = Repo(self.repo_path)
@@ -54,6 +142,149 @@ class GitManager:
                 logger.error(f"初始化 Git 仓库失败: {e}")
                 self.repo = None
 
+    def init_shadow_repo(self):
+        """初始化或打开影子仓库（独立的 GIT_DIR，工作区为 repo_path）"""
+        git_dir = os.path.abspath(self.git_dir)
+        work_tree = os.path.abspath(self.repo_path)
+        try:
+            from git import Repo
+
+            if not os.path.exists(os.path.join(git_dir, "HEAD")):
+                repo = Repo.init(git_dir, bare=True)
+                with repo.config_writer() as config:
+                    config.set_value("core", "bare", "false")
+                    config.set_value("core", "worktree", work_tree)
+                    config.set_value("user", "name", "FileMonitor")
+                    config.set_value("user", "email", "filemonitor@example.com")
+                logger.info(f"已初始化影子仓库: {git_dir}")
+
+            self.repo = self._open_repo()
+            self.write_excludes()
+            logger.info(f"已连接到影子仓库: {git_dir} (工作区: {work_tree})")
+        except Exception as e:
+            logger.error(f"初始化影子仓库失败: {e}")
+            self.repo = None
+
+    def _open_repo(self):
+        """打开一个新的 Repo 对象（Repo 对象不能在线程间共享）"""
+        from git import Repo
+
+        if not self.git_dir:
+            return Repo(self.repo_path)
+        git_dir = os.path.abspath(self.git_dir)
+        repo = Repo(git_dir)
+        # GitPython 启动的 git 进程以工作区为当前目录，需要显式指定 GIT_DIR
+        repo.git.update_environment(
+            GIT_DIR=git_dir, GIT_WORK_TREE=os.path.abspath(self.repo_path)
+        )
+        return repo
+
+    def submit_write(self, fn, *args, **kwargs):
+        """
+        把修改仓库的操作加入写队列
+
+        在写线程内部调用时直接执行，使写操作可以调用其他写操作（如提交后 gc）
+
+        Returns:
+            Future: 操作结果
+        """
+        if threading.current_thread() is self._writer:
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+
+        future = Future()
+        with self._writer_lock:
+            if self._closed:
+                raise RuntimeError("Git 管理器已关闭")
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="git-writer", daemon=True
+                )
+                self._writer.start()
+            self._write_queue.put((future, fn, args, kwargs))
+        return future
+
+    def _write_loop(self):
+        """写线程：按提交顺序逐个执行写操作"""
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit_read(self, fn, *args, **kwargs):
+        """
+        把只读操作交给读线程池
+
+        在读线程或写线程内部调用时直接执行，避免线程池中的任务互相等待
+
+        Returns:
+            Future: 操作结果
+        """
+        current = threading.current_thread()
+        if current is self._writer or hasattr(self._reader_local, "repo"):
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        return self._reader_pool.submit(self._run_read, fn, args, kwargs)
+
+    def _run_read(self, fn, args, kwargs):
+        """在读线程中执行只读操作，第一次执行时为该线程打开独立的 Repo 对象"""
+        if not hasattr(self._reader_local, "repo"):
+            repo = self._open_repo() if self.is_ready() else None
+            self._reader_local.repo = repo
+            if repo is not None:
+                with self._writer_lock:
+                    self._reader_repos.append(repo)
+        return fn(*args, **kwargs)
+
+    def _current_repo(self):
+        """返回当前线程应使用的 Repo 对象：读线程使用自己的，其他线程使用共享的"""
+        return getattr(self._reader_local, "repo", None) or self.repo
+
+    def pending_writes(self):
+        """返回写队列中等待执行的操作数"""
+        return self._write_queue.qsize()
+
+    def close(self):
+        """等待已排队的写操作完成，关闭写线程、读线程池和所有 Repo 对象"""
+        with self._writer_lock:
+            if self._closed:
+                return
+            self._closed = True
+            writer = self._writer
+            if writer is not None:
+                self._write_queue.put(None)
+        if writer is not None:
+            writer.join()
+        self._reader_pool.shutdown(wait=True)
+        for repo in self._reader_repos:
+            repo.close()
+        if self.repo is not None:
+            self.repo.close()
+
+    def write_excludes(self):
+        """把不跟踪的路径写入影子仓库的 info/exclude"""
+        exclude_path = os.path.join(self.repo.git_dir, "info", "exclude")
+        os.makedirs(os.path.dirname(exclude_path), exist_ok=True)
+        with open(exclude_path, "w", encoding="utf-8") as f:
+            f.write("# 由 FileMonitor 生成\n")
+            for pattern in self.excludes:
+                f.write(pattern + "\n")
+
     def is_ready(self):
         """
         检查 Git 管理器是否准备就绪
@@ -63,6 +294,7 @@ class GitManager:
         """
         return self.repo is not None
 
+    @write_operation
     def add_file(self, file_path):
         """
         添加文件到 Git 暂存区
@@ -80,19 +312,53 @@ class GitManager:
         except Exception as e:
             logger.error(f"添加文件到暂存区失败: {e}")
 
-    def commit_changes(self, message=None):
+    def has_staged_changes(self, paths=None):
+        """
+        检查暂存区相对 HEAD 是否有需要提交的变化
+
+        使用 git diff-index --cached 只比较暂存区与 HEAD，不扫描工作区和未跟踪文件；
+        指定 paths 时只比较这些路径的索引条目，代价与路径数成正比而不是与仓库大小成正比
+
+        Args:
+            paths (list): 需要检查的文件路径（相对仓库根目录），None 表示整个暂存区
+
+        Returns:
+            bool: 有变化返回 True
+        """
+        from git import GitCommandError
+
+        if not self.repo.head.is_valid():
+            # 仓库还没有任何提交
+            return len(self.repo.index.entries) > 0
+
+        args = ["--cached", "--quiet", "HEAD", "--"]
+        if paths:
+            args.extend(path.replace(os.sep, "/") for path in paths)
+        try:
+            self.repo.git.diff_index(*args)
+        except GitCommandError as e:
+            # --quiet 模式下退出码 1 表示有差异
+            if e.status == 1:
+                return True
+            raise
+        return False
+
+    @write_operation
+    def commit_changes(self, message=None, paths=None, changed=False):
         """
         提交更改
 
         Args:
             message (str): 提交信息，默认自动生成
+            paths (list): 本次暂存的文件路径，指定时只检查这些路径是否有变化
+            changed (bool): 调用方已确认内容有变化时为 True，跳过检查
         """
         if not self.is_ready():
             return
 
         try:
             # 检查是否有更改需要提交
-            if not self.repo.is_dirty():
+            if not changed and not self.has_staged_changes(paths):
                 logger.debug("没有更改需要提交")
                 return
 
@@ -104,9 +370,211 @@ class GitManager:
             # 提交更改
             commit = self.repo.index.commit(message)
             logger.info(f"已提交更改: {commit.hexsha[:8]} - {message}")
+            self._index_commit(commit)
+
+            self._commits_since_gc += 1
+            if self.git_dir and self._commits_since_gc >= GC_COMMIT_INTERVAL:
+                self.run_gc(auto=True)
         except Exception as e:
             logger.error(f"提交更改失败: {e}")
 
+    @write_operation
+    def run_gc(self, auto=False):
+        """
+        整理影子仓库的对象，合并 pack 文件，保持对象查找代价稳定
+
+        Args:
+            auto (bool): True 时执行 git gc --auto，仅在松散对象或 pack 过多时整理
+        """
+        if not self.is_ready():
+            return
+
+        try:
+            if auto:
+                self.repo.git.gc("--auto", "--quiet")
+            else:
+                self.repo.git.gc("--quiet", "--prune=now")
+            self._commits_since_gc = 0
+            logger.info(f"Git 仓库整理完成: {self.object_stats()}")
+        except Exception as e:
+            logger.error(f"Git 仓库整理失败: {e}")
+
+    @write_operation
+    def compact_history(self, policy=None, now=None, force=False):
+        """
+        按保留策略压缩提交历史
+
+        沿第一父提交链从旧到新重建保留下来的提交：每个保留的提交沿用原来的
+        目录树和时间，被丢弃的提交的变化合并进其后第一个保留的提交；
+        比策略最后一层更旧的提交合并进最早保留的提交。重写后清理 reflog
+        并执行 gc，使被丢弃的对象真正从磁盘删除
+
+        只用于影子仓库，避免改写用户自己的仓库历史，除非 force 为 True
+
+        Args:
+            policy (RetentionPolicy): 保留策略，默认为 DEFAULT_TIERS
+            now (float): 当前时间，默认为 time.time()
+            force (bool): 允许压缩非影子仓库
+
+        Returns:
+            int: 被合并掉的提交数
+        """
+        if not self.is_ready() or not self.repo.head.is_valid():
+            return 0
+        if not self.git_dir and not force:
+            logger.warning("只压缩影子仓库的历史，已跳过")
+            return 0
+
+        policy = policy or RetentionPolicy()
+        try:
+            head = self.repo.head.commit
+            chain = [head]
+            while chain[-1].parents:
+                chain.append(chain[-1].parents[0])
+            chain.reverse()
+
+            keep = policy.select([c.committed_date for c in chain], now)
+            if len(keep) == len(chain):
+                return 0
+
+            parent = None
+            merged = 0
+            for index, commit in enumerate(chain):
+                if index not in keep:
+                    merged += 1
+                    continue
+                parent = self._recreate_commit(commit, parent, merged)
+                merged = 0
+
+            dropped = len(chain) - len(keep)
+            self.repo.head.reference.commit = parent
+            self.repo.git.reflog("expire", "--expire=now", "--all")
+            # 提交哈希已全部改变，重建文件历史索引
+            self.rebuild_history_index()
+        except Exception as e:
+            logger.error(f"压缩提交历史失败: {e}")
+            return 0
+
+        logger.info(f"已压缩提交历史: 合并 {dropped} 个提交，保留 {len(keep)} 个")
+        self.run_gc()
+        return dropped
+
+    def _recreate_commit(self, commit, parent, merged):
+        """以新的父提交重建一个提交，保留原来的目录树、作者和时间"""
+        from git import Commit
+
+        message = commit.message
+        if merged:
+            message = f"{message.rstrip()}\n\n(合并了之前的 {merged} 个自动提交)\n"
+        return Commit.create_from_tree(
+            self.repo,
+            commit.tree,
+            message,
+            parent_commits=[parent] if parent is not None else [],
+            head=False,
+            author=commit.author,
+            committer=commit.committer,
+            author_date=_git_date(commit.authored_date, commit.author_tz_offset),
+            commit_date=_git_date(commit.committed_date, commit.committer_tz_offset),
+        )
+
+    def _index_commit(self, commit):
+        """把新提交及其变更的路径追加到文件历史索引"""
+        try:
+            parent = commit.parents[0].hexsha if commit.parents else None
+            if parent != self.history_index.head:
+                # 索引缺少之前的提交（如上次追加时中断），整体重建
+                self.rebuild_history_index(self.repo)
+                return
+
+            output = self._git_output(
+                "diff-tree",
+                "--no-commit-id",
+                "--name-only",
+                "-r",
+                "--root",
+                "-z",
+                commit.hexsha,
+            )
+            # 读取方可能在此期间因 HEAD 变化重建了索引，append 会跳过已包含的提交
+            self.history_index.append(
+                {
+                    "commit": commit.hexsha,
+                    "author": commit.author.name,
+                    "time": commit.committed_date,
+                    "message": commit.message,
+                    "paths": [path for path in output.split("\0") if path],
+                }
+            )
+        except Exception as e:
+            # 索引与 HEAD 不一致时，下次查询会重建索引
+            logger.warning(f"更新文件历史索引失败: {e}")
+
+    def rebuild_history_index(self, repo=None):
+        """
+        遍历一次提交图重建文件历史索引
+
+        Args:
+            repo: 使用的 Repo 对象，默认为当前线程的 Repo
+        """
+        if not self.is_ready():
+            return
+        repo = repo or self._current_repo()
+        if not repo.head.is_valid():
+            self.history_index.rebuild([])
+            return
+
+        # 每个提交: \x1e哈希\x1f作者\x1f时间\x1f提交信息\x1f，之后是变更的文件名
+        output = self._git_output(
+            "log",
+            "--reverse",
+            "--name-only",
+            "--format=%x1e%H%x1f%an%x1f%ct%x1f%B%x1f",
+            repo=repo,
+        )
+        records = []
+        for chunk in output.split("\x1e")[1:]:
+            commit, author, committed, message, names = chunk.split("\x1f")
+            records.append(
+                {
+                    "commit": commit,
+                    "author": author,
+                    "time": int(committed),
+                    "message": message,
+                    "paths": [name for name in names.splitlines() if name],
+                }
+            )
+        self.history_index.rebuild(records)
+        logger.info(f"已重建文件历史索引: {len(records)} 个提交")
+
+    def _git_output(self, *args, repo=None):
+        """执行 git 命令并返回输出，关闭路径转义使非 ASCII 文件名保持原样"""
+        repo = repo or self._current_repo()
+        return repo.git.execute(["git", "-c", "core.quotepath=false", *args])
+
+    @read_operation
+    def object_stats(self):
+        """
+        获取仓库对象统计（git count-objects -v）
+
+        Returns:
+            dict: 松散对象数、pack 数量和大小等
+        """
+        if not self.is_ready():
+            return {}
+
+        try:
+            output = self._current_repo().git.count_objects("-v")
+        except Exception as e:
+            logger.error(f"获取 Git 对象统计失败: {e}")
+            return {}
+        stats = {}
+        for line in output.splitlines():
+            name, _, value = line.partition(":")
+            stats[name.strip()] = int(value) if value.strip().isdigit() else value
+        return stats
+
+    @read_operation
     def get_file_diff(self, file_path, commit_hash=None):
         """
         获取文件差异
@@ -122,15 +590,16 @@ class GitManager:
             return ""
 
         try:
+            repo = self._current_repo()
             if commit_hash is None:
                 # 获取最新提交
-                commit = self.repo.head.commit
+                commit = repo.head.commit
             else:
                 # 获取指定提交
-                commit = self.repo.commit(commit_hash)
+                commit = repo.commit(commit_hash)
 
             # 获取文件差异
-            diff = self.repo.git.diff(
+            diff = repo.git.diff(
                 commit.parents[0].hexsha, commit.hexsha, "--", file_path
             )
             return diff
@@ -138,10 +607,14 @@ class GitManager:
             logger.error(f"获取文件差异失败: {e}")
             return ""
 
+    @read_operation
     def get_file_history(self, file_path, limit=10):
         """
         获取文件历史记录
 
+        从文件历史索引中读取，不遍历提交图；仓库 HEAD 与索引不一致时
+        （如在监控程序之外提交）先重建索引
+
         Args:
             file_path (str): 文件路径
             limit (int): 返回的历史记录数量限制
@@ -153,37 +626,41 @@ class GitManager:
             return []
 
         try:
-            # 获取文件的提交历史
-            commits = list(self.repo.iter_commits(paths=file_path, max_count=limit))
-            history = []
-
-            for commit in commits:
-                history.append(
-                    {
-                        "hash": commit.hexsha[:8],
-                        "message": commit.message.strip(),
-                        "author": commit.author.name,
-                        "date": datetime.fromtimestamp(commit.committed_date).strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        ),
-                    }
-                )
-
-            return history
+            repo = self._current_repo()
+            head = repo.head.commit.hexsha if repo.head.is_valid() else None
+            if head != self.history_index.head:
+                self.rebuild_history_index(repo)
+            return self.history_index.history(file_path.replace(os.sep, "/"), limit)
         except Exception as e:
             logger.error(f"获取文件历史记录失败: {e}")
             return []
 
 
-# 全局 Git 管理器实例
-git_manager = GitManager()
+def _git_date(timestamp, tz_offset):
+    """把时间戳和 GitPython 的时区偏移（UTC 以西的秒数）转换为 git 内部日期格式"""
+    offset = -tz_offset
+    sign = "+" if offset >= 0 else "-"
+    offset = abs(offset)
+    return f"{timestamp} {sign}{offset // 3600:02d}{offset % 3600 // 60:02d}"
+
+
+# 全局 Git 管理器实例（使用影子仓库，不写入用户自己的仓库），第一次使用时创建
+_git_manager = None
+_git_manager_lock = threading.Lock()
 
 
 def get_git_manager():
     """
-    获取全局 Git 管理器实例
+    获取全局 Git 管理器实例，第一次调用时才导入 GitPython 并打开仓库
 
     Returns:
         GitManager: Git 管理器实例
     """
-    return git_manager
+    global _git_manager
+    if _git_manager is None:
+        with _git_manager_lock:
+            if _git_manager is None:
+                _git_manager = GitManager(
+                    ".", git_dir=SHADOW_GIT_DIR, excludes=SHADOW_EXCLUDES
+                )
+    return _git_manager
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件历史索引模块
+每次自动提交后把提交信息和变更的文件路径追加到一个 JSONL 索引文件，
+内存中只保存每个路径对应的记录偏移，并用 LRU 缓存热点文件的历史，
+查询文件历史时不再遍历提交图
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+
+def format_entry(record):
+    """把索引记录转换为 get_file_history 返回的历史条目"""
+    return {
+        "hash": record["commit"][:8],
+        "message": record["message"].strip(),
+        "author": record["author"],
+        "date": datetime.fromtimestamp(record["time"]).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+class HistoryIndex:
+    """路径到提交记录的持久化索引"""
+
+    def __init__(self, index_path, cache_size=256):
+        """
+        初始化历史索引
+
+        Args:
+            index_path (str): 索引文件路径
+            cache_size (int): LRU 缓存的路径数上限
+        """
+        self.index_path = index_path
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._offsets = {}
+        self._cache = OrderedDict()
+        self.head = None
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        """读取索引文件，建立路径到记录偏移的映射；忽略写入中断留下的不完整行"""
+        self._offsets = {}
+        self._cache.clear()
+        self.head = None
+        try:
+            f = open(self.index_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 不完整的行之后的内容不可信，HEAD 不匹配时会重建索引
+                    break
+                for path in record["paths"]:
+                    self._offsets.setdefault(path, []).append(offset)
+                self.head = record["commit"]
+                offset += len(line)
+
+    def append(self, record):
+        """
+        追加一个提交的记录，并使其中变更路径的缓存失效
+
+        检查和追加在同一个锁内完成：读取方重建索引时可能已经包含了该提交，
+        此时不再重复追加
+
+        Args:
+            record (dict): {"commit", "author", "time", "message", "paths"}
+
+        Returns:
+            bool: 是否追加了记录，提交已是索引的最新提交时返回 False
+        """
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if record["commit"] == self.head:
+                return False
+            with open(self.index_path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+            for path in record["paths"]:
+                self._offsets.setdefault(path, []).append(offset)
+                self._cache.pop(path, None)
+            self.head = record["commit"]
+        return True
+
+    def rebuild(self, records):
+        """
+        用完整的提交记录重写索引（历史被压缩或索引与仓库不一致时使用）
+
+        Args:
+            records (iterable): 从旧到新排列的提交记录
+        """
+        tmp_path = self.index_path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.index_path)
+            self._load()
+
+    def history(self, path, limit=10):
+        """
+        获取文件的历史记录
+
+        Args:
+            path (str): 文件路径（相对仓库根目录，使用 / 分隔）
+            limit (int): 返回的历史记录数量限制
+
+        Returns:
+            list: 历史记录列表，最新的在前
+        """
+        with self._lock:
+            offsets = self._offsets.get(path, [])
+            cached = self._cache.get(path)
+            if cached is not None and (
+                len(cached) >= limit or len(cached) == len(offsets)
+            ):
+                self._cache.move_to_end(path)
+                self.hits += 1
+                return cached[:limit]
+
+            self.misses += 1
+            entries = []
+            if offsets:
+                with open(self.index_path, "rb") as f:
+                    for offset in reversed(offsets[-limit:]):
+                        f.seek(offset)
+                        entries.append(format_entry(json.loads(f.readline())))
+            self._cache[path] = entries
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return list(entries)
+
+    def stats(self):
+        """
+        获取索引统计信息
+
+        Returns:
+            dict: 索引的路径数、缓存条目数和命中情况
+        """
+        with self._lock:
+            return {
+                "paths": len(self._offsets),
+                "cached_paths": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志增量解析模块
+记住每个日志文件的读取偏移和 inode（日志轮转后先读完轮转文件中未读的部分，
+再从头读取新文件），
+只解析新增的行，生成结构化记录并维护按天的统计，
+使日报输入的生成代价与新增行数成正比，而不是与日志总大小成正比
+"""
+
+import argparse
+import json
+import os
+import re
+from datetime import datetime
+
+# file_changes.log 的行格式: 2025-12-15 10:00:00,123 - INFO - MODIFIED: a.txt
+LOG_LINE_RE = re.compile(
+    r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})(?:,\d+)? - (\w+) - (.*)$"
+)
+CHANGE_RE = re.compile(r"^(CREATED|MODIFIED|DELETED): (.+)$")
+# sample_log.txt 风格的条目头: --- 2025-12-15 09:30:15 ---
+ENTRY_HEADER_RE = re.compile(r"^--- (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})(.*?) ---$")
+ENTRY_SEPARATOR = "-" * 30
+
+# 每天统计中保留的文件数上限
+TOP_FILES_LIMIT = 200
+
+
+class LogIngester:
+    """日志增量解析器"""
+
+    def __init__(self, state_dir=".log_ingest"):
+        """
+        初始化解析器
+
+        Args:
+            state_dir (str): 保存读取进度、每日统计和解析记录的目录
+        """
+        self.state_dir = state_dir
+        self.state_path = os.path.join(state_dir, "state.json")
+        self.state = self._load_state()
+        # 尚未写入记录文件的人工条目，与解析进度一起在 save() 中写入
+        self._pending_entries = []
+
+    def _load_state(self):
+        """读取解析进度"""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("files", {})
+        state.setdefault("days", {})
+        return state
+
+    def save(self):
+        """
+        写入新解析的人工条目并保存解析进度（先写临时文件再替换，避免中断时损坏）
+
+        条目先于进度写入：两者之间中断时，下次会重新读取并再次写入这些条目，
+        读取记录文件时按条目在日志中的位置去重
+        """
+        os.makedirs(self.state_dir, exist_ok=True)
+        self._spool(self._pending_entries)
+        self._pending_entries = []
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def ingest(self, log_path):
+        """
+        解析日志文件中上次读取之后新增的完整行
+
+        Args:
+            log_path (str): 日志文件路径
+
+        Returns:
+            list: 新增的结构化记录
+        """
+        try:
+            stat = os.stat(log_path)
+        except OSError:
+            return []
+
+        key = os.path.abspath(log_path)
+        records = []
+        file_state = self.state["files"].get(key)
+        if file_state is not None and file_state["inode"] != stat.st_ino:
+            # 日志已轮转：先读完轮转前文件中尚未读取的部分
+            rotated_path = self._find_rotated(log_path, file_state["inode"])
+            if rotated_path:
+                records += self._read_new(rotated_path, file_state, final=True)
+        if (
+            file_state is None
+            or file_state["inode"] != stat.st_ino
+            or stat.st_size < file_state["offset"]
+        ):
+            # 首次读取或日志已轮转/被截断，从头开始
+            file_state = {
+                "inode": stat.st_ino,
+                "offset": 0,
+                "block": file_state["block"] if file_state else None,
+            }
+            self.state["files"][key] = file_state
+
+        records += self._read_new(log_path, file_state)
+        self._update_aggregates(records)
+        self._pending_entries += [
+            record for record in records if record["action"] in ("ENTRY", "SCAN")
+        ]
+        return records
+
+    @staticmethod
+    def _find_rotated(log_path, inode):
+        """
+        在 <日志>.1、<日志>.2025-12-15 等轮转文件中查找指定 inode 的文件
+
+        Returns:
+            str: 轮转文件路径，找不到时返回 None
+        """
+        directory = os.path.dirname(log_path) or "."
+        prefix = os.path.basename(log_path) + "."
+        try:
+            names = sorted(n for n in os.listdir(directory) if n.startswith(prefix))
+        except OSError:
+            return None
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                if os.stat(path).st_ino == inode:
+                    return path
+            except OSError:
+                continue
+        return None
+
+    def _read_new(self, log_path, file_state, final=False):
+        """
+        从 file_state 记录的偏移开始解析新增的行并更新偏移
+
+        Args:
+            log_path (str): 日志文件路径
+            file_state (dict): 该文件的读取进度
+            final (bool): 文件不会再写入（已轮转），末尾没有换行的行也一并解析
+
+        Returns:
+            list: 结构化记录
+        """
+        try:
+            with open(log_path, "rb") as f:
+                f.seek(file_state["offset"])
+                data = f.read()
+        except OSError:
+            return []
+
+        # 只处理完整的行，末尾未写完的行留到下一次
+        end = len(data) if final else data.rfind(b"\n") + 1
+        if end == 0:
+            return []
+
+        records = []
+        offset = file_state["offset"]
+        for raw in data[:end].splitlines(keepends=True):
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            record = self._parse_line(line, file_state)
+            if record:
+                # 记录在日志中的位置（inode:偏移），用于条目去重
+                record["source"] = f"{file_state['inode']}:{offset}"
+                records.append(record)
+            offset += len(raw)
+        file_state["offset"] += end
+        return records
+
+    def _parse_line(self, line, file_state):
+        """
+        解析一行，sample_log 风格的多行条目在读到分隔线时生成记录
+
+        Returns:
+            dict: 结构化记录，该行没有形成完整记录时返回 None
+        """
+        match = LOG_LINE_RE.match(line)
+        if match:
+            timestamp, level, message = match.groups()
+            change = CHANGE_RE.match(message)
+            return {
+                "timestamp": timestamp,
+                "level": level,
+                "action": change.group(1) if change else None,
+                "path": change.group(2) if change else None,
+                "message": message,
+            }
+
+        header = ENTRY_HEADER_RE.match(line)
+        if header:
+            file_state["block"] = {
+                "timestamp": header.group(1),
+                "kind": header.group(2).strip(),
+                "fields": {},
+            }
+            return None
+
+        block = file_state.get("block")
+        if block is None:
+            return None
+        if line.strip() == ENTRY_SEPARATOR:
+            file_state["block"] = None
+            fields = block["fields"]
+            return {
+                "timestamp": block["timestamp"],
+                "level": "INFO",
+                "action": "SCAN" if block["kind"] else "ENTRY",
+                "path": None,
+                "message": " / ".join(f"{k}: {v}" for k, v in fields.items()),
+            }
+        if ":" in line:
+            name, value = line.split(":", 1)
+            block["fields"][name.strip()] = value.strip()
+        return None
+
+    def _update_aggregates(self, records):
+        """把新记录累加到每日统计"""
+        for record in records:
+            day = self.state["days"].setdefault(
+                record["timestamp"][:10],
+                {"total": 0, "levels": {}, "actions": {}, "files": {}},
+            )
+            day["total"] += 1
+            levels = day["levels"]
+            levels[record["level"]] = levels.get(record["level"], 0) + 1
+            if record["action"]:
+                actions = day["actions"]
+                actions[record["action"]] = actions.get(record["action"], 0) + 1
+            path = record["path"]
+            if path and (path in day["files"] or len(day["files"]) < TOP_FILES_LIMIT):
+                day["files"][path] = day["files"].get(path, 0) + 1
+
+    def _spool(self, records):
+        """把人工条目追加到按天的记录文件，日报只需要读取当天的条目"""
+        by_day = {}
+        for record in records:
+            by_day.setdefault(record["timestamp"][:10], []).append(record)
+        if not by_day:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        for day, day_records in by_day.items():
+            with open(self._entries_path(day), "a", encoding="utf-8") as f:
+                for record in day_records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _entries_path(self, day):
+        """返回某天条目记录文件的路径"""
+        return os.path.join(self.state_dir, f"entries_{day.replace('-', '')}.jsonl")
+
+    def daily_aggregate(self, day):
+        """
+        获取某天的统计
+
+        Args:
+            day (str): 日期，格式为 YYYY-MM-DD
+
+        Returns:
+            dict: 统计信息，没有记录时返回 None
+        """
+        return self.state["days"].get(day)
+
+    def build_daily_input(self, day):
+        """
+        生成某天的日报输入文本：统计摘要加当天的人工条目
+
+        Args:
+            day (str): 日期，格式为 YYYY-MM-DD
+
+        Returns:
+            str: 日报输入文本
+        """
+        lines = [f"# {day} 日志摘要", ""]
+        aggregate = self.daily_aggregate(day)
+        if aggregate:
+            lines.append(f"日志记录数: {aggregate['total']}")
+            for action, count in sorted(aggregate["actions"].items()):
+                lines.append(f"{action}: {count}")
+            top_files = sorted(aggregate["files"].items(), key=lambda item: -item[1])
+            if top_files:
+                lines.append("")
+                lines.append("变更最多的文件:")
+                for path, count in top_files[:20]:
+                    lines.append(f"- {path} ({count} 次)")
+
+        try:
+            with open(self._entries_path(day), "r", encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except OSError:
+            entries = []
+        # 加上已解析但还没有通过 save() 写入记录文件的条目
+        entries += [e for e in self._pending_entries if e["timestamp"][:10] == day]
+        seen = set()
+        for entry in entries:
+            source = entry.get("source")
+            if source is not None:
+                if source in seen:
+                    continue
+                seen.add(source)
+            lines.append("")
+            lines.append(f"--- {entry['timestamp']} ---")
+            lines.append(entry["message"])
+        return "\n".join(lines) + "\n"
+
+    def write_daily_input(self, day):
+        """
+        把某天的日报输入写入文件
+
+        Returns:
+            str: 文件路径
+        """
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = os.path.join(self.state_dir, f"digest_{day.replace('-', '')}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.build_daily_input(day))
+        return path
+
+
+def main():
+    """主函数：增量解析日志并输出当天的统计"""
+    parser = argparse.ArgumentParser(description="增量解析文件监控日志")
+    parser.add_argument("logs", nargs="+", help="日志文件路径")
+    parser.add_argument(
+        "--day", default=datetime.now().strftime("%Y-%m-%d"), help="日期 YYYY-MM-DD"
+    )
+    args = parser.parse_args()
+
+    ingester = LogIngester()
+    for log_path in args.logs:
+        records = ingester.ingest(log_path)
+        print(f"{log_path}: 新增 {len(records)} 条记录")
+    ingester.save()
+    print(ingester.build_daily_input(args.day))
+
+
+if __name__ == "__main__":
+    main()
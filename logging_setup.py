@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步日志模块
+业务线程只把日志记录放入队列（QueueHandler），由后台 QueueListener 线程写入文件和控制台；
+日志文件按大小或时间轮转，可以同时输出一份 JSON Lines 文件，控制台输出可以限速
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON"""
+
+    def format(self, record):
+        """格式化日志记录"""
+        return json.dumps(
+            {
+                "time": self.formatTime(record, "%Y-%m-%d %H:%M:%S"),
+                "level": record.levelname,
+                "logger": record.name,
+                "thread": record.threadName,
+                "message": record.getMessage(),
+            },
+            ensure_ascii=False,
+        )
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    令牌桶限速过滤器
+
+    只限制 max_level 及以下级别的日志（默认 INFO），警告和错误总是输出；
+    被丢弃的条数附加在下一条输出的日志后面
+    """
+
+    def __init__(self, rate, burst=None, max_level=logging.INFO):
+        """
+        初始化过滤器
+
+        Args:
+            rate (float): 每秒允许输出的日志条数
+            burst (int): 允许的突发条数，默认等于 rate
+            max_level (int): 受限速影响的最高日志级别
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst or rate
+        self.max_level = max_level
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self.dropped = 0
+
+    def filter(self, record):
+        """判断日志是否输出"""
+        if record.levelno > self.max_level:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            if self._tokens < 1:
+                self.dropped += 1
+                return False
+            self._tokens -= 1
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            record.msg = f"{record.getMessage()}（此前 {dropped} 条日志因限速未输出）"
+            record.args = None
+        return True
+
+
+def _file_handler(path, formatter, max_bytes, backup_count, rotate_when):
+    """创建按时间（指定 rotate_when 时）或按大小轮转的文件处理器"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if rotate_when:
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=rotate_when, backupCount=backup_count, encoding="utf-8"
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+    handler.setFormatter(formatter)
+    return handler
+
+
+def setup_logging(
+    log_path,
+    level=logging.INFO,
+    max_bytes=10 * 1024 * 1024,
+    backup_count=5,
+    rotate_when=None,
+    json_path=None,
+    console_rate_limit=0,
+):
+    """
+    配置根日志记录器：记录先进入队列，由后台线程写入文件和控制台
+
+    与 logging.basicConfig 一样，根日志记录器已有处理器时不做任何修改
+
+    Args:
+        log_path (str): 文本日志文件路径
+        level (int): 日志级别
+        max_bytes (int): 按大小轮转时单个日志文件的最大字节数
+        backup_count (int): 保留的轮转文件数
+        rotate_when (str): 按时间轮转的周期（如 "midnight"），指定时不再按大小轮转
+        json_path (str): JSON Lines 日志文件路径，为 None 时不输出
+        console_rate_limit (float): 控制台每秒最多输出的 INFO 日志条数，0 表示不限速
+
+    Returns:
+        QueueListener: 后台写日志的监听器（进程退出时自动停止并写完剩余日志），
+            已配置过时返回 None
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+
+    handlers = [
+        _file_handler(
+            log_path,
+            logging.Formatter(LOG_FORMAT),
+            max_bytes,
+            backup_count,
+            rotate_when,
+        )
+    ]
+    if json_path:
+        handlers.append(
+            _file_handler(
+                json_path, JsonLinesFormatter(), max_bytes, backup_count, rotate_when
+            )
+        )
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    if console_rate_limit:
+        console.addFilter(RateLimitFilter(console_rate_limit))
+    # 限速过滤器会在记录后附加丢弃条数，控制台放在最后，不影响文件中的内容
+    handlers.append(console)
+
+    log_queue = queue.Queue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    listener.start()
+    atexit.register(stop_logging, listener)
+    return listener
+
+
+def stop_logging(listener):
+    """停止后台写日志的线程并写完队列中剩余的日志（可以重复调用）"""
+    if listener is not None and listener._thread is not None:
+        listener.stop()
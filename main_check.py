@@ -3,36 +3,60 @@
 """
 任务主线检查脚本
 用于检查当前任务是否符合项目主线目标
+
+用法:
+    python main_check.py <任务描述>              检查任务（常驻进程运行时交给它处理）
+    python main_check.py --no-daemon <任务描述>  在本进程内检查
+    python main_check.py --daemon                启动常驻检查进程
+    python main_check.py --range v1.0..HEAD      审计提交范围内的所有提交信息
+    python main_check.py --jsonl requests.jsonl  审计 JSONL 文件中的所有条目
 """
 
+import argparse
+import json
 import os
-import sys
 import re
-from typing import Dict, List, Tuple, Optional
-from rapidfuzz import fuzz, process
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# 默认任务文件
+TASK_FILE_PATH = "task.md"
+# 任务前面的状态标记(- [ ] / - [x])
+TASK_MARK_RE = re.compile(r"^-\s*\[[\sx]\]\s*")
+# 未来版本的状态
+PLANNED_STATUSES = ["计划中", "规划中"]
+# 模糊匹配的相似度阈值（%）
+SIMILARITY_THRESHOLD = 75
+# 审计条目数达到该值时使用进程池
+AUDIT_POOL_THRESHOLD = 2000
+# JSONL 条目中作为任务描述的字段（按顺序取第一个存在的）
+JSONL_TEXT_FIELDS = ("title", "message", "description", "body")
 
 
 class TaskChecker:
-    def __init__(self, task_file_path: str = "task.md"):
+    def __init__(self, task_file_path: str = TASK_FILE_PATH):
         """
         初始化任务检查器
-        
+
         Args:
             task_file_path: 任务文件路径，默认为"task.md"
         """
         self.task_file_path = task_file_path
         self.task_content = ""
         self.versions = {}
-        
+        self._indexed_versions = None
+
     def read_task_file(self) -> bool:
         """
         读取任务文件内容
-        
+
         Returns:
             bool: 读取成功返回True，否则返回False
         """
         try:
-            with open(self.task_file_path, 'r', encoding='utf-8') as file:
+            with open(self.task_file_path, "r", encoding="utf-8") as file:
                 self.task_content = file.read()
             return True
         except FileNotFoundError:
@@ -41,43 +65,46 @@ class TaskChecker:
         except Exception as e:
             print(f"错误: 读取任务文件时发生异常: {e}")
             return False
-    
+
     def parse_task_content(self) -> None:
         """
         解析任务文件内容，提取各个版本信息
         """
         # 清空之前的数据
         self.versions = {}
-        
+
         # 按章节分割内容
-        sections = re.split(r'^##\s+', self.task_content, flags=re.MULTILINE)
-        
+        sections = re.split(r"^##\s+", self.task_content, flags=re.MULTILINE)
+
         # 第一个是标题，跳过
         for section in sections[1:]:
-            lines = section.strip().split('\n')
+            lines = section.strip().split("\n")
             if not lines:
                 continue
-                
+
             # 获取版本标题
             version_title = lines[0].strip()
-            
+
             # 提取版本状态（进行中、计划中、规划中、已完成）
-            status_match = re.search(r'\(([^)]+)\)', version_title)
+            status_match = re.search(r"\(([^)]+)\)", version_title)
             status = status_match.group(1) if status_match else "未知"
-            
+
             # 提取版本名称
-            version_name = re.sub(r'\s*\([^)]+\)\s*$', '', version_title).strip()
-            
+            version_name = re.sub(r"\s*\([^)]+\)\s*$", "", version_title).strip()
+
             # 存储版本信息
             self.versions[version_name] = {
                 "status": status,
-                "tasks": lines[1:] if len(lines) > 1 else []
+                "tasks": lines[1:] if len(lines) > 1 else [],
             }
-    
+
+        # 预先计算任务索引
+        self.build_index()
+
     def get_current_version(self) -> Optional[str]:
         """
         获取当前进行中的版本
-        
+
         Returns:
             str: 当前版本名称，如果没有找到则返回None
         """
@@ -85,111 +112,297 @@ class TaskChecker:
             if info["status"] == "进行中":
                 return version
         return None
-    
-    def check_task_against_main_line(self, task_description: str) -> Tuple[bool, str, str]:
+
+    def build_index(self) -> None:
+        """
+        预先计算任务索引：清理后的任务文本及其所属版本，
+        解析任务文件后只计算一次，每次检查不再重复清理任务列表
+        """
+        self._choices = []
+        self._choice_versions = []
+        self._task_versions = {}
+        for version, info in self.versions.items():
+            for task in info["tasks"]:
+                # 移除任务前面的状态标记(- [ ])以进行比较
+                clean_task = TASK_MARK_RE.sub("", task.strip())
+                if clean_task:
+                    self._choices.append(clean_task)
+                    self._choice_versions.append(version)
+                    # 同名任务归属第一次出现的版本
+                    self._task_versions.setdefault(clean_task, version)
+        self._indexed_versions = self.versions
+
+    def _ensure_index(self) -> None:
+        """版本信息变化后重建任务索引"""
+        if self._indexed_versions is not self.versions:
+            self.build_index()
+
+    def _verdict(
+        self, version: str, current_version: str
+    ) -> Optional[Tuple[bool, str, str]]:
+        """
+        根据任务归属版本给出结论
+
+        Returns:
+            tuple: 归属当前版本或未来版本时返回检查结果，其他版本返回None
+        """
+        # 如果是未来版本的任务且当前版本未完成，则判定为偏离主线
+        if (
+            version != current_version
+            and self.versions[version]["status"] in PLANNED_STATUSES
+        ):
+            return False, current_version, version
+        # 如果是当前版本的任务，则判定为符合主线
+        elif version == current_version:
+            return True, current_version, current_version
+        return None
+
+    def exact_match(self, task_description: str, current_version: str) -> Optional[int]:
+        """
+        精确匹配阶段：任务文本与描述互相包含
+
+        Returns:
+            int: 第一个可判定结论（归属当前版本或未来版本）的任务下标，没有时返回None
+        """
+        self._ensure_index()
+        for index, (task, version) in enumerate(
+            zip(self._choices, self._choice_versions)
+        ):
+            if task in task_description or task_description in task:
+                if self._verdict(version, current_version):
+                    return index
+        return None
+
+    def fuzzy_best(self, task_description: str) -> Tuple[float, Optional[int]]:
+        """
+        模糊匹配阶段：取 partial_ratio 与 token_sort_ratio 中得分最高的任务
+
+        Returns:
+            tuple: (最高分, 匹配任务的下标)，没有任务时返回 (0, None)
+        """
+        self._ensure_index()
+        if not self._choices:
+            return 0, None
+        # rapidfuzz 导入较慢，精确匹配已有结论时不需要导入
+        from rapidfuzz import fuzz, process
+
+        # 使用多种评分器进行匹配，提高准确性；同分时优先 partial_ratio 的结果
+        _, best_score, best_index = process.extractOne(
+            task_description, self._choices, scorer=fuzz.partial_ratio
+        )
+        _, token_score, token_index = process.extractOne(
+            task_description, self._choices, scorer=fuzz.token_sort_ratio
+        )
+        if token_score > best_score:
+            best_score, best_index = token_score, token_index
+        return best_score, best_index
+
+    def fuzzy_best_batch(
+        self, task_descriptions: List[str], workers: int = -1
+    ) -> List[Tuple[float, Optional[int]]]:
+        """
+        批量模糊匹配：用 process.cdist 一次计算所有描述与所有任务的得分矩阵
+
+        Args:
+            task_descriptions: 任务描述列表
+            workers: cdist 使用的线程数，-1 表示使用全部 CPU
+
+        Returns:
+            list: 与 task_descriptions 一一对应的 (最高分, 匹配任务的下标)
+        """
+        self._ensure_index()
+        if not self._choices or not task_descriptions:
+            return [(0, None)] * len(task_descriptions)
+        from rapidfuzz import fuzz, process
+
+        try:
+            import numpy
+        except ImportError:
+            # cdist 需要 numpy，缺少时逐条匹配
+            return [self.fuzzy_best(description) for description in task_descriptions]
+
+        # 使用 float64 得分，与逐条匹配时的阈值比较结果一致
+        partial = process.cdist(
+            task_descriptions,
+            self._choices,
+            scorer=fuzz.partial_ratio,
+            dtype=numpy.float64,
+            workers=workers,
+        )
+        token_sort = process.cdist(
+            task_descriptions,
+            self._choices,
+            scorer=fuzz.token_sort_ratio,
+            dtype=numpy.float64,
+            workers=workers,
+        )
+        partial_index = partial.argmax(axis=1)
+        token_index = token_sort.argmax(axis=1)
+
+        results = []
+        for row in range(len(task_descriptions)):
+            best_score, best_index = (
+                partial[row, partial_index[row]],
+                partial_index[row],
+            )
+            if token_sort[row, token_index[row]] > best_score:
+                best_score, best_index = (
+                    token_sort[row, token_index[row]],
+                    token_index[row],
+                )
+            results.append((float(best_score), int(best_index)))
+        return results
+
+    def _exact_result(self, index: int, current_version: str) -> Dict:
+        """精确匹配的检查详情"""
+        return {
+            "result": self._verdict(self._choice_versions[index], current_version),
+            "matched_task": self._choices[index],
+            "score": 100.0,
+            "phase": "exact",
+        }
+
+    def _finish_check(
+        self,
+        task_description: str,
+        current_version: str,
+        best_score: float,
+        best_index: Optional[int],
+    ) -> Dict:
+        """
+        根据模糊匹配结果和未来版本关键词得出最终结论
+
+        Returns:
+            dict: 检查详情 {"result", "matched_task", "score", "phase"}
+        """
+        matched_task = self._choices[best_index] if best_index is not None else None
+        # 如果最佳匹配分数超过阈值
+        if matched_task and best_score >= SIMILARITY_THRESHOLD:
+            verdict = self._verdict(self._task_versions[matched_task], current_version)
+            if verdict:
+                return {
+                    "result": verdict,
+                    "matched_task": matched_task,
+                    "score": best_score,
+                    "phase": "fuzzy",
+                }
+
+        # 检查是否提及未来版本关键词
+        for version, info in self.versions.items():
+            if info["status"] in PLANNED_STATUSES and version in task_description:
+                # 如果任务提及未来版本且当前版本未完成，则判定为偏离主线
+                return {
+                    "result": (False, current_version, version),
+                    "matched_task": None,
+                    "score": best_score,
+                    "phase": "keyword",
+                }
+
+        # 默认认为属于当前版本（宽松匹配）
+        return {
+            "result": (True, current_version, current_version),
+            "matched_task": None,
+            "score": best_score,
+            "phase": "default",
+        }
+
+    def check_task_against_main_line(
+        self, task_description: str
+    ) -> Tuple[bool, str, str]:
         """
         检查任务是否符合主线目标
-        
+
         Args:
             task_description: 任务描述
-            
+
         Returns:
             tuple: (是否符合主线, 当前版本, 任务归属版本)
         """
         current_version = self.get_current_version()
         if not current_version:
             return False, "未知", "未知"
-        
-        # 收集所有版本的任务，建立任务字典
-        version_tasks = {}
-        for version, info in self.versions.items():
-            tasks = []
-            for task in info["tasks"]:
-                # 移除任务前面的状态标记(- [ ])以进行比较
-                clean_task = re.sub(r'^-\s*\[[\sx]\]\s*', '', task.strip())
-                if clean_task:
-                    tasks.append(clean_task)
-            version_tasks[version] = tasks
-        
-        # 使用rapidfuzz进行模糊匹配
-        # 设置相似度阈值为75%
-        similarity_threshold = 75
-        
+
         # 首先尝试精确匹配
-        for version, tasks in version_tasks.items():
-            for task in tasks:
-                if task and (task in task_description or task_description in task):
-                    # 如果是未来版本的任务且当前版本未完成，则判定为偏离主线
-                    if version != current_version and self.versions[version]["status"] in ["计划中", "规划中"]:
-                        return False, current_version, version
-                    # 如果是当前版本的任务，则判定为符合主线
-                    elif version == current_version:
-                        return True, current_version, current_version
-        
+        index = self.exact_match(task_description, current_version)
+        if index is not None:
+            return self._exact_result(index, current_version)["result"]
+
         # 如果没有精确匹配，使用模糊匹配
-        all_tasks_with_versions = []
-        for version, tasks in version_tasks.items():
-            for task in tasks:
-                if task:
-                    all_tasks_with_versions.append((task, version))
-        
-        if all_tasks_with_versions:
-            # 使用多种评分器进行匹配，提高准确性
-            matches_partial = process.extract(
-                task_description, 
-                [task for task, _ in all_tasks_with_versions], 
-                scorer=fuzz.partial_ratio,
-                limit=3
-            )
-            
-            matches_token_sort = process.extract(
-                task_description, 
-                [task for task, _ in all_tasks_with_versions], 
-                scorer=fuzz.token_sort_ratio,
-                limit=3
+        best_score, best_index = self.fuzzy_best(task_description)
+        return self._finish_check(
+            task_description, current_version, best_score, best_index
+        )["result"]
+
+    def audit_tasks(
+        self, task_descriptions: List[str], workers: int = -1
+    ) -> List[Dict]:
+        """
+        批量检查多个任务描述并返回检查详情，结论与逐条调用 check_task_against_main_line 相同
+
+        Args:
+            task_descriptions: 任务描述列表（如一个提交范围内的所有提交信息）
+            workers: 模糊匹配使用的线程数，-1 表示使用全部 CPU
+
+        Returns:
+            list: 与 task_descriptions 一一对应的检查详情
+                {"result": (是否符合主线, 当前版本, 任务归属版本), "matched_task", "score", "phase"}
+        """
+        current_version = self.get_current_version()
+        if not current_version:
+            return [
+                {
+                    "result": (False, "未知", "未知"),
+                    "matched_task": None,
+                    "score": None,
+                    "phase": "no_version",
+                }
+                for _ in task_descriptions
+            ]
+
+        details = []
+        pending = []
+        for i, description in enumerate(task_descriptions):
+            index = self.exact_match(description, current_version)
+            if index is not None:
+                details.append(self._exact_result(index, current_version))
+            else:
+                details.append(None)
+                pending.append(i)
+
+        fuzzy = self.fuzzy_best_batch(
+            [task_descriptions[i] for i in pending], workers=workers
+        )
+        for i, (best_score, best_index) in zip(pending, fuzzy):
+            details[i] = self._finish_check(
+                task_descriptions[i], current_version, best_score, best_index
             )
-            
-            # 合并匹配结果
-            all_matches = matches_partial + matches_token_sort
-            best_match = None
-            best_score = 0
-            best_version = None
-            
-            for match_task, score, idx in all_matches:
-                if score > best_score:
-                    best_score = score
-                    best_match = match_task
-                    # 找到对应的版本
-                    for task, version in all_tasks_with_versions:
-                        if task == match_task:
-                            best_version = version
-                            break
-            
-            # 如果最佳匹配分数超过阈值
-            if best_match and best_score >= similarity_threshold and best_version:
-                # 如果是未来版本的任务且当前版本未完成，则判定为偏离主线
-                if best_version != current_version and self.versions[best_version]["status"] in ["计划中", "规划中"]:
-                    return False, current_version, best_version
-                # 如果是当前版本的任务，则判定为符合主线
-                elif best_version == current_version:
-                    return True, current_version, current_version
-        
-        # 检查是否提及未来版本关键词
-        for version, info in self.versions.items():
-            if info["status"] in ["计划中", "规划中"] and version in task_description:
-                # 如果任务提及未来版本且当前版本未完成，则判定为偏离主线
-                return False, current_version, version
-        
-        # 默认认为属于当前版本（宽松匹配）
-        return True, current_version, current_version
-    
+        return details
+
+    def check_tasks_against_main_line(
+        self, task_descriptions: List[str], workers: int = -1
+    ) -> List[Tuple[bool, str, str]]:
+        """
+        批量检查多个任务描述，结果与逐条调用 check_task_against_main_line 相同
+
+        Args:
+            task_descriptions: 任务描述列表（如一个提交范围内的所有提交信息）
+            workers: 模糊匹配使用的线程数，-1 表示使用全部 CPU
+
+        Returns:
+            list: 与 task_descriptions 一一对应的 (是否符合主线, 当前版本, 任务归属版本)
+        """
+        return [
+            detail["result"]
+            for detail in self.audit_tasks(task_descriptions, workers=workers)
+        ]
+
     def run_check(self, task_description: str = "") -> int:
         """
         运行主线任务检查
-        
+
         Args:
             task_description: 任务描述（可选）
-            
+
         Returns:
             int: 检查结果状态码
                 0: 符合主线
@@ -199,47 +412,269 @@ class TaskChecker:
         # 读取任务文件
         if not self.read_task_file():
             return 2
-        
+
         # 解析任务内容
         self.parse_task_content()
-        
+
         # 如果提供了任务描述，则进行检查
         if task_description:
-            is_main_line, current_version, task_version = self.check_task_against_main_line(task_description)
-            
-            if is_main_line:
-                print(f"检查通过: 任务符合当前主线版本 ({current_version})")
-                return 0
-            else:
-                print(f"检查不通过: 任务偏离主线")
-                print(f"当前主线版本: {current_version}")
-                print(f"任务归属版本: {task_version}")
-                return 1
-        
+            return print_check_result(
+                *self.check_task_against_main_line(task_description)
+            )
+
         # 如果没有提供任务描述，只显示当前版本信息
-        current_version = self.get_current_version()
-        if current_version:
-            print(f"当前进行中版本: {current_version}")
-        else:
-            print("未找到标记为'进行中'的版本")
-        
+        return print_current_version(self.get_current_version())
+
+
+def print_check_result(
+    is_main_line: bool, current_version: str, task_version: str
+) -> int:
+    """
+    输出检查结果
+
+    Returns:
+        int: 检查结果状态码，0 表示符合主线，1 表示偏离主线
+    """
+    if is_main_line:
+        print(f"检查通过: 任务符合当前主线版本 ({current_version})")
         return 0
+    else:
+        print("检查不通过: 任务偏离主线")
+        print(f"当前主线版本: {current_version}")
+        print(f"任务归属版本: {task_version}")
+        return 1
+
+
+def print_current_version(current_version: Optional[str]) -> int:
+    """输出当前进行中的版本"""
+    if current_version:
+        print(f"当前进行中版本: {current_version}")
+    else:
+        print("未找到标记为'进行中'的版本")
+
+    return 0
+
+
+def read_commit_messages(rev_range: str, repo_dir: str = ".") -> List[Dict]:
+    """
+    读取提交范围内每个提交的标题行
+
+    Args:
+        rev_range: 提交范围，如 v1.0..HEAD
+        repo_dir: 仓库目录
+
+    Returns:
+        list: [{"id": 提交哈希, "text": 提交标题}, ...]，按从新到旧排列
+    """
+    output = subprocess.run(
+        ["git", "log", "--format=%H%x1f%B%x1e", rev_range, "--"],
+        cwd=repo_dir,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        check=True,
+    ).stdout
+    items = []
+    for record in output.split("\x1e"):
+        record = record.strip("\n")
+        if not record:
+            continue
+        commit, message = record.split("\x1f", 1)
+        items.append({"id": commit, "text": message.strip().split("\n")[0]})
+    return items
+
+
+def read_jsonl_items(jsonl_path: str) -> List[Dict]:
+    """
+    读取 JSONL 文件中的条目（如 requests.jsonl）
+
+    Returns:
+        list: [{"id": request_id/id/行号, "text": 任务描述}, ...]
+    """
+    items = []
+    with open(jsonl_path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            text = next(
+                (entry[field] for field in JSONL_TEXT_FIELDS if entry.get(field)), ""
+            )
+            items.append(
+                {
+                    "id": entry.get("request_id") or entry.get("id") or line_number,
+                    "text": text,
+                }
+            )
+    return items
+
+
+# 进程池中每个进程解析一次任务文件
+_worker_checker = None
+
+
+def _init_audit_worker(task_file_path: str) -> None:
+    """进程池初始化：解析任务文件"""
+    global _worker_checker
+    _worker_checker = TaskChecker(task_file_path)
+    _worker_checker.read_task_file()
+    _worker_checker.parse_task_content()
+
+
+def _audit_chunk(descriptions: List[str]) -> List[Dict]:
+    """在进程池中检查一批任务描述（进程间已并行，cdist 只用一个线程）"""
+    return _worker_checker.audit_tasks(descriptions, workers=1)
+
+
+def audit_items(
+    checker: TaskChecker, items: List[Dict], processes: Optional[int] = None
+) -> Dict:
+    """
+    一次审计多个条目
+
+    Args:
+        checker: 已解析任务文件的检查器
+        items: [{"id", "text"}, ...]
+        processes: 进程数，默认为 CPU 数；条目数少于 AUDIT_POOL_THRESHOLD 或为 1 时在本进程内执行
+
+    Returns:
+        dict: 审计报告，包含每个条目的结论、匹配到的任务和得分
+    """
+    descriptions = [item["text"] for item in items]
+    processes = processes or os.cpu_count() or 1
+    if processes > 1 and len(descriptions) >= AUDIT_POOL_THRESHOLD:
+        # 每个进程分到多个批次，避免个别批次较慢时其他进程空闲
+        chunk_size = max(1, -(-len(descriptions) // (processes * 4)))
+        chunks = [
+            descriptions[i : i + chunk_size]
+            for i in range(0, len(descriptions), chunk_size)
+        ]
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_audit_worker,
+            initargs=(checker.task_file_path,),
+        ) as pool:
+            details = [
+                detail for chunk in pool.map(_audit_chunk, chunks) for detail in chunk
+            ]
+    else:
+        details = checker.audit_tasks(descriptions)
+
+    report_items = []
+    for item, detail in zip(items, details):
+        is_main_line, _, task_version = detail["result"]
+        score = detail["score"]
+        report_items.append(
+            {
+                "id": item["id"],
+                "text": item["text"],
+                "verdict": "pass" if is_main_line else "fail",
+                "task_version": task_version,
+                "matched_task": detail["matched_task"],
+                "score": round(score, 1) if score is not None else None,
+                "phase": detail["phase"],
+            }
+        )
+    failed = sum(1 for item in report_items if item["verdict"] == "fail")
+    return {
+        "task_file": checker.task_file_path,
+        "current_version": checker.get_current_version(),
+        "total": len(report_items),
+        "passed": len(report_items) - failed,
+        "failed": failed,
+        "items": report_items,
+    }
+
+
+def run_audit(args: argparse.Namespace) -> int:
+    """
+    执行审计模式并输出 JSON 报告
+
+    Returns:
+        int: 0 表示全部符合主线，1 表示有偏离主线的条目，2 表示读取失败
+    """
+    checker = TaskChecker(TASK_FILE_PATH)
+    if not checker.read_task_file():
+        return 2
+    checker.parse_task_content()
+
+    try:
+        if args.rev_range:
+            items = read_commit_messages(args.rev_range)
+            source = {"range": args.rev_range}
+        else:
+            items = read_jsonl_items(args.jsonl)
+            source = {"jsonl": args.jsonl}
+    except subprocess.CalledProcessError as e:
+        print(f"错误: 读取提交范围失败: {e.stderr.strip()}", file=sys.stderr)
+        return 2
+    except (OSError, ValueError) as e:
+        print(f"错误: 读取审计条目失败: {e}", file=sys.stderr)
+        return 2
+
+    report = {**source, **audit_items(checker, items, processes=args.processes)}
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+        print(
+            f"审计完成: 共 {report['total']} 条，{report['failed']} 条偏离主线，报告已保存: {args.output}"
+        )
+    else:
+        print(output)
+    return 1 if report["failed"] else 0
 
 
 def main():
     """主函数"""
-    # 创建任务检查器实例
-    checker = TaskChecker()
-    
+    parser = argparse.ArgumentParser(description="检查任务是否符合项目主线目标")
+    parser.add_argument("task", nargs="*", help="任务描述")
+    parser.add_argument("--daemon", action="store_true", help="启动常驻检查进程")
+    parser.add_argument(
+        "--no-daemon", action="store_true", help="不使用常驻进程，在本进程内检查"
+    )
+    parser.add_argument(
+        "--range",
+        dest="rev_range",
+        help="审计 git 提交范围内的所有提交信息，如 v1.0..HEAD",
+    )
+    parser.add_argument("--jsonl", help="审计 JSONL 文件中的所有条目")
+    parser.add_argument("-o", "--output", help="审计报告输出路径，默认输出到标准输出")
+    parser.add_argument("--processes", type=int, help="审计使用的进程数，默认为 CPU 数")
+    args = parser.parse_args()
+
+    if args.daemon:
+        # 常驻模式：在本地 Unix 套接字上提供检查服务
+        from main_check_daemon import serve
+
+        sys.exit(serve(TASK_FILE_PATH))
+
+    if args.rev_range or args.jsonl:
+        sys.exit(run_audit(args))
+
     # 获取命令行参数
-    task_description = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else ""
-    
-    # 运行检查
-    result = checker.run_check(task_description)
-    
+    task_description = " ".join(args.task)
+
+    # 优先交给常驻进程检查，避免每次启动都导入 rapidfuzz 并解析任务文件
+    response = None
+    if not args.no_daemon:
+        from main_check_daemon import check_via_daemon
+
+        response = check_via_daemon(
+            TASK_FILE_PATH, [task_description] if task_description else []
+        )
+
+    if response is None:
+        # 常驻进程未运行时在本进程内检查
+        result = TaskChecker(TASK_FILE_PATH).run_check(task_description)
+    elif task_description:
+        result = print_check_result(*response["results"][0])
+    else:
+        result = print_current_version(response["current_version"])
+
     # 根据结果返回相应的退出码
     sys.exit(result)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
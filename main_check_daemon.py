@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务主线检查常驻进程
+在本地 Unix 套接字上提供检查服务，按任务文件的修改时间缓存解析结果，
+作为提交钩子频繁调用时不必每次都启动解释器、导入 rapidfuzz 并解析 task.md；
+客户端部分只依赖标准库，常驻进程未运行时返回 None，由调用方在本进程内检查
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+# 套接字文件名（位于任务文件所在目录）
+SOCKET_NAME = ".main_check.sock"
+# 常驻进程空闲多久后自动退出（秒）
+IDLE_TIMEOUT = 3600
+# 客户端连接和等待结果的超时时间（秒）
+CLIENT_TIMEOUT = 2.0
+
+
+def socket_path(task_file_path):
+    """返回任务文件对应的套接字路径"""
+    task_dir = os.path.dirname(os.path.abspath(task_file_path))
+    return os.path.join(task_dir, SOCKET_NAME)
+
+
+def request_daemon(task_file_path, payload, timeout=CLIENT_TIMEOUT):
+    """
+    向常驻进程发送一个请求
+
+    Returns:
+        dict: 响应内容，常驻进程未运行或通信失败时返回 None
+    """
+    path = socket_path(task_file_path)
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(
+                json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+            )
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        return json.loads(data)
+    except (OSError, ValueError):
+        return None
+
+
+def check_via_daemon(task_file_path, descriptions):
+    """
+    交给常驻进程检查任务描述
+
+    Args:
+        task_file_path (str): 任务文件路径
+        descriptions (list): 任务描述列表，为空时只查询当前版本
+
+    Returns:
+        dict: {"current_version": ..., "results": [[是否符合主线, 当前版本, 任务归属版本], ...]}，
+            常驻进程不可用或出错时返回 None
+    """
+    response = request_daemon(
+        task_file_path,
+        {
+            "op": "check",
+            "task_file": os.path.abspath(task_file_path),
+            "descriptions": descriptions,
+        },
+    )
+    if response is None or "error" in response:
+        return None
+    return response
+
+
+class CheckerCache:
+    """按任务文件的 inode、修改时间和大小缓存解析好的 TaskChecker"""
+
+    def __init__(self):
+        """初始化缓存"""
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.reloads = 0
+
+    def get(self, task_file_path):
+        """
+        获取任务文件对应的 TaskChecker，文件变化后重新解析
+
+        Raises:
+            OSError: 任务文件不存在或无法读取
+        """
+        from main_check import TaskChecker
+
+        path = os.path.abspath(task_file_path)
+        stat = os.stat(path)
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                return entry[1]
+            checker = TaskChecker(path)
+            if not checker.read_task_file():
+                raise OSError(f"无法读取任务文件: {path}")
+            checker.parse_task_content()
+            self._entries[path] = (key, checker)
+            self.reloads += 1
+            return checker
+
+
+class CheckRequestHandler(socketserver.StreamRequestHandler):
+    """处理一行 JSON 请求并返回一行 JSON 响应"""
+
+    def handle(self):
+        """处理请求"""
+        self.server.last_activity = time.monotonic()
+        try:
+            request = json.loads(self.rfile.readline())
+            response = self.dispatch(request)
+        except Exception as e:
+            response = {"error": str(e)}
+        self.wfile.write(
+            json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+        )
+
+    def dispatch(self, request):
+        """根据请求类型执行检查"""
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "reloads": self.server.checkers.reloads}
+        if op != "check":
+            return {"error": f"未知请求: {op}"}
+
+        checker = self.server.checkers.get(request["task_file"])
+        descriptions = request.get("descriptions", [])
+        return {
+            "current_version": checker.get_current_version(),
+            "results": checker.check_tasks_against_main_line(descriptions),
+        }
+
+
+class CheckServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """任务检查服务"""
+
+    daemon_threads = True
+
+    def __init__(self, path):
+        """在 path 上监听，只允许当前用户连接"""
+        super().__init__(path, CheckRequestHandler)
+        os.chmod(path, 0o600)
+        self.checkers = CheckerCache()
+        self.last_activity = time.monotonic()
+
+
+def start_server(task_file_path):
+    """
+    在后台线程中启动检查服务
+
+    Returns:
+        CheckServer: 服务实例，套接字已存在且有进程响应时返回 None
+    """
+    path = socket_path(task_file_path)
+    if request_daemon(task_file_path, {"op": "ping"}) is not None:
+        return None
+    if os.path.exists(path):
+        # 上次未正常退出留下的套接字文件
+        os.remove(path)
+
+    server = CheckServer(path)
+    # 预先解析任务文件并导入 rapidfuzz，第一次请求也能立即返回
+    server.checkers.get(task_file_path).fuzzy_best("")
+    threading.Thread(
+        target=server.serve_forever, name="main-check-daemon", daemon=True
+    ).start()
+    return server
+
+
+def stop_server(server):
+    """停止检查服务并删除套接字文件"""
+    server.shutdown()
+    server.server_close()
+    try:
+        os.remove(server.server_address)
+    except OSError:
+        pass
+
+
+def serve(task_file_path, idle_timeout=IDLE_TIMEOUT):
+    """
+    以常驻模式运行检查服务，空闲超过 idle_timeout 秒后退出
+
+    Returns:
+        int: 退出码
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        print("错误: 当前平台不支持 Unix 套接字，无法启动常驻模式")
+        return 2
+    try:
+        server = start_server(task_file_path)
+    except OSError as e:
+        print(f"错误: 启动常驻模式失败: {e}")
+        return 2
+    if server is None:
+        print(f"常驻进程已在运行: {socket_path(task_file_path)}")
+        return 0
+
+    print(f"任务检查常驻进程已启动: {server.server_address}")
+    try:
+        while time.monotonic() - server.last_activity < idle_timeout:
+            time.sleep(1)
+        print("空闲超时，常驻进程退出")
+    except KeyboardInterrupt:
+        print("常驻进程已停止")
+    finally:
+        stop_server(server)
+    return 0
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日报写入模块
+所有日报条目经由同一个写入器写入，长期持有文件句柄并在缓冲区达到大小
+或时间阈值时批量刷新，按日期切换文件，保证每条记录完整写入不被交错
+"""
+
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+class DailyReportWriter:
+    """带缓冲的日报写入器"""
+
+    def __init__(
+        self,
+        report_dir,
+        prefix="daily_report_",
+        suffix=".txt",
+        flush_size=64 * 1024,
+        flush_interval=1.0,
+    ):
+        """
+        初始化日报写入器
+
+        Args:
+            report_dir (str): 日报保存目录
+            prefix (str): 日报文件名前缀
+            suffix (str): 日报文件扩展名
+            flush_size (int): 缓冲区达到该字节数时立即刷新
+            flush_interval (float): 缓冲内容最长停留时间（秒）
+        """
+        self.report_dir = report_dir
+        self.prefix = prefix
+        self.suffix = suffix
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._file = None
+        self._date_str = None
+        self._closed = False
+        self._wakeup = threading.Event()
+        self._flusher = None
+        atexit.register(self.close)
+
+    def report_path(self, date_str):
+        """返回指定日期的日报文件路径"""
+        return os.path.join(self.report_dir, f"{self.prefix}{date_str}{self.suffix}")
+
+    def write_record(self, record, when=None):
+        """
+        写入一条完整的日报记录
+
+        Args:
+            record (str): 记录内容
+            when (datetime): 记录所属时间，用于选择日报文件，默认为当前时间
+        """
+        date_str = (when or datetime.now()).strftime("%Y%m%d")
+        with self._lock:
+            if self._closed:
+                raise ValueError("日报写入器已关闭")
+            if date_str != self._date_str:
+                # 日期变化时先把旧日期的内容写完再切换文件
+                self._flush_locked()
+                self._rotate_locked(date_str)
+            self._buffer.append(record)
+            self._buffered_bytes += len(record.encode("utf-8"))
+            if self._buffered_bytes >= self.flush_size:
+                self._flush_locked()
+        self._ensure_flusher()
+
+    def flush(self):
+        """把缓冲区内容写入文件"""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """刷新缓冲区并关闭文件句柄"""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._wakeup.set()
+
+    def _rotate_locked(self, date_str):
+        """切换到指定日期的日报文件（需持有锁）"""
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(self.report_dir, exist_ok=True)
+        self._file = open(self.report_path(date_str), "a", encoding="utf-8")
+        self._date_str = date_str
+
+    def _flush_locked(self):
+        """写出缓冲区（需持有锁），每次写入只包含完整记录"""
+        if not self._buffer or self._file is None:
+            return
+        try:
+            self._file.write("".join(self._buffer))
+            self._file.flush()
+        except OSError as e:
+            logger.error(f"写入日报失败: {e}")
+            return
+        self._buffer.clear()
+        self._buffered_bytes = 0
+
+    def _ensure_flusher(self):
+        """启动定时刷新线程"""
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="report-writer", daemon=True
+                )
+                self._flusher.start()
+
+    def _flush_loop(self):
+        """定时刷新缓冲区"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self.flush()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+版本保留策略模块
+按分层策略决定保留哪些历史版本，例如 1 小时内全部保留、1 天内每小时保留一个、
+30 天内每天保留一个，使长期运行的服务的存储增长有界且可预测
+"""
+
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# 默认分层策略: (最大年龄秒数, 分桶秒数)，分桶为 0 表示全部保留
+DEFAULT_TIERS = [(HOUR, 0), (DAY, HOUR), (30 * DAY, DAY)]
+
+# 缓存版本文件名中的时间格式
+VERSION_TIME_FORMAT = "%Y%m%dT%H%M%S_%f"
+
+
+class RetentionPolicy:
+    """分层版本保留策略"""
+
+    def __init__(self, tiers=None):
+        """
+        初始化保留策略
+
+        Args:
+            tiers (list): [(最大年龄秒数, 分桶秒数), ...]，按最大年龄从小到大排列；
+                比最后一层更旧的版本全部删除
+        """
+        self.tiers = sorted(tiers or DEFAULT_TIERS)
+
+    def select(self, timestamps, now=None):
+        """
+        选出需要保留的版本
+
+        每一层内按分桶保留最新的一个版本；最新的版本总是保留
+
+        Args:
+            timestamps (list): 各版本的 Unix 时间戳
+            now (float): 当前时间，默认为 time.time()
+
+        Returns:
+            set: 需要保留的版本下标
+        """
+        if not timestamps:
+            return set()
+        now = time.time() if now is None else now
+
+        keep = {max(range(len(timestamps)), key=lambda i: timestamps[i])}
+        newest_in_bucket = {}
+        for i, ts in enumerate(timestamps):
+            age = max(0.0, now - ts)
+            for tier_index, (max_age, bucket) in enumerate(self.tiers):
+                if age > max_age:
+                    continue
+                if bucket <= 0:
+                    keep.add(i)
+                else:
+                    key = (tier_index, int(ts // bucket))
+                    current = newest_in_bucket.get(key)
+                    if current is None or ts > timestamps[current]:
+                        newest_in_bucket[key] = i
+                break
+        keep.update(newest_in_bucket.values())
+        return keep
+
+
+def version_name(when=None):
+    """
+    生成缓存版本文件名
+
+    Args:
+        when (datetime): 版本时间，默认为当前时间
+
+    Returns:
+        str: 版本文件名
+    """
+    return (when or datetime.now()).strftime(VERSION_TIME_FORMAT)
+
+
+def prune_version_dirs(versions_root, policy, now=None):
+    """
+    按保留策略清理缓存版本目录
+
+    目录结构为 versions_root/<文件相对路径>/<版本文件名>，每个文件独立应用策略
+
+    Args:
+        versions_root (str): 版本根目录
+        policy (RetentionPolicy): 保留策略
+        now (float): 当前时间
+
+    Returns:
+        int: 删除的版本数
+    """
+    removed = 0
+    if not os.path.isdir(versions_root):
+        return removed
+
+    for root, dirs, files in os.walk(versions_root):
+        versions = []
+        for name in files:
+            try:
+                versions.append((name, _parse_version_time(name)))
+            except ValueError:
+                continue
+        if not versions:
+            continue
+
+        keep = policy.select([ts for _, ts in versions], now)
+        for i, (name, _) in enumerate(versions):
+            if i not in keep:
+                try:
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"删除缓存版本失败 {name}: {e}")
+
+    # 清理已经没有版本的空目录
+    for root, dirs, files in os.walk(versions_root, topdown=False):
+        if root != versions_root and not os.listdir(root):
+            shutil.rmtree(root, ignore_errors=True)
+
+    if removed:
+        logger.info(f"已按保留策略删除 {removed} 个缓存版本")
+    return removed
+
+
+def _parse_version_time(name):
+    """从版本文件名解析时间戳"""
+    return datetime.strptime(name, VERSION_TIME_FORMAT).timestamp()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+摘要缓存模块
+按（内容哈希、模板哈希、提示词版本）缓存模型生成的摘要，
+重复生成同一天的日报时只把新增或变化的内容发送给模型
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+def content_hash(text):
+    """计算文本的 SHA-256 哈希"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """按大小上限做 LRU 淘汰的磁盘摘要缓存"""
+
+    def __init__(self, cache_dir=".summary_cache", max_bytes=50 * 1024 * 1024):
+        """
+        初始化摘要缓存
+
+        Args:
+            cache_dir (str): 缓存目录
+            max_bytes (int): 缓存内容的总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._index = {}
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    @staticmethod
+    def make_key(chunk_text, template_text, prompt_version):
+        """
+        生成缓存键
+
+        Args:
+            chunk_text (str): 输入内容块
+            template_text (str): 日报模板
+            prompt_version: 提示词版本，修改提示词时递增使旧缓存失效
+
+        Returns:
+            str: 缓存键
+        """
+        parts = [content_hash(chunk_text), content_hash(template_text)]
+        parts.append(str(prompt_version))
+        return content_hash("\n".join(parts))
+
+    def _entry_path(self, key):
+        """返回缓存条目的文件路径"""
+        return os.path.join(self.cache_dir, key[:2], key + ".txt")
+
+    def _load_index(self):
+        """读取缓存索引，忽略已被删除的条目"""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        for key, entry in index.items():
+            if os.path.exists(self._entry_path(key)):
+                self._index[key] = entry
+                self._total_bytes += entry["size"]
+
+    def get(self, key):
+        """
+        读取缓存的摘要
+
+        Args:
+            key (str): 缓存键
+
+        Returns:
+            str: 摘要内容，未命中返回 None
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                try:
+                    with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                        value = f.read()
+                except OSError:
+                    self._remove_locked(key)
+                else:
+                    entry["last_used"] = time.time()
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        写入摘要，超出大小上限时淘汰最久未使用的条目
+
+        Args:
+            key (str): 缓存键
+            value (str): 摘要内容
+        """
+        data = value.encode("utf-8")
+        path = self._entry_path(key)
+        with self._lock:
+            if key in self._index:
+                self._remove_locked(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._index[key] = {"size": len(data), "last_used": time.time()}
+            self._total_bytes += len(data)
+            self._evict_locked()
+
+    def _evict_locked(self):
+        """淘汰最久未使用的条目直到不超过大小上限（需持有锁）"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_used"]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove_locked(key)
+            self.evictions += 1
+
+    def _remove_locked(self, key):
+        """删除一个条目（需持有锁）"""
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry["size"]
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def save(self):
+        """把缓存索引写入磁盘"""
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self.index_path)
+
+    def stats(self):
+        """
+        获取缓存统计信息
+
+        Returns:
+            dict: 命中、未命中、淘汰次数和当前大小
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+            }
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 日报批量分发器测试
+使用本地桩服务离线运行
+"""
+
+import threading
+import time
+import unittest
+
+from ai_dispatcher import AIReportDispatcher
+from ai_stub_server import StubAIServer
+
+
+def make_event(i):
+    """生成测试事件"""
+    return {
+        "action": "MODIFIED",
+        "file_path": f"file_{i}.txt",
+        "timestamp": "2025-12-15 10:00:00",
+    }
+
+
+class TestAIReportDispatcher(unittest.TestCase):
+    """AI 日报分发器测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.results = []
+        self.done = threading.Event()
+        self.expected = 0
+
+    def on_reports(self, results):
+        """收集回调结果"""
+        self.results.extend(results)
+        if len(self.results) >= self.expected:
+            self.done.set()
+
+    def make_dispatcher(self, url, **kwargs):
+        """创建分发器"""
+        options = {"batch_size": 10, "batch_interval": 0.2, "backoff_base": 0.01}
+        options.update(kwargs)
+        return AIReportDispatcher(url, on_reports=self.on_reports, **options)
+
+    def test_batches_by_count(self):
+        """达到批次大小时合并为一个请求"""
+        with StubAIServer() as server:
+            dispatcher = self.make_dispatcher(server.url, batch_interval=5.0)
+            self.expected = 30
+            for i in range(30):
+                dispatcher.submit(make_event(i))
+            self.assertTrue(self.done.wait(5))
+            dispatcher.stop()
+
+        self.assertEqual(server.requests_received, 3)
+        self.assertEqual(server.events_received, 30)
+        self.assertTrue(self.results[0][1]["summary"].startswith("[stub]"))
+
+    def test_flushes_on_time_window(self):
+        """窗口到期时发送未满的批次"""
+        with StubAIServer() as server:
+            dispatcher = self.make_dispatcher(server.url, batch_size=100)
+            self.expected = 3
+            for i in range(3):
+                dispatcher.submit(make_event(i))
+            self.assertTrue(self.done.wait(5))
+            dispatcher.stop()
+
+        self.assertEqual(server.requests_received, 1)
+
+    def test_retries_with_backoff(self):
+        """服务暂时不可用时重试"""
+        with StubAIServer(fail_first=2) as server:
+            dispatcher = self.make_dispatcher(server.url)
+            self.expected = 1
+            dispatcher.submit(make_event(0))
+            self.assertTrue(self.done.wait(5))
+            dispatcher.stop()
+
+        self.assertEqual(server.requests_received, 3)
+        self.assertEqual(dispatcher.stats["retries"], 2)
+
+    def test_disabled_uses_simulated_reports(self):
+        """未启用接口时使用本地模拟结果"""
+        dispatcher = self.make_dispatcher("http://127.0.0.1:9/unused", enabled=False)
+        self.expected = 1
+        dispatcher.submit(make_event(0))
+        self.assertTrue(self.done.wait(5))
+        dispatcher.stop()
+
+        self.assertIn("file_0.txt", self.results[0][1]["summary"])
+
+    def test_throughput(self):
+        """大量事件以少量请求发送"""
+        with StubAIServer() as server:
+            dispatcher = self.make_dispatcher(server.url, batch_size=200)
+            self.expected = 5000
+            start = time.monotonic()
+            for i in range(5000):
+                dispatcher.submit(make_event(i))
+            self.assertTrue(self.done.wait(30))
+            elapsed = time.monotonic() - start
+            dispatcher.stop()
+
+        self.assertEqual(server.events_received, 5000)
+        self.assertLessEqual(server.requests_received, 30)
+        print(
+            f"吞吐量: {5000 / elapsed:.0f} 事件/秒, 请求数: {server.requests_received}"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 日报发件箱测试
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from ai_dispatcher import AIReportDispatcher
+from ai_outbox import AIOutbox
+from ai_stub_server import StubAIServer
+
+
+class TestAIOutbox(unittest.TestCase):
+    """AI 日报发件箱测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "outbox.db")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def test_survives_restart(self):
+        """进程重启后未确认的事件恢复为待发送"""
+        outbox = AIOutbox(self.db_path)
+        outbox.put({"file_path": "a.txt"}, "key-a")
+        outbox.put({"file_path": "b.txt"}, "key-b")
+        claimed = outbox.claim(10)
+        outbox.ack([claimed[0][0]])
+        outbox.close()
+
+        outbox = AIOutbox(self.db_path)
+        rows = outbox.claim(10)
+        self.assertEqual([row[1] for row in rows], ["key-b"])
+        outbox.close()
+
+    def test_idempotency_key(self):
+        """相同幂等键的事件只写入一次"""
+        outbox = AIOutbox(self.db_path)
+        self.assertTrue(outbox.put({"file_path": "a.txt"}, "same"))
+        self.assertFalse(outbox.put({"file_path": "a.txt"}, "same"))
+        self.assertEqual(outbox.stats()["backlog"], 1)
+        outbox.close()
+
+    def test_nack_backs_off(self):
+        """投递失败后按退避时间延迟重试"""
+        outbox = AIOutbox(self.db_path, backoff_base=60)
+        outbox.put({"file_path": "a.txt"})
+        ids = [row[0] for row in outbox.claim(10)]
+        outbox.nack(ids, "boom")
+        self.assertEqual(outbox.count_ready(), 0)
+        self.assertGreater(outbox.next_due_in(), 20)
+        self.assertEqual(outbox.stats()["pending"], 1)
+        outbox.close()
+
+    def test_dispatcher_redelivers_after_outage(self):
+        """AI 接口故障期间事件保留在发件箱，恢复后投递"""
+        results = []
+        done = threading.Event()
+
+        def on_reports(batch):
+            results.extend(batch)
+            done.set()
+
+        outbox = AIOutbox(self.db_path, backoff_base=0.05)
+        with StubAIServer(fail_first=3) as server:
+            dispatcher = AIReportDispatcher(
+                server.url,
+                on_reports=on_reports,
+                batch_interval=0.05,
+                max_retries=1,
+                backoff_base=0.01,
+                outbox=outbox,
+            )
+            dispatcher.submit({"action": "CREATED", "file_path": "a.txt"})
+            self.assertTrue(done.wait(10))
+            dispatcher.stop()
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(set(server.idempotency_keys)), 1)
+        status = dispatcher.status()
+        self.assertEqual(status["backlog"], 0)
+        self.assertEqual(status["delivered_total"], 1)
+        self.assertGreaterEqual(status["batches_failed"], 1)
+        outbox.close()
+
+    def test_in_flight_cap(self):
+        """同时发送中的批次数不超过上限"""
+        active = []
+        peak = []
+        lock = threading.Lock()
+        done = threading.Event()
+        delivered = []
+
+        def on_reports(batch):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            threading.Event().wait(0.05)
+            with lock:
+                active.pop()
+                delivered.extend(batch)
+                if len(delivered) >= 20:
+                    done.set()
+
+        dispatcher = AIReportDispatcher(
+            "http://127.0.0.1:9/unused",
+            on_reports=on_reports,
+            enabled=False,
+            batch_size=2,
+            batch_interval=0.01,
+            max_in_flight=2,
+        )
+        for i in range(20):
+            dispatcher.submit({"action": "MODIFIED", "file_path": f"{i}.txt"})
+        self.assertTrue(done.wait(10))
+        dispatcher.stop()
+        self.assertLessEqual(max(peak), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
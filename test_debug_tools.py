@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行时诊断测试
+"""
+
+import threading
+import unittest
+
+from debug_tools import ProfileBusyError, format_collapsed, sample_stacks, thread_stacks
+
+
+def busy_worker(stop_event):
+    """持续占用 CPU 直到 stop_event 被设置"""
+    while not stop_event.is_set():
+        sum(i * i for i in range(1000))
+
+
+class TestDebugTools(unittest.TestCase):
+    """运行时诊断测试套件"""
+
+    def setUp(self):
+        """启动一个忙碌的线程"""
+        self.stop_event = threading.Event()
+        self.worker = threading.Thread(
+            target=busy_worker, args=(self.stop_event,), name="busy-worker"
+        )
+        self.worker.start()
+
+    def tearDown(self):
+        """停止忙碌的线程"""
+        self.stop_event.set()
+        self.worker.join()
+
+    def test_sample_stacks_sees_busy_thread(self):
+        """采样结果包含忙碌线程的调用栈，按线程名开头"""
+        stacks, samples = sample_stacks(0.2, interval=0.01)
+        self.assertGreater(samples, 0)
+        busy = [s for s in stacks if s.startswith("busy-worker;")]
+        self.assertTrue(busy)
+        self.assertTrue(any("busy_worker (test_debug_tools.py:" in s for s in busy))
+
+    def test_format_collapsed(self):
+        """collapsed stack 每行为 "调用栈 次数"，按次数从高到低"""
+        stacks, _ = sample_stacks(0.1, interval=0.01)
+        lines = format_collapsed(stacks).splitlines()
+        counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def test_only_one_profile_at_a_time(self):
+        """同一时间只允许一个采样"""
+        errors = []
+
+        def second_profile():
+            try:
+                sample_stacks(0.05)
+            except ProfileBusyError as e:
+                errors.append(e)
+
+        profiler = threading.Thread(target=sample_stacks, args=(0.5,))
+        profiler.start()
+        threading.Event().wait(0.1)
+        second_profile()
+        profiler.join()
+        self.assertEqual(len(errors), 1)
+
+    def test_thread_stacks(self):
+        """导出所有线程的调用栈"""
+        threads = {t["name"]: t for t in thread_stacks()}
+        self.assertIn("busy-worker", threads)
+        self.assertIn("MainThread", threads)
+        self.assertTrue(
+            any("test_thread_stacks" in f for f in threads["MainThread"]["stack"])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合并差异报告存储测试
+"""
+
+import os
+import tempfile
+import unittest
+
+from diff_store import DiffReportStore, segment_name
+
+
+class TestDiffReportStore(unittest.TestCase):
+    """差异报告存储测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = DiffReportStore(self.temp_dir.name)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def test_same_summary_does_not_overwrite(self):
+        """摘要相同的多次变更全部保留在同一个报告中"""
+        for i in range(3):
+            self.store.append(
+                "src/app.py",
+                "MODIFIED",
+                f"2025-12-15 10:00:0{i}",
+                "Modified: +1 -1 lines",
+                f"-old {i}\n+new {i}",
+            )
+
+        entries = self.store.entries("src/app.py", "20251215")
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(
+            self.store.read_diff("src/app.py", "20251215", entries[1]),
+            "-old 1\n+new 1",
+        )
+        day_files = os.listdir(self.store.day_dir("20251215"))
+        self.assertEqual(len(day_files), 2)
+
+    def test_render_markdown(self):
+        """渲染包含所有变更的 Markdown"""
+        self.store.append("a.txt", "CREATED", "2025-12-15 09:00:00", "New", "+x")
+        self.store.append("a.txt", "MODIFIED", "2025-12-15 09:05:00", "Mod", "+y")
+
+        markdown = self.store.render_markdown("a.txt", "20251215")
+        self.assertIn("- **变更次数**: 2", markdown)
+        self.assertIn("## 2025-12-15 09:05:00 MODIFIED", markdown)
+        self.assertIn("```diff\n+y\n```", markdown)
+        self.assertEqual(self.store.render_markdown("a.txt", "20251216"), "")
+
+    def test_files_split_by_day_and_path(self):
+        """按日期和文件分开存储，清理后重名的路径不会混在一起"""
+        self.store.append("a/b.txt", "MODIFIED", "2025-12-15 23:59:59", "s", "+1")
+        self.store.append("a_b.txt", "MODIFIED", "2025-12-15 23:59:59", "s", "+2")
+        self.store.append("a/b.txt", "MODIFIED", "2025-12-16 00:00:01", "s", "+3")
+
+        self.assertNotEqual(segment_name("a/b.txt"), segment_name("a_b.txt"))
+        self.assertEqual(
+            sorted(self.store.list_files("20251215")),
+            [("a/b.txt", 1), ("a_b.txt", 1)],
+        )
+        self.assertEqual(self.store.list_files("20251216"), [("a/b.txt", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件变化事件总线测试
+"""
+
+import threading
+import unittest
+
+from event_bus import EventBus
+
+
+def make_record(i):
+    """生成一个文件变化事件"""
+    return {"time": "2026-01-01 12:00:00", "file": f"file_{i}.txt", "type": "MODIFIED"}
+
+
+class TestEventBus(unittest.TestCase):
+    """事件总线测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.bus = EventBus(capacity=8)
+
+    def test_no_new_events(self):
+        """序号未变化时没有新事件"""
+        self.bus.publish(make_record(1))
+        self.assertEqual(self.bus.since(self.bus.sequence), (1, [], False))
+
+    def test_since_returns_only_new_events(self):
+        """只返回指定序号之后发布的事件"""
+        for i in range(3):
+            self.bus.publish(make_record(i))
+        sequence, records, skipped = self.bus.since(1)
+        self.assertEqual(sequence, 3)
+        self.assertEqual([r["file"] for r in records], ["file_1.txt", "file_2.txt"])
+        self.assertEqual([r["seq"] for r in records], [2, 3])
+        self.assertFalse(skipped)
+
+    def test_overwritten_events_are_skipped(self):
+        """超出容量后最旧的事件被覆盖"""
+        for i in range(20):
+            self.bus.publish(make_record(i))
+        sequence, records, skipped = self.bus.since(0)
+        self.assertEqual(sequence, 20)
+        self.assertEqual([r["seq"] for r in records], list(range(13, 21)))
+        self.assertTrue(skipped)
+
+    def test_limit_keeps_newest(self):
+        """限制数量时只返回最新的事件"""
+        for i in range(5):
+            self.bus.publish(make_record(i))
+        _, records, skipped = self.bus.since(0, limit=2)
+        self.assertEqual([r["seq"] for r in records], [4, 5])
+        self.assertTrue(skipped)
+
+    def test_concurrent_publish_and_read(self):
+        """并发发布时读取方看到的序号严格递增且不重复"""
+        bus = EventBus(capacity=64)
+        done = threading.Event()
+
+        def publish():
+            for i in range(2000):
+                bus.publish(make_record(i))
+
+        publishers = [threading.Thread(target=publish) for _ in range(4)]
+        for thread in publishers:
+            thread.start()
+
+        seen, sequence = [], 0
+        while not done.is_set():
+            if all(not thread.is_alive() for thread in publishers):
+                done.set()
+            sequence, records, _ = bus.since(sequence)
+            seen.extend(r["seq"] for r in records)
+
+        self.assertEqual(bus.sequence, 8000)
+        self.assertEqual(seen, sorted(set(seen)))
+        self.assertEqual(seen[-1], 8000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件变化事件存储测试
+"""
+
+import os
+import tempfile
+import unittest
+
+from event_bus import EventBus
+from event_store import EventStore
+
+
+def make_record(minute, path, action="MODIFIED"):
+    """生成一个文件变化事件"""
+    return {"time": f"2026-01-01 12:{minute:02d}:00", "file": path, "type": action}
+
+
+class TestEventStore(unittest.TestCase):
+    """事件存储测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.store = EventStore()
+        self.store.add_events(
+            [
+                make_record(0, "src/a.py", "CREATED"),
+                make_record(1, "src/b.py"),
+                make_record(2, "docs/readme.md"),
+                make_record(3, "src/a.py"),
+                make_record(4, "srcx/c.py", "DELETED"),
+            ]
+        )
+
+    def tearDown(self):
+        """测试后清理"""
+        self.store.close()
+
+    def test_paginates_newest_first(self):
+        """默认按时间降序分页，并返回总数"""
+        rows, total = self.store.query(limit=2)
+        self.assertEqual(total, 5)
+        self.assertEqual([r["file"] for r in rows], ["srcx/c.py", "src/a.py"])
+        rows, _ = self.store.query(offset=4, limit=2)
+        self.assertEqual([r["file"] for r in rows], ["src/a.py"])
+
+    def test_filters(self):
+        """按路径前缀、类型和时间范围过滤"""
+        rows, total = self.store.query(path_prefix="src/")
+        self.assertEqual(total, 3)
+        self.assertTrue(all(r["file"].startswith("src/") for r in rows))
+
+        _, total = self.store.query(path_prefix="src/", action="MODIFIED")
+        self.assertEqual(total, 2)
+
+        rows, total = self.store.query(
+            since="2026-01-01 12:01", until="2026-01-01 12:03"
+        )
+        self.assertEqual(total, 3)
+        self.assertEqual(rows[0]["time"], "2026-01-01 12:03:00")
+
+        _, total = self.store.query(until="2026-01-01")
+        self.assertEqual(total, 5)
+
+    def test_sort_by_column(self):
+        """按指定列排序，未知列按时间排序"""
+        rows, _ = self.store.query(sort_by="file", descending=False)
+        self.assertEqual(rows[0]["file"], "docs/readme.md")
+        rows, _ = self.store.query(sort_by="time; DROP TABLE events", limit=1)
+        self.assertEqual(rows[0]["file"], "srcx/c.py")
+
+    def test_purge(self):
+        """删除早于指定时间的事件"""
+        self.assertEqual(self.store.purge("2026-01-01 12:02:00"), 2)
+        self.assertEqual(self.store.query()[1], 3)
+
+
+class TestEventRecording(unittest.TestCase):
+    """从事件总线记录事件的测试套件"""
+
+    def test_records_bus_events(self):
+        """后台线程把事件总线中的新事件写入数据库，关闭时写入剩余事件"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "events.db")
+            bus = EventBus(capacity=100)
+            bus.publish(make_record(0, "before_start.txt"))
+            store = EventStore(db_path)
+            store.start_recording(bus, interval=0.05)
+            for i in range(10):
+                bus.publish(make_record(i, f"file_{i}.txt"))
+            store.close()
+
+            reopened = EventStore(db_path)
+            rows, total = reopened.query(sort_by="file", descending=False)
+            reopened.close()
+        self.assertEqual(total, 10)
+        self.assertEqual(rows[0]["file"], "file_0.txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+qwen 会话池测试
+使用 fake_qwen_cli.py 代替真实的 qwen CLI
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import generate_report
+from generate_report import QwenSessionPool
+
+FAKE_CLI = [sys.executable, os.path.join(os.path.dirname(__file__), "fake_qwen_cli.py")]
+FAKE_SESSION_CLI = FAKE_CLI + ["--session"]
+
+
+def session_pid(response):
+    """从替身的响应中取出进程号"""
+    return response.rsplit("进程 ", 1)[1].rstrip("）")
+
+
+class TestQwenSessionPool(unittest.TestCase):
+    """qwen 会话池测试套件"""
+
+    def test_reuses_process_for_batch(self):
+        """多次请求复用同一个进程，多行内容完整往返"""
+        pool = QwenSessionPool(
+            size=1, command=FAKE_SESSION_CLI, request_timeout=10, session_protocol=True
+        )
+        pool.warm_up()
+        responses = [pool.send(f"第{i}份\n日志内容") for i in range(3)]
+        pool.close()
+
+        self.assertEqual(len({session_pid(r) for r in responses}), 1)
+        self.assertIn("## 今日工作内容\n", responses[0])
+        self.assertEqual(pool.stats["started"], 1)
+
+    def test_recycles_crashed_session(self):
+        """进程崩溃后自动换新会话"""
+        env = dict(os.environ, FAKE_QWEN_EXIT_AFTER="1")
+        with mock.patch.dict(os.environ, env):
+            pool = QwenSessionPool(
+                size=1,
+                command=FAKE_SESSION_CLI,
+                request_timeout=10,
+                session_protocol=True,
+            )
+            first = pool.send("a")
+            second = pool.send("b")
+        pool.close()
+
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertNotEqual(session_pid(first), session_pid(second))
+        self.assertGreaterEqual(pool.stats["recycled"], 1)
+
+    def test_request_timeout(self):
+        """超时的请求返回 None，会话被替换"""
+        with mock.patch.dict(os.environ, {"FAKE_QWEN_DELAY": "1.5"}):
+            pool = QwenSessionPool(
+                size=1, command=FAKE_SESSION_CLI, session_protocol=True
+            )
+            self.assertIsNone(pool.send("slow", timeout=0.3, retries=0))
+        pool.close()
+        self.assertEqual(pool.stats["recycled"], 1)
+
+    def test_one_shot_by_default(self):
+        """默认以一次性命令模式运行，每次请求启动新进程"""
+        pool = QwenSessionPool(size=1, command=FAKE_CLI, request_timeout=10)
+        pool.warm_up()
+        responses = [pool.send(f"第{i}份\n日志内容") for i in range(2)]
+        pool.close()
+
+        self.assertIn("## 今日工作内容\n", responses[0])
+        self.assertNotEqual(session_pid(responses[0]), session_pid(responses[1]))
+        self.assertEqual(pool.stats["started"], 0)
+        self.assertEqual(pool.stats["requests"], 2)
+
+    def test_one_shot_long_prompt(self):
+        """一次性命令通过标准输入传递提示词，不受命令行长度限制"""
+        pool = QwenSessionPool(size=1, command=FAKE_CLI, request_timeout=10)
+        response = pool.send("日志" * 200_000)
+        self.assertIn("收到 400000 个字符的输入", response)
+
+    def test_one_shot_timeout(self):
+        """一次性命令超时返回 None"""
+        with mock.patch.dict(os.environ, {"FAKE_QWEN_DELAY": "1.5"}):
+            pool = QwenSessionPool(size=1, command=FAKE_CLI)
+            self.assertIsNone(pool.send("slow", timeout=0.3, retries=0))
+
+    def test_health_check_is_cached(self):
+        """可用性检查结果在有效期内复用"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = os.path.join(temp_dir, "health.json")
+            command = " ".join(FAKE_CLI)
+            with mock.patch.multiple(
+                generate_report,
+                QWEN_CLI_COMMAND=command,
+                QWEN_HEALTH_CACHE=cache_file,
+                _health_cache={},
+            ):
+                self.assertTrue(generate_report.check_qwen_available())
+                with mock.patch("subprocess.run") as run:
+                    self.assertTrue(generate_report.check_qwen_available())
+                    generate_report._health_cache.clear()
+                    self.assertTrue(generate_report.check_qwen_available())
+                    run.assert_not_called()
+
+
+class TestMapReduceSummary(unittest.TestCase):
+    """分块摘要测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        command = " ".join(FAKE_CLI)
+        self.patches = [
+            mock.patch.dict(os.environ, {"QWEN_CLI_COMMAND": command}),
+            mock.patch.multiple(
+                generate_report,
+                QWEN_CLI_COMMAND=command,
+                QWEN_HEALTH_CACHE=os.path.join(self.temp_dir.name, "health.json"),
+                SUMMARY_CACHE_DIR=os.path.join(self.temp_dir.name, "cache"),
+                _summary_cache=None,
+            ),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        """测试后清理"""
+        for patch in reversed(self.patches):
+            patch.stop()
+        generate_report.get_session_pool().close()
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def test_split_respects_budget(self):
+        """分块不超过预算且不丢内容"""
+        content = "".join(
+            f"--- 第{i}条记录 ---\n摘要: 修复问题{i}\n" for i in range(200)
+        )
+        content += "x" * 5000 + "\n"
+        chunks = generate_report.split_into_chunks({"a.log": content}, 300)
+
+        self.assertGreater(len(chunks), 10)
+        for _, _, text in chunks:
+            self.assertLessEqual(generate_report.estimate_tokens(text), 300)
+        self.assertEqual("".join(text for _, _, text in chunks), content)
+        self.assertEqual([c[1] for c in chunks], list(range(len(chunks))))
+
+    def test_truncate_to_budget(self):
+        """归并后仍超出预算时按预算截断，模板本身超出预算时返回 None"""
+        files = {"a.log": "x" * 40000, "b.log": "短内容"}
+        truncated = generate_report.truncate_to_budget("模板", files, 2000, True)
+        prompt = generate_report.build_report_prompt("模板", truncated, True)
+
+        self.assertLessEqual(generate_report.estimate_tokens(prompt), 2000)
+        self.assertEqual(truncated["b.log"], "短内容")
+        self.assertTrue(truncated["a.log"].endswith("（内容过长，已截断）"))
+        self.assertIsNone(
+            generate_report.truncate_to_budget("模" * 3000, files, 2000, True)
+        )
+
+    def test_parallel_map_with_progress(self):
+        """多进程分块摘要并报告进度"""
+        files = {
+            "a.log": "工作记录\n" * 400,
+            "b.log": "问题记录\n" * 400,
+        }
+        progress = []
+        summaries = generate_report.summarize_in_chunks(
+            files, 500, workers=2, progress=lambda done, total: progress.append(total)
+        )
+
+        self.assertEqual(sorted(summaries), ["a.log", "b.log"])
+        self.assertIn("## 今日工作内容", summaries["a.log"])
+        self.assertEqual(len(progress), progress[0])
+
+    def test_unchanged_chunks_use_cache(self):
+        """重复生成时只有变化的内容块发送给模型"""
+        # 各块内容不同，避免相同的块共用一个缓存键
+        files = {
+            "a.log": "".join(f"工作记录{i}\n" for i in range(400)),
+            "b.log": "问题记录\n" * 400,
+        }
+        pool = generate_report.get_session_pool()
+        first = generate_report.summarize_in_chunks(files, 500, workers=1)
+        sent = pool.stats["requests"]
+
+        files["b.log"] = "新的问题记录\n" * 10
+        second = generate_report.summarize_in_chunks(files, 500, workers=1)
+
+        self.assertEqual(pool.stats["requests"], sent + 1)
+        self.assertEqual(first["a.log"], second["a.log"])
+        self.assertGreater(generate_report.get_summary_cache().stats()["hits"], 0)
+
+    def test_large_input_uses_map_reduce(self):
+        """超出预算的输入先分块摘要再生成日报"""
+        log_path = os.path.join(self.temp_dir.name, "big.log")
+        with open(log_path, "w", encoding="utf-8") as f:
+            f.write("--- 10:00 ---\n摘要: 完成功能开发\n" * 2000)
+        template_path = os.path.join(self.cwd, "template.md")
+
+        with mock.patch.multiple(
+            generate_report, REPORT_TOKEN_BUDGET=2000, REPORT_MAP_WORKERS=2
+        ), mock.patch.object(
+            generate_report,
+            "summarize_in_chunks",
+            wraps=generate_report.summarize_in_chunks,
+        ) as summarize:
+            report = generate_report.generate_daily_report([log_path], template_path)
+
+        self.assertIsNotNone(report)
+        summarize.assert_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
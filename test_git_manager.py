@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Git 管理器测试
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from git import Repo
+
+from git_manager import SHADOW_EXCLUDES, SHADOW_GIT_DIR, GitManager
+from retention import DAY, HOUR, RetentionPolicy
+
+
+class TestGitManager(unittest.TestCase):
+    """Git 管理器测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo_dir = self.temp_dir.name
+        self.manager = GitManager(self.repo_dir)
+        self.write("a.txt", "v1\n")
+        self.write("b.txt", "v1\n")
+        self.manager.add_file("a.txt")
+        self.manager.add_file("b.txt")
+        self.manager.commit_changes("initial")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.manager.close()
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        """写入测试文件"""
+        with open(os.path.join(self.repo_dir, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def commit_count(self):
+        """返回提交数量"""
+        return len(list(self.manager.repo.iter_commits()))
+
+    def test_unchanged_path_is_not_committed(self):
+        """暂存内容与 HEAD 相同时不提交"""
+        self.manager.add_file("a.txt")
+        self.manager.commit_changes("noop", paths=["a.txt"])
+        self.assertEqual(self.commit_count(), 1)
+
+    def test_changed_path_is_committed(self):
+        """只检查指定路径，其他文件的未暂存修改不影响结果"""
+        self.write("b.txt", "v2\n")
+        self.assertFalse(self.manager.has_staged_changes(["a.txt"]))
+
+        self.write("a.txt", "v2\n")
+        self.manager.add_file("a.txt")
+        self.assertTrue(self.manager.has_staged_changes(["a.txt"]))
+        self.manager.commit_changes("change a", paths=["a.txt"])
+        self.assertEqual(self.commit_count(), 2)
+        self.assertFalse(self.manager.has_staged_changes(["a.txt"]))
+
+    def test_new_file_and_known_change(self):
+        """新文件视为变化，调用方确认有变化时跳过检查"""
+        self.write("c.txt", "new\n")
+        self.manager.add_file("c.txt")
+        self.assertTrue(self.manager.has_staged_changes(["c.txt"]))
+        self.assertTrue(self.manager.has_staged_changes())
+        self.manager.commit_changes("add c", changed=True)
+        self.assertEqual(self.commit_count(), 2)
+
+    def test_history_from_index(self):
+        """历史查询读取索引，外部提交后自动重建索引"""
+        self.write("a.txt", "v2\n")
+        self.manager.add_file("a.txt")
+        self.manager.commit_changes("change a", paths=["a.txt"])
+        history = self.manager.get_file_history("a.txt")
+        self.assertEqual([h["message"] for h in history], ["change a", "initial"])
+        self.assertEqual(len(self.manager.get_file_history("b.txt")), 1)
+        self.assertEqual(
+            self.manager.history_index.head, self.manager.repo.head.commit.hexsha
+        )
+
+        # 在管理器之外提交
+        self.write("b.txt", "v2\n")
+        self.manager.repo.index.add(["b.txt"])
+        self.manager.repo.index.commit("external")
+        self.assertEqual(len(self.manager.get_file_history("b.txt")), 2)
+        self.assertEqual(len(self.manager.get_file_history("a.txt")), 2)
+
+    def test_concurrent_writers_and_readers(self):
+        """多个线程同时暂存和提交时由写线程串行执行，查询在读线程中并发执行"""
+        errors = []
+
+        def worker(index):
+            try:
+                name = f"w{index}.txt"
+                self.write(name, f"{index}\n")
+                self.manager.add_file(name)
+                self.manager.commit_changes(f"add {name}", paths=[name])
+                self.assertEqual(len(self.manager.get_file_history("a.txt")), 1)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        # 同时暂存的文件可能合并到同一个提交中，但每个文件都已提交
+        tree = self.manager.repo.head.commit.tree
+        for i in range(8):
+            self.assertIn(f"w{i}.txt", tree)
+        self.assertFalse(self.manager.has_staged_changes())
+        self.assertEqual(self.manager.pending_writes(), 0)
+
+
+class TestShadowRepo(unittest.TestCase):
+    """影子仓库测试套件"""
+
+    def setUp(self):
+        """测试前准备：工作区中已有用户自己的仓库"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.work_dir = self.temp_dir.name
+        self.user_repo = Repo.init(self.work_dir)
+        self.manager = GitManager(
+            self.work_dir,
+            git_dir=os.path.join(self.work_dir, SHADOW_GIT_DIR),
+            excludes=SHADOW_EXCLUDES,
+        )
+
+    def tearDown(self):
+        """测试后清理"""
+        self.user_repo.close()
+        self.manager.close()
+        self.temp_dir.cleanup()
+
+    def test_commits_do_not_touch_user_repo(self):
+        """自动提交只写入影子仓库"""
+        with open(os.path.join(self.work_dir, "a.txt"), "w", encoding="utf-8") as f:
+            f.write("v1\n")
+        self.manager.add_file("a.txt")
+        self.manager.commit_changes("File CREATED: a.txt", paths=["a.txt"])
+
+        self.assertEqual(len(self.manager.get_file_history("a.txt")), 1)
+        self.assertFalse(self.user_repo.head.is_valid())
+        self.assertEqual(len(self.user_repo.index.entries), 0)
+        self.assertEqual(self.manager.repo.working_tree_dir, self.work_dir)
+
+    def test_excludes_and_gc(self):
+        """影子仓库忽略监控输出，gc 后对象合并为一个 pack"""
+        os.makedirs(os.path.join(self.work_dir, "daily_reports"))
+        with open(
+            os.path.join(self.work_dir, "daily_reports", "r.txt"), "w", encoding="utf-8"
+        ) as f:
+            f.write("report\n")
+        state_files = [".file_events.db", ".file_events.db-wal", ".qwen_health.json"]
+        for name in state_files:
+            with open(os.path.join(self.work_dir, name), "w", encoding="utf-8") as f:
+                f.write("state\n")
+        for i in range(3):
+            name = f"f{i}.txt"
+            with open(os.path.join(self.work_dir, name), "w", encoding="utf-8") as f:
+                f.write(f"{i}\n")
+            self.manager.add_file(name)
+            self.manager.commit_changes(f"File CREATED: {name}", paths=[name])
+
+        untracked = self.manager.repo.untracked_files
+        self.assertNotIn("daily_reports/r.txt", untracked)
+        for name in state_files:
+            self.assertNotIn(name, untracked)
+        self.assertFalse(any(path.startswith(SHADOW_GIT_DIR) for path in untracked))
+
+        self.manager.run_gc()
+        stats = self.manager.object_stats()
+        self.assertEqual(stats["count"], 0)
+        self.assertEqual(stats["packs"], 1)
+
+    def test_compact_history(self):
+        """按保留策略合并旧提交，保留的提交沿用原来的目录树和时间"""
+        now = time.time()
+        # 两天前的两个提交、三小时前同一小时内的两个提交、刚才的两个提交
+        ages = [2 * DAY + 60, 2 * DAY, 3 * HOUR + 60, 3 * HOUR, 120, 60]
+        trees = []
+        for i, age in enumerate(ages):
+            with open(os.path.join(self.work_dir, "a.txt"), "w", encoding="utf-8") as f:
+                f.write(f"v{i}\n")
+            self.manager.add_file("a.txt")
+            date = f"{int(now - age)} +0800"
+            commit = self.manager.repo.index.commit(
+                f"File MODIFIED: a.txt #{i}", author_date=date, commit_date=date
+            )
+            trees.append(commit.tree.hexsha)
+
+        policy = RetentionPolicy([(HOUR, 0), (DAY, HOUR)])
+        self.assertEqual(self.manager.compact_history(policy, now=now), 3)
+
+        commits = list(self.manager.repo.iter_commits())
+        self.assertEqual([c.tree.hexsha for c in commits], trees[:2:-1])
+        self.assertIn("合并了之前的 3 个自动提交", commits[-1].message)
+        self.assertEqual(commits[-1].committed_date, int(now - 3 * HOUR))
+        self.assertFalse(self.manager.has_staged_changes())
+
+        # 历史索引已按新的提交重建
+        history = self.manager.get_file_history("a.txt")
+        self.assertEqual([h["hash"] for h in history], [c.hexsha[:8] for c in commits])
+
+        # 已经满足策略时不再重写
+        self.assertEqual(self.manager.compact_history(policy, now=now), 0)
+
+
+class TestLazyImport(unittest.TestCase):
+    """延迟导入测试套件"""
+
+    def test_import_does_not_open_repo(self):
+        """导入模块时不导入 GitPython，也不创建影子仓库"""
+        project_dir = os.path.dirname(os.path.abspath(__file__))
+        code = "import sys, git_manager; print('git' in sys.modules)"
+        with tempfile.TemporaryDirectory() as work_dir:
+            result = subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=work_dir,
+                env=dict(os.environ, PYTHONPATH=project_dir),
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertEqual(result.stdout.strip(), "False")
+            self.assertFalse(os.path.exists(os.path.join(work_dir, SHADOW_GIT_DIR)))
+
+
+if __name__ == "__main__":
+    unittest.main()
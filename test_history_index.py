@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件历史索引测试
+"""
+
+import os
+import tempfile
+import unittest
+
+from history_index import HistoryIndex
+
+
+def make_record(index, paths):
+    """生成测试用的提交记录"""
+    return {
+        "commit": f"{index:040x}",
+        "author": "FileMonitor",
+        "time": 1_700_000_000 + index,
+        "message": f"commit {index}\n",
+        "paths": paths,
+    }
+
+
+class TestHistoryIndex(unittest.TestCase):
+    """文件历史索引测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.temp_dir.name, "history.jsonl")
+        self.index = HistoryIndex(self.index_path, cache_size=2)
+        self.index.append(make_record(1, ["a.txt", "b.txt"]))
+        self.index.append(make_record(2, ["a.txt"]))
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def test_history_newest_first(self):
+        """按从新到旧返回，遵守数量限制"""
+        history = self.index.history("a.txt")
+        self.assertEqual([h["message"] for h in history], ["commit 2", "commit 1"])
+        self.assertEqual(history[0]["hash"], f"{2:040x}"[:8])
+        self.assertEqual(len(self.index.history("a.txt", limit=1)), 1)
+        self.assertEqual(self.index.history("missing.txt"), [])
+
+    def test_cache_invalidated_on_append(self):
+        """提交某个路径只使该路径的缓存失效"""
+        self.index.history("a.txt")
+        self.index.history("b.txt")
+        self.index.history("a.txt")
+        self.assertEqual(self.index.hits, 1)
+
+        self.index.append(make_record(3, ["b.txt"]))
+        self.assertEqual(len(self.index.history("b.txt")), 2)
+        self.index.history("a.txt")
+        self.assertEqual(self.index.stats()["hits"], 2)
+        self.assertEqual(self.index.stats()["misses"], 3)
+
+    def test_append_skips_indexed_head(self):
+        """重建后已包含的提交不会被再次追加"""
+        records = [make_record(1, ["a.txt", "b.txt"]), make_record(2, ["a.txt"])]
+        records.append(make_record(3, ["a.txt"]))
+        self.index.rebuild(records)
+
+        self.assertFalse(self.index.append(make_record(3, ["a.txt"])))
+        self.assertEqual(len(self.index.history("a.txt")), 3)
+        self.assertTrue(self.index.append(make_record(4, ["a.txt"])))
+        self.assertEqual(len(HistoryIndex(self.index_path).history("a.txt")), 4)
+
+    def test_reload_and_truncated_line(self):
+        """重新加载时恢复偏移，忽略写入中断留下的不完整行"""
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write('{"commit": "ff')
+        reloaded = HistoryIndex(self.index_path)
+        self.assertEqual(reloaded.head, f"{2:040x}")
+        self.assertEqual(len(reloaded.history("a.txt")), 2)
+
+        reloaded.rebuild([make_record(5, ["c.txt"])])
+        self.assertEqual(reloaded.history("a.txt"), [])
+        self.assertEqual(len(reloaded.history("c.txt")), 1)
+        self.assertEqual(HistoryIndex(self.index_path).head, f"{5:040x}")
+
+
+if __name__ == "__main__":
+    unittest.main()
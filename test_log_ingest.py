@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志增量解析测试
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from log_ingest import LogIngester
+
+
+class TestLogIngester(unittest.TestCase):
+    """日志增量解析测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_dir = os.path.join(self.temp_dir.name, "state")
+        self.log_path = os.path.join(self.temp_dir.name, "file_changes.log")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def append(self, text, path=None):
+        """追加日志内容"""
+        with open(path or self.log_path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_reads_only_new_complete_lines(self):
+        """只解析新增的完整行"""
+        self.append("2025-12-15 10:00:00,001 - INFO - MODIFIED: a.txt\n")
+        self.append("2025-12-15 10:00:01,002 - INFO - CREATED: b")
+        ingester = LogIngester(self.state_dir)
+
+        records = ingester.ingest(self.log_path)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["action"], "MODIFIED")
+        self.assertEqual(records[0]["path"], "a.txt")
+        ingester.save()
+
+        self.append(".txt\n2025-12-15 10:00:02,003 - ERROR - 保存差异报告失败: x\n")
+        ingester = LogIngester(self.state_dir)
+        records = ingester.ingest(self.log_path)
+        self.assertEqual([r["path"] for r in records], ["b.txt", None])
+        self.assertEqual(records[1]["level"], "ERROR")
+        self.assertEqual(ingester.ingest(self.log_path), [])
+
+        day = ingester.daily_aggregate("2025-12-15")
+        self.assertEqual(day["total"], 3)
+        self.assertEqual(day["actions"], {"MODIFIED": 1, "CREATED": 1})
+
+    def test_survives_rotation(self):
+        """日志轮转后从新文件开头读取"""
+        self.append("2025-12-15 10:00:00,001 - INFO - MODIFIED: a.txt\n" * 5)
+        ingester = LogIngester(self.state_dir)
+        self.assertEqual(len(ingester.ingest(self.log_path)), 5)
+
+        os.rename(self.log_path, self.log_path + ".1")
+        self.append("2025-12-15 11:00:00,001 - INFO - DELETED: c.txt\n")
+        records = ingester.ingest(self.log_path)
+        self.assertEqual([r["path"] for r in records], ["c.txt"])
+
+    def test_rotation_reads_rest_of_rotated_file(self):
+        """轮转前未读取的行从轮转后的文件中补读"""
+        line = "2025-12-15 10:00:00,001 - INFO - MODIFIED: a.txt\n"
+        self.append(line * 3)
+        ingester = LogIngester(self.state_dir)
+        self.assertEqual(len(ingester.ingest(self.log_path)), 3)
+        ingester.save()
+
+        self.append(line * 4)
+        os.rename(self.log_path, self.log_path + ".1")
+        self.append("2025-12-15 11:00:00,001 - INFO - DELETED: c.txt\n" * 2)
+        ingester = LogIngester(self.state_dir)
+        records = ingester.ingest(self.log_path)
+
+        self.assertEqual(len(records), 6)
+        self.assertEqual(records[-1]["path"], "c.txt")
+        day = ingester.daily_aggregate("2025-12-15")
+        self.assertEqual(day["total"], 9)
+        self.assertEqual(day["actions"], {"MODIFIED": 7, "DELETED": 2})
+        self.assertEqual(ingester.ingest(self.log_path), [])
+
+    def test_entry_blocks_and_daily_input(self):
+        """解析 sample_log 风格的条目并生成日报输入"""
+        entries = os.path.join(self.temp_dir.name, "sample_log.txt")
+        self.append(
+            "--- 2025-12-15 09:30:15 ---\n摘要: 用户登录功能开发完成\n", entries
+        )
+        ingester = LogIngester(self.state_dir)
+        self.assertEqual(ingester.ingest(entries), [])
+
+        self.append("详情: 完成了后端接口\n\n" + "-" * 30 + "\n", entries)
+        records = ingester.ingest(entries)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["action"], "ENTRY")
+        self.assertIn("用户登录功能开发完成", records[0]["message"])
+
+        self.append("2025-12-15 10:00:00,001 - INFO - MODIFIED: a.txt\n")
+        ingester.ingest(self.log_path)
+        text = ingester.build_daily_input("2025-12-15")
+        self.assertIn("- a.txt (1 次)", text)
+        self.assertIn("--- 2025-12-15 09:30:15 ---", text)
+
+    def test_entries_not_duplicated_after_interrupted_save(self):
+        """条目写入后、进度保存前中断，重新解析时条目不会重复"""
+        entries = os.path.join(self.temp_dir.name, "sample_log.txt")
+        self.append(
+            "--- 2025-12-15 09:30:15 ---\n摘要: 修复问题\n" + "-" * 30 + "\n", entries
+        )
+        ingester = LogIngester(self.state_dir)
+        ingester.ingest(entries)
+        with mock.patch("os.replace", side_effect=OSError("中断")):
+            with self.assertRaises(OSError):
+                ingester.save()
+
+        ingester = LogIngester(self.state_dir)
+        self.assertEqual(len(ingester.ingest(entries)), 1)
+        ingester.save()
+        text = LogIngester(self.state_dir).build_daily_input("2025-12-15")
+        self.assertEqual(text.count("摘要: 修复问题"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
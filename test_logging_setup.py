@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步日志配置测试
+"""
+
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+from logging_setup import (
+    JsonLinesFormatter,
+    RateLimitFilter,
+    setup_logging,
+    stop_logging,
+)
+
+
+def make_record(message, level=logging.INFO):
+    """生成一条日志记录"""
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    """限速过滤器测试套件"""
+
+    def test_drops_info_beyond_burst(self):
+        """超出突发条数的 INFO 日志被丢弃，警告总是输出"""
+        rate_filter = RateLimitFilter(rate=0.001, burst=3)
+        passed = [rate_filter.filter(make_record(f"m{i}")) for i in range(10)]
+        self.assertEqual(passed.count(True), 3)
+        self.assertTrue(rate_filter.filter(make_record("warn", logging.WARNING)))
+
+    def test_reports_dropped_count(self):
+        """下一条输出的日志附加被丢弃的条数"""
+        rate_filter = RateLimitFilter(rate=1000, burst=1)
+        rate_filter.filter(make_record("first"))
+        rate_filter.filter(make_record("dropped"))
+        rate_filter._tokens = 1
+        record = make_record("next")
+        self.assertTrue(rate_filter.filter(record))
+        self.assertIn("此前 1 条日志", record.getMessage())
+
+
+class TestSetupLogging(unittest.TestCase):
+    """日志配置测试套件"""
+
+    def setUp(self):
+        """暂时移除根日志记录器上已有的处理器"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = logging.getLogger()
+        self.saved_handlers = self.root.handlers[:]
+        self.saved_level = self.root.level
+        for handler in self.saved_handlers:
+            self.root.removeHandler(handler)
+
+    def tearDown(self):
+        """恢复根日志记录器"""
+        for handler in self.root.handlers[:]:
+            self.root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            self.root.addHandler(handler)
+        self.root.setLevel(self.saved_level)
+        self.temp_dir.cleanup()
+
+    def test_writes_text_and_json_and_rotates(self):
+        """日志经队列写入文本和 JSON Lines 文件，超过大小后轮转"""
+        log_path = os.path.join(self.temp_dir.name, "logs", "changes.log")
+        json_path = log_path + ".jsonl"
+        listener = setup_logging(
+            log_path, max_bytes=2000, backup_count=2, json_path=json_path
+        )
+        logger = logging.getLogger("test_logging_setup")
+        for i in range(100):
+            logger.info(f"MODIFIED: file_{i}.txt")
+        stop_logging(listener)
+        for handler in listener.handlers:
+            handler.close()
+
+        self.assertTrue(os.path.exists(log_path + ".1"))
+        with open(log_path, encoding="utf-8") as f:
+            last_line = f.read().splitlines()[-1]
+        self.assertRegex(last_line, r" - INFO - MODIFIED: file_99\.txt$")
+        with open(json_path, encoding="utf-8") as f:
+            record = json.loads(f.read().splitlines()[-1])
+        self.assertEqual(record["message"], "MODIFIED: file_99.txt")
+        self.assertEqual(record["logger"], "test_logging_setup")
+
+    def test_keeps_existing_configuration(self):
+        """根日志记录器已配置时不做修改"""
+        handler = logging.NullHandler()
+        self.root.addHandler(handler)
+        log_path = os.path.join(self.temp_dir.name, "changes.log")
+        self.assertIsNone(setup_logging(log_path))
+        self.assertEqual(self.root.handlers, [handler])
+        self.assertFalse(os.path.exists(log_path))
+
+
+class TestJsonLinesFormatter(unittest.TestCase):
+    """JSON Lines 格式测试套件"""
+
+    def test_format(self):
+        """每条日志为一行 JSON"""
+        line = JsonLinesFormatter().format(make_record("CREATED: 新文件.txt"))
+        self.assertNotIn("\n", line)
+        self.assertEqual(json.loads(line)["message"], "CREATED: 新文件.txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
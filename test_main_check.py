@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务主线检查测试
+"""
+
+import json
+import os
+import socket
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+import main_check
+import main_check_daemon
+from main_check import TaskChecker
+
+TASK_CONTENT = """# 项目任务列表
+
+## 系统设计 (已完成)
+- [x] 设计系统架构图
+
+## 版本v1.0 (进行中)
+- [x] 实现实时文件监控功能
+- [ ] 完善错误处理和异常恢复机制
+
+## 版本v2.0 (计划中)
+- [ ] 完善Git版本管理集成
+- [ ] 实现文件缓存机制
+"""
+
+
+class TestTaskChecker(unittest.TestCase):
+    """任务主线检查测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        task_path = os.path.join(self.temp_dir.name, "task.md")
+        with open(task_path, "w", encoding="utf-8") as f:
+            f.write(TASK_CONTENT)
+        self.checker = TaskChecker(task_path)
+        self.assertTrue(self.checker.read_task_file())
+        self.checker.parse_task_content()
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def test_index(self):
+        """解析后预先计算清理过的任务及其版本"""
+        self.assertEqual(self.checker._choices[0], "设计系统架构图")
+        self.assertEqual(self.checker._task_versions["实现文件缓存机制"], "版本v2.0")
+
+    def test_single_checks(self):
+        """精确匹配、模糊匹配和未来版本关键词"""
+        check = self.checker.check_task_against_main_line
+        self.assertEqual(check("实现实时文件监控功能"), (True, "版本v1.0", "版本v1.0"))
+        self.assertEqual(check("完善Git版本管理集成"), (False, "版本v1.0", "版本v2.0"))
+        self.assertEqual(
+            check("完善Git版本管理的集成"), (False, "版本v1.0", "版本v2.0")
+        )
+        self.assertEqual(check("开始版本v2.0的工作"), (False, "版本v1.0", "版本v2.0"))
+        self.assertEqual(check("整理 README"), (True, "版本v1.0", "版本v1.0"))
+
+    def test_batch_matches_single(self):
+        """批量检查的结果与逐条检查相同"""
+        descriptions = [
+            "实现实时文件监控功能",
+            "完善Git版本管理的集成",
+            "实现文件缓存",
+            "完善错误处理",
+            "开始版本v2.0的工作",
+            "整理 README",
+        ]
+        expected = [self.checker.check_task_against_main_line(d) for d in descriptions]
+        self.assertEqual(
+            self.checker.check_tasks_against_main_line(descriptions), expected
+        )
+        self.assertEqual(self.checker.check_tasks_against_main_line([]), [])
+
+    def test_no_current_version(self):
+        """没有进行中的版本时判定为不通过"""
+        self.checker.versions = {}
+        self.assertEqual(
+            self.checker.check_tasks_against_main_line(["任意任务"]),
+            [(False, "未知", "未知")],
+        )
+
+
+class TestAudit(unittest.TestCase):
+    """批量审计测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.work_dir = self.temp_dir.name
+        task_path = os.path.join(self.work_dir, "task.md")
+        with open(task_path, "w", encoding="utf-8") as f:
+            f.write(TASK_CONTENT)
+        self.checker = TaskChecker(task_path)
+        self.checker.read_task_file()
+        self.checker.parse_task_content()
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def test_jsonl_report(self):
+        """JSONL 条目逐条给出结论、匹配任务和得分"""
+        jsonl_path = os.path.join(self.work_dir, "requests.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            for request_id, title in [
+                ("r1", "实现实时文件监控功能"),
+                ("r2", "完善Git版本管理集成"),
+            ]:
+                f.write(json.dumps({"request_id": request_id, "title": title}) + "\n")
+
+        report = main_check.audit_items(
+            self.checker, main_check.read_jsonl_items(jsonl_path)
+        )
+        self.assertEqual(
+            (report["total"], report["passed"], report["failed"]), (2, 1, 1)
+        )
+        first, second = report["items"]
+        self.assertEqual(first["id"], "r1")
+        self.assertEqual(first["verdict"], "pass")
+        self.assertEqual(first["phase"], "exact")
+        self.assertEqual(second["verdict"], "fail")
+        self.assertEqual(second["task_version"], "版本v2.0")
+        self.assertEqual(second["matched_task"], "完善Git版本管理集成")
+        self.assertEqual(second["score"], 100.0)
+
+    def test_commit_range(self):
+        """读取提交范围内的提交标题"""
+        env = dict(
+            os.environ,
+            GIT_AUTHOR_NAME="test",
+            GIT_AUTHOR_EMAIL="test@example.com",
+            GIT_COMMITTER_NAME="test",
+            GIT_COMMITTER_EMAIL="test@example.com",
+        )
+
+        def git(*args):
+            return subprocess.run(
+                ["git", *args],
+                cwd=self.work_dir,
+                env=env,
+                check=True,
+                capture_output=True,
+            )
+
+        git("init", "-q")
+        for message in ["初始提交", "完善Git版本管理集成\n\n详细说明", "整理 README"]:
+            git("commit", "-q", "--allow-empty", "-m", message)
+
+        items = main_check.read_commit_messages("HEAD~2..HEAD", self.work_dir)
+        self.assertEqual(
+            [item["text"] for item in items], ["整理 README", "完善Git版本管理集成"]
+        )
+        report = main_check.audit_items(self.checker, items)
+        self.assertEqual(
+            [item["verdict"] for item in report["items"]], ["pass", "fail"]
+        )
+
+    def test_process_pool_matches_in_process(self):
+        """进程池审计与本进程内审计结果相同"""
+        items = [
+            {"id": i, "text": text}
+            for i, text in enumerate(
+                ["实现实时文件监控功能", "实现文件缓存", "完善错误处理", "整理 README"]
+                * 3
+            )
+        ]
+        expected = main_check.audit_items(self.checker, items, processes=1)
+        with mock.patch.object(main_check, "AUDIT_POOL_THRESHOLD", 1):
+            report = main_check.audit_items(self.checker, items, processes=2)
+        self.assertEqual(report, expected)
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "需要 Unix 套接字")
+class TestCheckDaemon(unittest.TestCase):
+    """常驻检查进程测试套件"""
+
+    def setUp(self):
+        """测试前准备：启动检查服务"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.task_path = os.path.join(self.temp_dir.name, "task.md")
+        with open(self.task_path, "w", encoding="utf-8") as f:
+            f.write(TASK_CONTENT)
+        self.server = main_check_daemon.start_server(self.task_path)
+
+    def tearDown(self):
+        """测试后清理"""
+        if self.server is not None:
+            main_check_daemon.stop_server(self.server)
+        self.temp_dir.cleanup()
+
+    def test_check_and_reload(self):
+        """常驻进程返回与本进程内相同的结果，任务文件变化后重新解析"""
+        response = main_check_daemon.check_via_daemon(
+            self.task_path, ["完善Git版本管理集成", "整理 README"]
+        )
+        self.assertEqual(response["current_version"], "版本v1.0")
+        self.assertEqual(
+            response["results"],
+            [[False, "版本v1.0", "版本v2.0"], [True, "版本v1.0", "版本v1.0"]],
+        )
+        self.assertIsNone(main_check_daemon.start_server(self.task_path))
+
+        with open(self.task_path, "w", encoding="utf-8") as f:
+            f.write(TASK_CONTENT.replace("版本v1.0 (进行中)", "版本v1.1 (进行中)"))
+        stat = os.stat(self.task_path)
+        os.utime(self.task_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        response = main_check_daemon.check_via_daemon(self.task_path, [])
+        self.assertEqual(response["current_version"], "版本v1.1")
+        self.assertEqual(self.server.checkers.reloads, 2)
+
+    def test_fallback_when_not_running(self):
+        """常驻进程未运行时返回 None，由调用方在本进程内检查"""
+        main_check_daemon.stop_server(self.server)
+        self.server = None
+        self.assertIsNone(main_check_daemon.check_via_daemon(self.task_path, []))
+
+        # 残留的套接字文件不影响回退
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(main_check_daemon.socket_path(self.task_path))
+        self.assertIsNone(main_check_daemon.check_via_daemon(self.task_path, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
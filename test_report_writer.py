@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日报写入器测试
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+from report_writer import DailyReportWriter
+
+
+class TestDailyReportWriter(unittest.TestCase):
+    """日报写入器测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.report_dir = self.temp_dir.name
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def read_report(self, writer, date_str):
+        """读取指定日期的日报内容"""
+        with open(writer.report_path(date_str), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_buffers_until_threshold(self):
+        """缓冲区未达到阈值时不写入文件，达到后立即写入"""
+        writer = DailyReportWriter(self.report_dir, flush_size=100, flush_interval=60)
+        when = datetime(2025, 12, 15, 10, 0, 0)
+        writer.write_record("a" * 40 + "\n", when)
+        self.assertEqual(self.read_report(writer, "20251215"), "")
+        writer.write_record("b" * 80 + "\n", when)
+        self.assertEqual(len(self.read_report(writer, "20251215")), 122)
+        writer.close()
+
+    def test_flushes_on_interval_and_close(self):
+        """定时刷新和关闭时刷新"""
+        writer = DailyReportWriter(self.report_dir, flush_interval=0.05)
+        when = datetime(2025, 12, 15, 10, 0, 0)
+        writer.write_record("first\n", when)
+        threading.Event().wait(0.3)
+        self.assertEqual(self.read_report(writer, "20251215"), "first\n")
+        writer.write_record("second\n", when)
+        writer.close()
+        self.assertEqual(self.read_report(writer, "20251215"), "first\nsecond\n")
+
+    def test_rotates_by_date(self):
+        """日期变化时切换日报文件"""
+        writer = DailyReportWriter(self.report_dir, flush_interval=60)
+        writer.write_record("day1\n", datetime(2025, 12, 15, 23, 59, 59))
+        writer.write_record("day2\n", datetime(2025, 12, 16, 0, 0, 1))
+        writer.close()
+        self.assertEqual(self.read_report(writer, "20251215"), "day1\n")
+        self.assertEqual(self.read_report(writer, "20251216"), "day2\n")
+
+    def test_records_not_interleaved(self):
+        """多线程写入时记录保持完整"""
+        writer = DailyReportWriter(self.report_dir, flush_size=512, flush_interval=0.01)
+        when = datetime(2025, 12, 15, 10, 0, 0)
+
+        def worker(n):
+            for i in range(200):
+                writer.write_record(f"--- {n}-{i} ---\n摘要: {n}\n{'-' * 30}\n", when)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+        lines = self.read_report(writer, "20251215").splitlines()
+        self.assertEqual(len(lines), 8 * 200 * 3)
+        for i in range(0, len(lines), 3):
+            n = lines[i].split()[1].split("-")[0]
+            self.assertEqual(lines[i + 1], f"摘要: {n}")
+            self.assertEqual(lines[i + 2], "-" * 30)
+        self.assertFalse(os.path.exists(writer.report_path("20251216")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+版本保留策略测试
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from retention import DAY, HOUR, RetentionPolicy, prune_version_dirs, version_name
+
+
+class TestRetentionPolicy(unittest.TestCase):
+    """保留策略测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.now = 1_000 * DAY
+        self.policy = RetentionPolicy([(HOUR, 0), (DAY, HOUR), (30 * DAY, DAY)])
+
+    def test_recent_versions_are_all_kept(self):
+        """最近一小时内的版本全部保留"""
+        timestamps = [self.now - 60 * i for i in range(10)]
+        self.assertEqual(self.policy.select(timestamps, self.now), set(range(10)))
+
+    def test_newest_per_bucket(self):
+        """较旧的版本每个分桶只保留最新的一个"""
+        base = self.now - 5 * HOUR
+        hour_start = base - base % HOUR
+        timestamps = [hour_start + 10, hour_start + 20, hour_start + HOUR + 5]
+        self.assertEqual(self.policy.select(timestamps, self.now), {1, 2})
+
+        day_start = self.now - 10 * DAY
+        day_start -= day_start % DAY
+        timestamps = [day_start + HOUR, day_start + 2 * HOUR, day_start + DAY + HOUR]
+        self.assertEqual(self.policy.select(timestamps, self.now), {1, 2})
+
+    def test_expired_versions_are_dropped(self):
+        """超过最后一层的版本删除，但最新的版本总是保留"""
+        timestamps = [self.now - 40 * DAY, self.now - 31 * DAY, self.now - 5]
+        self.assertEqual(self.policy.select(timestamps, self.now), {2})
+        self.assertEqual(self.policy.select(timestamps[:2], self.now), {1})
+        self.assertEqual(self.policy.select([], self.now), set())
+
+    def test_bounded_growth(self):
+        """每分钟一个版本、持续 60 天，保留数量有上限"""
+        timestamps = [self.now - 60 * i for i in range(60 * 24 * 60)]
+        kept = self.policy.select(timestamps, self.now)
+        self.assertLessEqual(len(kept), 61 + 25 + 31)
+
+
+class TestPruneVersionDirs(unittest.TestCase):
+    """缓存版本清理测试套件"""
+
+    def test_prune_per_file(self):
+        """每个文件独立应用策略，清理后删除空目录"""
+        with tempfile.TemporaryDirectory() as root:
+            now = datetime(2025, 12, 15, 12, 0, 0).timestamp()
+            ages = {
+                "a.txt": [10, 2 * HOUR + 60, 2 * HOUR + 120],
+                "sub/b.txt": [40 * DAY],
+            }
+            for relative_path, file_ages in ages.items():
+                version_dir = os.path.join(root, relative_path)
+                os.makedirs(version_dir)
+                for age in file_ages:
+                    name = version_name(datetime.fromtimestamp(now - age))
+                    with open(os.path.join(version_dir, name), "w") as f:
+                        f.write("x")
+            with open(os.path.join(root, "a.txt", "README"), "w") as f:
+                f.write("not a version")
+
+            policy = RetentionPolicy([(HOUR, 0), (DAY, HOUR)])
+            self.assertEqual(prune_version_dirs(root, policy, now), 1)
+            self.assertEqual(len(os.listdir(os.path.join(root, "a.txt"))), 3)
+            # 唯一的版本即使过期也保留
+            self.assertEqual(len(os.listdir(os.path.join(root, "sub", "b.txt"))), 1)
+            self.assertEqual(prune_version_dirs(os.path.join(root, "none"), policy), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
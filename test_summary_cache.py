@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+摘要缓存测试
+"""
+
+import tempfile
+import unittest
+
+from summary_cache import SummaryCache
+
+
+class TestSummaryCache(unittest.TestCase):
+    """摘要缓存测试套件"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def test_key_depends_on_all_parts(self):
+        """内容、模板和提示词版本任一变化都会改变缓存键"""
+        key = SummaryCache.make_key("chunk", "template", 1)
+        self.assertEqual(key, SummaryCache.make_key("chunk", "template", 1))
+        self.assertNotEqual(key, SummaryCache.make_key("chunk2", "template", 1))
+        self.assertNotEqual(key, SummaryCache.make_key("chunk", "template2", 1))
+        self.assertNotEqual(key, SummaryCache.make_key("chunk", "template", 2))
+
+    def test_hit_miss_and_persistence(self):
+        """命中统计，索引保存后重新打开仍可命中"""
+        cache = SummaryCache(self.temp_dir.name)
+        self.assertIsNone(cache.get("k1"))
+        cache.put("k1", "摘要一")
+        self.assertEqual(cache.get("k1"), "摘要一")
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        cache.save()
+
+        reopened = SummaryCache(self.temp_dir.name)
+        self.assertEqual(reopened.get("k1"), "摘要一")
+
+    def test_lru_eviction(self):
+        """超出大小上限时淘汰最久未使用的条目"""
+        cache = SummaryCache(self.temp_dir.name, max_bytes=30)
+        cache.put("a", "x" * 10)
+        cache.put("b", "y" * 10)
+        cache.get("a")
+        cache.put("c", "z" * 15)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "x" * 10)
+        self.assertEqual(cache.get("c"), "z" * 15)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.stats()["bytes"], 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面文件变化记录测试
+"""
+
+import unittest
+
+from event_bus import EventBus
+from ui_feed import apply_delta
+
+
+def make_record(i):
+    """生成一个文件变化事件"""
+    return {"time": "12:00:00", "file": f"file_{i}.txt", "type": "MODIFIED"}
+
+
+class TestApplyDelta(unittest.TestCase):
+    """表格增量更新测试套件"""
+
+    def test_new_rows_first_and_trimmed(self):
+        """新记录插入到最前面，并按最大行数裁剪"""
+        rows = [{"id": 2}, {"id": 1}]
+        apply_delta(rows, [{"id": 3}, {"id": 4}], max_rows=3)
+        self.assertEqual([r["id"] for r in rows], [4, 3, 2])
+
+    def test_reset_replaces_rows(self):
+        """整体替换时丢弃原有的行"""
+        rows = [{"id": 1}]
+        apply_delta(rows, [{"id": 7}, {"id": 8}], reset=True, max_rows=3)
+        self.assertEqual([r["id"] for r in rows], [8, 7])
+
+    def test_burst_matches_full_rebuild(self):
+        """多次增量更新的结果与整体重建一致"""
+        bus = EventBus(capacity=100)
+        rows, sequence = [], 0
+        for burst in (1, 3, 0, 6, 2):
+            for _ in range(burst):
+                bus.publish(make_record(bus.sequence))
+            sequence, records, reset = bus.since(sequence, limit=4)
+            apply_delta(rows, records, reset, max_rows=4)
+            expected = list(reversed(bus.since(0)[1]))[:4]
+            self.assertEqual(rows, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,41 @@
+import asyncio
 import os
+import subprocess
 import sys
-import threading
 import time
-from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
-from nicegui import app, events, ui
+from nicegui import app, events, run, ui
 
 # 添加项目路径
 sys.path.append(os.path.dirname(__file__))
 
+from ui_feed import MAX_ROWS, apply_delta
+
+# 界面检查新记录的间隔（秒）
+UI_REFRESH_INTERVAL = 0.5
+# 历史记录每页的默认行数
+HISTORY_PAGE_SIZE = 100
+# 历史记录的事件类型过滤选项
+ACTION_OPTIONS = {"": "全部", "CREATED": "创建", "MODIFIED": "修改", "DELETED": "删除"}
+# Git 状态结果的缓存时间（秒），期间重复点击直接返回上次结果
+GIT_STATUS_CACHE_SECONDS = 10.0
+# 后台任务运行时刷新进度通知的间隔（秒）
+PROGRESS_INTERVAL = 0.5
+
 # 尝试导入监控模块
 try:
-    from file_monitor import FileChangeHandler
-    from git_manager import get_git_manager
+    from watchdog.observers import Observer
+
+    from file_monitor import (
+        MONITOR_DIR,
+        FileChangeHandler,
+        full_scan,
+        get_event_bus,
+        get_event_store,
+    )
+    from git_manager import GIT_AVAILABLE, get_git_manager
 
     MONITOR_AVAILABLE = True
 except ImportError as e:
@@ -22,25 +43,55 @@ except ImportError as e:
     MONITOR_AVAILABLE = False
 
 
+def change_columns(sortable=False):
+    """
+    文件变化表格的列定义
+
+    Args:
+        sortable (bool): 是否允许点击表头排序
+    """
+    return [
+        {
+            "name": name,
+            "label": label,
+            "field": name,
+            "align": "left",
+            "sortable": sortable,
+        }
+        for name, label in (("time", "时间"), ("file", "文件"), ("type", "类型"))
+    ]
+
+
 class FileMonitorUI:
     def __init__(self):
         self.handler = None
-        self.git_manager = None
         self.is_monitoring = False
-        self.monitor_thread = None
-        self.file_changes = []
+        self.observer = None
+        self.event_bus = get_event_bus() if MONITOR_AVAILABLE else None
+        self.event_store = get_event_store() if MONITOR_AVAILABLE else None
+        # 同一时间只运行一个全量扫描和一个 Git 状态检查，多个页面共享结果
+        self.scan_task = None
+        self.scan_progress = {"files": 0, "directory": ""}
+        self.git_status_task = None
+        self.git_status_cache = None
 
         # 如果监控模块可用，初始化它们
         if MONITOR_AVAILABLE:
             try:
                 self.handler = FileChangeHandler()
-                self.git_manager = get_git_manager()
             except Exception as e:
                 print(f"初始化监控模块时出错: {e}")
 
         # 创建UI
         self.create_ui()
 
+    @property
+    def git_manager(self):
+        """Git 管理器，第一次使用时才打开仓库，避免拖慢界面启动"""
+        if not MONITOR_AVAILABLE or not GIT_AVAILABLE:
+            return None
+        return get_git_manager()
+
     def create_ui(self):
         @ui.page("/")
         def main_page():
@@ -66,28 +117,10 @@ class FileMonitorUI:
 
                     # 文件变化表格
                     ui.label("文件变化记录").classes("text-lg mt-4")
-                    self.changes_table = ui.table(
-                        columns=[
-                            {
-                                "name": "time",
-                                "label": "时间",
-                                "field": "time",
-                                "align": "left",
-                            },
-                            {
-                                "name": "file",
-                                "label": "文件",
-                                "field": "file",
-                                "align": "left",
-                            },
-                            {
-                                "name": "type",
-                                "label": "类型",
-                                "field": "type",
-                                "align": "left",
-                            },
-                        ],
+                    changes_table = ui.table(
+                        columns=change_columns(),
                         rows=[],
+                        row_key="seq",
                         pagination=10,
                     ).classes("w-full")
 
@@ -98,8 +131,63 @@ class FileMonitorUI:
                             "mx-2"
                         )
 
-                # 自动刷新数据
-                ui.timer(1.0, self.update_ui)
+                # 历史记录：在服务器端分页、排序和过滤，页面只持有当前页
+                with ui.card().classes("w-full max-w-3xl mt-4"):
+                    ui.label("历史记录").classes("text-lg")
+                    with ui.row().classes("w-full items-end"):
+                        filters = {
+                            "path_prefix": ui.input("路径前缀").classes("w-40"),
+                            "action": ui.select(
+                                ACTION_OPTIONS, value="", label="类型"
+                            ).classes("w-24"),
+                            "since": ui.input(
+                                "开始时间", placeholder="2025-12-16 08:00"
+                            ).classes("w-40"),
+                            "until": ui.input(
+                                "结束时间", placeholder="2025-12-16"
+                            ).classes("w-40"),
+                        }
+                        ui.button(
+                            "查询",
+                            on_click=lambda: self.load_history(
+                                history_table, filters, page=1
+                            ),
+                        )
+                    history_table = (
+                        ui.table(
+                            columns=change_columns(sortable=True),
+                            rows=[],
+                            row_key="id",
+                            pagination={
+                                "page": 1,
+                                "rowsPerPage": HISTORY_PAGE_SIZE,
+                                "sortBy": "time",
+                                "descending": True,
+                                "rowsNumber": 0,
+                            },
+                        )
+                        .props('virtual-scroll :rows-per-page-options="[50, 100, 500]"')
+                        .classes("w-full")
+                        .style("height: 480px")
+                    )
+                    # 翻页、排序和修改每页行数时由服务器查询对应的一页
+                    history_table.on(
+                        "request",
+                        lambda e: self.load_history(
+                            history_table, filters, pagination=e.args
+                        ),
+                        js_handler="(e) => emit(e.pagination)",
+                    )
+                    ui.timer(
+                        0, lambda: self.load_history(history_table, filters), once=True
+                    )
+
+                # 每个页面记录自己已经显示到的事件序号，只在有新事件时更新
+                cursor = {"sequence": 0}
+                ui.timer(
+                    UI_REFRESH_INTERVAL,
+                    lambda: self.update_ui(changes_table, cursor),
+                )
 
         # 添加一些样式
         ui.add_head_html(
@@ -129,11 +217,10 @@ class FileMonitorUI:
             self.start_button.disable()
             self.stop_button.enable()
 
-            # 在单独线程中运行监控
-            self.monitor_thread = threading.Thread(
-                target=self._monitor_loop, daemon=True
-            )
-            self.monitor_thread.start()
+            # 由 watchdog 的观察线程调用处理器，处理器把事件发布到事件总线
+            self.observer = Observer()
+            self.observer.schedule(self.handler, MONITOR_DIR, recursive=True)
+            self.observer.start()
 
             ui.notify("文件监控已启动")
 
@@ -141,87 +228,158 @@ class FileMonitorUI:
         """停止文件监控"""
         if self.is_monitoring:
             self.is_monitoring = False
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
             self.status_label.set_text("监控状态: 已停止")
             self.start_button.enable()
             self.stop_button.disable()
             ui.notify("文件监控已停止")
 
-    def _monitor_loop(self):
-        """监控循环"""
-        # 这里应该实现实际的文件监控逻辑
-        # 由于我们没有真实的文件监控实现，我们模拟一些变化
-        counter = 0
-        while self.is_monitoring:
-            time.sleep(2)  # 每2秒检查一次
-            counter += 1
-
-            # 模拟文件变化
-            if counter % 3 == 0:
-                change_type = "MODIFIED" if counter % 2 == 0 else "CREATED"
-                file_name = f"test_file_{counter}.txt"
-
-                change_record = {
-                    "time": datetime.now().strftime("%H:%M:%S"),
-                    "file": file_name,
-                    "type": change_type,
-                }
-
-                # 添加到变化记录中
-                self.file_changes.append(change_record)
-
-                # 限制记录数量
-                if len(self.file_changes) > 50:
-                    self.file_changes.pop(0)
-
-                # 如果有Git管理器，模拟提交
-                if self.git_manager:
-                    # 这里可以调用Git管理器的方法
-                    pass
-
-    def update_ui(self):
-        """更新UI显示"""
-        # 更新表格数据
-        self.changes_table.rows = list(reversed(self.file_changes))
-        self.changes_table.update()
-
-    def generate_report(self):
-        """生成报告"""
+    def update_ui(self, table, cursor):
+        """
+        增量更新表格
+
+        没有新事件时不做任何事情；有新事件时只把新增的行合并到表格中，
+        两次检查之间到达的事件合并为一次推送
+
+        Args:
+            table: 页面中的变化记录表格
+            cursor (dict): 该页面已经显示到的事件序号
+        """
+        if not self.event_bus or self.event_bus.sequence == cursor["sequence"]:
+            return
+        sequence, records, reset = self.event_bus.since(cursor["sequence"], MAX_ROWS)
+        cursor["sequence"] = sequence
+        if records:
+            apply_delta(table.rows, records, reset, MAX_ROWS)
+
+    async def load_history(self, table, filters, pagination=None, page=None):
+        """
+        查询一页历史记录
+
+        Args:
+            table: 页面中的历史记录表格
+            filters (dict): 过滤条件输入框
+            pagination (dict): 表格请求的分页和排序，默认沿用表格当前的设置
+            page (int): 跳转到的页码（修改过滤条件后回到第一页）
+        """
+        if not self.event_store:
+            return
+        pagination = dict(pagination or table.pagination)
+        if page is not None:
+            pagination["page"] = page
+        rows_per_page = pagination.get("rowsPerPage") or HISTORY_PAGE_SIZE
+        try:
+            rows, total = await run.io_bound(
+                self.event_store.query,
+                path_prefix=filters["path_prefix"].value.strip(),
+                action=filters["action"].value,
+                since=filters["since"].value.strip(),
+                until=filters["until"].value.strip(),
+                sort_by=pagination.get("sortBy") or "time",
+                descending=pagination.get("descending", True),
+                offset=(pagination.get("page", 1) - 1) * rows_per_page,
+                limit=rows_per_page,
+            )
+        except Exception as e:
+            ui.notify(f"查询历史记录时出错: {str(e)}")
+            return
+        pagination.update(rowsPerPage=rows_per_page, rowsNumber=total)
+        table.rows = rows
+        table.pagination = pagination
+
+    async def generate_report(self):
+        """在后台线程中执行全量扫描并生成报告，扫描期间在通知中显示进度"""
         if not MONITOR_AVAILABLE:
             ui.notify("监控模块不可用，请检查安装")
             return
 
-        try:
-            # 调用file_monitor.py中的全量扫描功能
-            from file_monitor import full_scan
+        if self.scan_task is None or self.scan_task.done():
+            self.scan_progress.update(files=0, directory="")
+            self.scan_task = asyncio.ensure_future(
+                run.io_bound(full_scan, progress=self._on_scan_progress)
+            )
+        else:
+            ui.notify("全量扫描正在进行中，完成后显示结果")
 
-            scan_report = full_scan()
+        notification = ui.notification(
+            "正在执行全量扫描...", spinner=True, timeout=None
+        )
+        try:
+            while not self.scan_task.done():
+                notification.message = (
+                    f"正在执行全量扫描: 已扫描 {self.scan_progress['files']} 个文件"
+                    f"（{self.scan_progress['directory']}）"
+                )
+                await asyncio.wait([self.scan_task], timeout=PROGRESS_INTERVAL)
+            scan_report = self.scan_task.result()
             ui.notify(f"报告已生成: 共检测到 {scan_report.get('file_count', 0)} 个文件")
         except Exception as e:
             ui.notify(f"生成报告时出错: {str(e)}")
+        finally:
+            notification.dismiss()
+
+    def _on_scan_progress(self, files, directory):
+        """全量扫描进度回调（在扫描线程中调用，只更新进度状态）"""
+        self.scan_progress.update(files=files, directory=directory)
 
-    def check_git_status(self):
-        """检查Git状态"""
-        if not MONITOR_AVAILABLE or not self.git_manager:
+    async def check_git_status(self):
+        """在后台线程中检查 Git 状态，短时间内重复检查直接返回缓存的结果"""
+        if not MONITOR_AVAILABLE or not GIT_AVAILABLE:
             ui.notify("Git管理器不可用")
             return
 
-        try:
-            # 检查Git状态
-            import subprocess
-
-            result = subprocess.run(
-                ["git", "status", "--porcelain"],
-                cwd=os.path.dirname(__file__),
-                capture_output=True,
-                text=True,
+        if self.git_status_cache is not None:
+            checked_at, changed = self.git_status_cache
+            age = time.monotonic() - checked_at
+            if age < GIT_STATUS_CACHE_SECONDS:
+                self._notify_git_status(changed, f"（{age:.0f} 秒前的结果）")
+                return
+
+        if self.git_status_task is None or self.git_status_task.done():
+            self.git_status_task = asyncio.ensure_future(
+                run.io_bound(
+                    read_git_status, os.path.dirname(os.path.abspath(__file__))
+                )
             )
-
-            if result.stdout.strip():
-                ui.notify(f"有 {len(result.stdout.strip().split('\\n'))} 个文件未提交")
-            else:
-                ui.notify("工作区干净，没有未提交的更改")
+        notification = ui.notification("正在检查Git状态...", spinner=True, timeout=None)
+        try:
+            changed = await asyncio.shield(self.git_status_task)
+            self.git_status_cache = (time.monotonic(), changed)
+            self._notify_git_status(changed)
         except Exception as e:
             ui.notify(f"检查Git状态时出错: {str(e)}")
+        finally:
+            notification.dismiss()
+
+    def _notify_git_status(self, changed, suffix=""):
+        """显示 Git 状态检查结果"""
+        if changed:
+            ui.notify(f"有 {changed} 个文件未提交{suffix}")
+        else:
+            ui.notify(f"工作区干净，没有未提交的更改{suffix}")
+
+
+def read_git_status(repo_dir):
+    """
+    读取工作区中未提交的文件数（在后台线程中调用）
+
+    Returns:
+        int: 未提交的文件数
+
+    Raises:
+        RuntimeError: git 命令执行失败
+    """
+    result = subprocess.run(
+        ["git", "status", "--porcelain"],
+        cwd=repo_dir,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "git status 执行失败")
+    return len(result.stdout.splitlines())
 
 
 # 创建应用实例
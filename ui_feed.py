@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面文件变化记录模块
+界面定时器只比较事件总线的序号，有新事件时才取出上次之后发布的事件并增量更新表格，
+同一周期内的多个事件合并为一次推送
+"""
+
+# 界面中保留的最大记录数
+MAX_ROWS = 50
+
+
+def apply_delta(rows, records, reset=False, max_rows=MAX_ROWS):
+    """
+    把新记录按最新在前的顺序合并到表格行列表中（原地修改）
+
+    Args:
+        rows (list): 表格当前的行
+        records (list): 新记录（从旧到新）
+        reset (bool): 是否丢弃当前的行
+        max_rows (int): 表格保留的最大行数
+    """
+    if reset:
+        rows.clear()
+    rows[:0] = reversed(records[-max_rows:])
+    del rows[max_rows:]